@@ -11,34 +11,108 @@ Equipo 3:
 - Daniel Osvaldo Lopez (25-0655)
 """
 
-from flask import Flask, render_template, request, jsonify
-from src.logic import Materia, Seccion, GeneradorHorarios
+from flask import Flask, render_template, request, jsonify, g
+from src.logic import Materia, Seccion, GeneradorHorarios, Catalogo, SolucionesIncrementales, BusquedaInterrumpida
 from src.parser import SmartParser
 from src.file_parser import FileParser
+from src.cache import CacheResultados, clave_seleccion
+from src.persistencia import AlmacenCatalogo
+from src.metricas import Metricas
+from src.trabajos import GestorTrabajos
+import io
+import json
 import os
+import sqlite3
+import time
 from werkzeug.utils import secure_filename
+from itertools import islice
+from math import prod
 
 app = Flask(__name__)
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max
 
-# En Vercel, usar /tmp para uploads (único directorio escribible)
-if os.environ.get('VERCEL'):
-    app.config['UPLOAD_FOLDER'] = '/tmp/uploads'
-else:
-    app.config['UPLOAD_FOLDER'] = 'uploads'
+# Persistencia en SQLite (SMARTPLANNER_DB vacío la desactiva).
+# En Vercel, usar /tmp (único directorio escribible)
+RUTA_DB = os.environ.get(
+    'SMARTPLANNER_DB',
+    '/tmp/smartplanner.sqlite3' if os.environ.get('VERCEL') else 'data/smartplanner.sqlite3'
+)
 
-# Crear carpeta de uploads si no existe
 try:
-    os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
-except Exception:
-    pass  # En entornos read-only, ignorar error
+    almacen = AlmacenCatalogo(RUTA_DB) if RUTA_DB else None
+except (OSError, sqlite3.Error):
+    almacen = None  # En entornos read-only, trabajar solo en memoria
 
-# Almacenamiento en memoria
+# Almacenamiento en memoria (catálogos indexados por materia y por UUID de sección),
+# recargado desde el último snapshot si hay persistencia
 # Materias institucionales (compartidas)
-materias_institucionales = []
+materias_institucionales = almacen.cargar('institucional') if almacen else Catalogo()
 
 # Materias de proyección personal (separadas)
-materias_proyeccion = []
+materias_proyeccion = almacen.cargar('proyeccion') if almacen else Catalogo()
+
+# Estrategia de búsqueda usada por los endpoints de generación
+ESTRATEGIA_POR_DEFECTO = 'backtracking'
+
+# Caché de resultados de /api/generate_student; se invalida al modificar el catálogo
+cache_resultados = CacheResultados()
+
+# Últimos conjuntos de soluciones por selección: al habilitar o deshabilitar
+# secciones se actualizan en lugar de volver a buscar desde cero
+soluciones_incrementales = SolucionesIncrementales()
+
+# Métricas de las rutas críticas, expuestas en /api/metrics (SMARTPLANNER_METRICAS=0 las desactiva)
+metricas = Metricas(habilitado=os.environ.get('SMARTPLANNER_METRICAS', '1') != '0')
+
+# Generaciones de proyección en segundo plano (/api/proyeccion/jobs)
+gestor_trabajos = GestorTrabajos()
+
+# Tope de horarios que guarda un trabajo si no se envía 'max_soluciones'
+MAX_SOLUCIONES_TRABAJO = 100000
+
+# Presupuestos de búsqueda que se pueden enviar en cada petición de generación
+PRESUPUESTOS = ('max_soluciones', 'max_nodos', 'limite_ms')
+
+# Formatos de respuesta de los horarios ('formato'); el primero es el por defecto
+FORMATOS = ('completo', 'compacto', 'ndjson')
+TAMANO_BLOQUE_NDJSON = 1000 # Horarios por línea en el formato 'ndjson'
+
+# Parámetros de la petición que cambian el resultado de la generación
+OPCIONES_GENERACION = ('estrategia', 'paralelo', 'offset', 'limit', 'top', 'ordenar_por', 'formato', 'agrupar') + PRESUPUESTOS
+
+# Tope de transiciones del conteo exacto de 'validas' cuando no sale de la propia
+# búsqueda (~0,05 s); si no alcanza, 'validas' es None (ver contar_validas)
+LIMITE_CONTEO = 100000
+
+# Ranking de horarios ('top' / 'ordenar_por') en los endpoints de generación
+TOP_POR_DEFECTO = 10
+CRITERIO_POR_DEFECTO = 'dias'
+
+@app.before_request
+def sincronizar_catalogos():
+    """
+    Con varios workers, cada proceso trae los cambios escritos por los demás
+    antes de atender la petición (si no hubo escrituras el costo es mínimo).
+    """
+    if almacen and 'institucional' in almacen.sincronizar():
+        cache_resultados.invalidar()
+
+@app.before_request
+def iniciar_cronometro():
+    """Marca el inicio de la petición para 'smartplanner_peticion_segundos'."""
+    if metricas.habilitado:
+        g.inicio_peticion = time.perf_counter()
+
+@app.after_request
+def registrar_duracion(respuesta):
+    """Registra la duración de la petición por endpoint."""
+    inicio = g.get('inicio_peticion')
+    if inicio is not None:
+        metricas.observar(
+            'smartplanner_peticion_segundos', time.perf_counter() - inicio,
+            endpoint=request.endpoint or 'desconocido'
+        )
+    return respuesta
 
 # === RUTAS PRINCIPALES ===
 
@@ -68,6 +142,7 @@ def proyeccion():
 def add_section():
     """Endpoint para agregar una sección institucional."""
     data = request.json
+    cache_resultados.invalidar()
     return _add_materia_internal(data, materias_institucionales)
 
 @app.route('/api/delete', methods=['POST'])
@@ -75,8 +150,8 @@ def delete_materia():
     """Elimina una materia institucional completa por nombre."""
     data = request.json
     nombre = data.get('materia')
-    global materias_institucionales
-    materias_institucionales = [m for m in materias_institucionales if m.nombre != nombre]
+    cache_resultados.invalidar()
+    materias_institucionales.eliminar_materia(nombre)
     return jsonify({'message': f'Materia {nombre} eliminada'})
 
 @app.route('/api/delete_section', methods=['POST'])
@@ -86,9 +161,9 @@ def delete_section():
     nombre_materia = data.get('materia')
     uuid_seccion = data.get('uuid')
 
-    materia = next((m for m in materias_institucionales if m.nombre == nombre_materia), None)
-    if materia:
-        materia.secciones = [s for s in materia.secciones if s.uuid != uuid_seccion]
+    if materias_institucionales.materia(nombre_materia):
+        cache_resultados.invalidar()
+        materias_institucionales.eliminar_seccion(nombre_materia, uuid_seccion)
         return jsonify({'success': True, 'message': 'Sección eliminada'})
 
     return jsonify({'success': False, 'message': 'Materia no encontrada'})
@@ -101,12 +176,9 @@ def toggle_section():
     uuid_seccion = data.get('uuid')
     enabled = data.get('enabled')
 
-    materia = next((m for m in materias_institucionales if m.nombre == nombre_materia), None)
-    if materia:
-        seccion = next((s for s in materia.secciones if s.uuid == uuid_seccion), None)
-        if seccion:
-            seccion.enabled = enabled
-            return jsonify({'success': True})
+    if materias_institucionales.habilitar_seccion(nombre_materia, uuid_seccion, enabled):
+        cache_resultados.invalidar()
+        return jsonify({'success': True})
 
     return jsonify({'success': False, 'message': 'Materia o sección no encontrada'})
 
@@ -134,11 +206,13 @@ def chat_bot():
     data = request.json
     mensaje = data.get('mensaje', '')
 
-    resultado = SmartParser.parse(mensaje)
+    with metricas.fase('parseo'):
+        resultado = SmartParser.parse(mensaje)
 
     if 'error' in resultado:
         return jsonify({'success': False, 'message': resultado['error']})
 
+    cache_resultados.invalidar()
     _add_materia_internal(resultado, materias_institucionales)
 
     # Formatear mensaje de éxito
@@ -148,12 +222,23 @@ def chat_bot():
         'message': f"Agregada: {resultado['materia']} (Sec {resultado['seccion']}) [{dias_str} {resultado['inicio']}-{resultado['fin']}]"
     })
 
+@app.route('/api/chat/batch', methods=['POST'])
+def chat_batch():
+    """Agrega muchas materias institucionales a partir de una lista de líneas."""
+    try:
+        lineas = _parse_lineas_lote(request.get_json(silent=True))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    cache_resultados.invalidar()
+    return _chat_batch_internal(lineas, materias_institucionales)
+
 @app.route('/api/upload', methods=['POST'])
 def upload_file():
     """Endpoint para subir archivos Excel o JSON (institución)."""
+    cache_resultados.invalidar()
     return _process_file_upload(materias_institucionales)
 
-def _process_file_upload(materias_db):
+def _process_file_upload(catalogo):
     """Procesa la carga de archivos Excel o JSON."""
     if 'file' not in request.files:
         return jsonify({'success': False, 'error': 'No se envió ningún archivo'}), 400
@@ -166,44 +251,50 @@ def _process_file_upload(materias_db):
     filename = secure_filename(file.filename)
     file_ext = os.path.splitext(filename)[1].lower()
 
-    if file_ext not in ['.json', '.xlsx', '.xls']:
+    if file_ext not in ['.json', '.ndjson', '.jsonl', '.xlsx', '.xls']:
         return jsonify({'success': False, 'error': 'Formato no soportado. Use JSON o Excel'}), 400
 
     try:
-        if file_ext == '.json':
-            # Leer contenido JSON
-            content = file.read().decode('utf-8')
-            result = FileParser.parse_json(content)
+        inicio = time.perf_counter()
+        if file_ext in ('.json', '.ndjson', '.jsonl'):
+            # JSON: se recorre bloque por bloque (o línea por línea en NDJSON)
+            # y cada fila pasa al lote sin construir el documento completo
+            if file_ext == '.json':
+                filas = FileParser.iter_json(file.stream)
+            else:
+                filas = FileParser.iter_ndjson(file.stream)
+            try:
+                added, errors = catalogo.agregar_lote(filas)
+            except (ValueError, TypeError, AttributeError) as e:
+                # JSONDecodeError y UnicodeDecodeError son ValueError
+                return jsonify({'success': False, 'error': f'Error al parsear JSON: {str(e)}'}), 400
         else:
-            # Guardar Excel temporalmente
-            filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-            file.save(filepath)
-            result = FileParser.parse_excel(filepath)
-            # Eliminar archivo temporal
-            os.remove(filepath)
-
-        if not result['success']:
-            return jsonify(result), 400
-
-        # Agregar materias al sistema
-        added = 0
-        errors = []
-
-        for materia_data in result['materias']:
+            # Excel: se lee en modo streaming desde memoria, sin archivo temporal;
+            # cada fila pasa directamente al lote a medida que se parsea
+            filas = FileParser.iter_excel(io.BytesIO(file.read()))
             try:
-                response = _add_materia_internal(materia_data, materias_db)
-                # Verificar si la respuesta es un error
-                if isinstance(response, tuple) and response[1] >= 400:
-                    errors.append(f"{materia_data['materia']}: Error al agregar")
-                else:
-                    added += 1
+                added, errors = catalogo.agregar_lote(filas)
             except Exception as e:
-                errors.append(f"{materia_data['materia']}: {str(e)}")
-
+                return jsonify({'success': False, 'error': f'Error al leer Excel: {str(e)}'}), 400
+
+            if not added and not errors:
+                return jsonify({'success': False, 'error': 'No se encontraron datos válidos en el archivo Excel'}), 400
+
+        # Rendimiento del parseo + inserción (filas por segundo)
+        total = added + len(errors)
+        segundos = time.perf_counter() - inicio
+        formato = file_ext.lstrip('.')
+        metricas.observar('smartplanner_importacion_segundos', segundos, formato=formato)
+        metricas.incrementar('smartplanner_importacion_filas_total', total, formato=formato)
+        metricas.incrementar('smartplanner_importacion_errores_total', len(errors), formato=formato)
+        if segundos > 0:
+            metricas.fijar('smartplanner_importacion_filas_por_segundo', round(total / segundos), formato=formato)
         return jsonify({
             'success': True,
             'message': f'Archivo procesado: {added} secciones agregadas',
-            'total': result['count'],
+            'total': total,
+            'segundos': round(segundos, 4),
+            'filas_por_segundo': round(total / segundos) if segundos > 0 else total,
             'added': added,
             'errors': len(errors),
             'error_details': errors[:5]  # Solo primeros 5 errores
@@ -218,42 +309,84 @@ def _process_file_upload(materias_db):
 def generate_student():
     """Genera horarios para estudiante basado en selecciones."""
     data = request.json
-    selected_uuids = set(data.get('selected', []))
-
-    # Crear lista temporal con solo las secciones seleccionadas
-    materias_filtradas = []
-    materia_map = {}
-
-    for item in selected_uuids:
-        materia_nombre, uuid = item.split('|')
-
-        # Buscar la materia original
-        materia_original = next((m for m in materias_institucionales if m.nombre == materia_nombre), None)
-        if not materia_original:
-            continue
-
-        # Buscar la sección específica
-        seccion_original = next((s for s in materia_original.secciones if s.uuid == uuid), None)
-        if not seccion_original:
-            continue
 
-        # Crear o actualizar materia filtrada
-        if materia_nombre not in materia_map:
+    # Con 'debug_stats' se devuelven los tiempos de cada fase (y no se usa la caché)
+    fases = {} if _parse_flag(data.get('debug_stats')) else None
+
+    with metricas.fase('seleccion', fases):
+        # Handles de las secciones seleccionadas, por materia (en orden de aparición)
+        seleccion = {}
+        for item in data.get('selected', []):
+            materia_nombre, uuid = item.split('|')
+
+            # Buscar la sección específica dentro de la materia original
+            seccion_original = materias_institucionales.seccion(materia_nombre, uuid)
+            if seccion_original:
+                seleccion.setdefault(materia_nombre, set()).add(seccion_original.handle)
+
+        # Crear lista temporal de materias donde solo las secciones seleccionadas
+        # quedan habilitadas. Marcar o desmarcar una sección conserva la estructura,
+        # así que las soluciones se actualizan de forma incremental.
+        materias_filtradas = []
+        for materia_nombre, handles in seleccion.items():
+            materia_original = materias_institucionales.materia(materia_nombre)
+            if materia_original is None:
+                continue
             materia_filtrada = Materia(materia_nombre)
-            materia_map[materia_nombre] = materia_filtrada
+            for seccion in materia_original.secciones:
+                seccion.enabled = seccion.enabled and seccion.handle in handles
+                materia_filtrada.agregar_seccion(seccion)
             materias_filtradas.append(materia_filtrada)
-        else:
-            materia_filtrada = materia_map[materia_nombre]
 
-        # Agregar la sección
-        materia_filtrada.agregar_seccion(seccion_original)
+    if fases is not None:
+        return _generate_response(materias_filtradas, data, fases)
+
+    # Selecciones con las mismas materias y secciones habilitadas comparten resultado
+    clave = clave_seleccion(
+        [m.nombre for m in materias_filtradas] +
+        [f"{m.nombre}|{s.uuid}" for m in materias_filtradas for s in m.secciones if s.enabled],
+        {opcion: data.get(opcion) for opcion in OPCIONES_GENERACION}
+    )
+    cuerpo = cache_resultados.obtener(clave)
+    if cuerpo is not None:
+        return app.response_class(cuerpo, mimetype='application/json')
 
     # Generar horarios con las materias filtradas
-    generador = GeneradorHorarios(materias_filtradas)
-    teoricas = generador.calcular_combinaciones_teoricas()
-    soluciones = generador.generar()
+    respuesta = _generate_response(materias_filtradas, data)
+    # Con 'limite_ms' el resultado depende de la carga del momento y 'ndjson' se
+    # envía en streaming: ninguno de los dos se guarda
+    if (not isinstance(respuesta, tuple) and data.get('limite_ms') in (None, '')
+            and data.get('formato') != 'ndjson'):
+        cache_resultados.guardar(clave, respuesta.get_data())
+    return respuesta
+
+@app.route('/api/almacen/stats', methods=['GET'])
+def almacen_stats():
+    """Tiempos de la última carga y tamaño de la base de datos del catálogo."""
+    if not almacen:
+        return jsonify({'persistencia': False})
+    return jsonify({
+        'persistencia': True,
+        'ruta': almacen.ruta,
+        'bytes': almacen.tamano(),
+        'cargas': almacen.ultima_carga
+    })
 
-    return _format_solutions_response(teoricas, soluciones)
+@app.route('/api/cache/stats', methods=['GET'])
+def cache_stats():
+    """Aciertos, fallos y tamaño de la caché de resultados."""
+    return jsonify(cache_resultados.estadisticas())
+
+@app.route('/api/metrics', methods=['GET'])
+def metrics():
+    """Métricas del proceso en formato de texto de Prometheus."""
+    if not metricas.habilitado:
+        return jsonify({'error': 'Métricas desactivadas (SMARTPLANNER_METRICAS=0)'}), 404
+
+    estadisticas = cache_resultados.estadisticas()
+    for campo in ('aciertos', 'fallos', 'entradas', 'bytes'):
+        metricas.fijar(f'smartplanner_cache_{campo}', estadisticas[campo])
+    return app.response_class(metricas.exportar(), mimetype='text/plain; version=0.0.4')
 
 # === API PROYECCIÓN ===
 
@@ -268,8 +401,7 @@ def proyeccion_delete():
     """Eliminar materia de proyección."""
     data = request.json
     nombre = data.get('materia')
-    global materias_proyeccion
-    materias_proyeccion = [m for m in materias_proyeccion if m.nombre != nombre]
+    materias_proyeccion.eliminar_materia(nombre)
     return jsonify({'message': f'Materia {nombre} eliminada'})
 
 @app.route('/api/proyeccion/delete_section', methods=['POST'])
@@ -279,9 +411,8 @@ def proyeccion_delete_section():
     nombre_materia = data.get('materia')
     uuid_seccion = data.get('uuid')
 
-    materia = next((m for m in materias_proyeccion if m.nombre == nombre_materia), None)
-    if materia:
-        materia.secciones = [s for s in materia.secciones if s.uuid != uuid_seccion]
+    if materias_proyeccion.materia(nombre_materia):
+        materias_proyeccion.eliminar_seccion(nombre_materia, uuid_seccion)
         return jsonify({'success': True, 'message': 'Sección eliminada'})
 
     return jsonify({'success': False, 'message': 'Materia no encontrada'})
@@ -294,12 +425,8 @@ def proyeccion_toggle_section():
     uuid_seccion = data.get('uuid')
     enabled = data.get('enabled')
 
-    materia = next((m for m in materias_proyeccion if m.nombre == nombre_materia), None)
-    if materia:
-        seccion = next((s for s in materia.secciones if s.uuid == uuid_seccion), None)
-        if seccion:
-            seccion.enabled = enabled
-            return jsonify({'success': True})
+    if materias_proyeccion.habilitar_seccion(nombre_materia, uuid_seccion, enabled):
+        return jsonify({'success': True})
 
     return jsonify({'success': False, 'message': 'Materia o sección no encontrada'})
 
@@ -324,11 +451,83 @@ def proyeccion_list():
 @app.route('/api/proyeccion/generate', methods=['GET'])
 def proyeccion_generate():
     """Genera horarios para proyección personal."""
-    generador = GeneradorHorarios(materias_proyeccion)
-    teoricas = generador.calcular_combinaciones_teoricas()
-    soluciones = generador.generar()
+    return _generate_response(list(materias_proyeccion), request.args)
+
+@app.route('/api/proyeccion/jobs', methods=['POST'])
+def proyeccion_job_submit():
+    """
+    Encola una generación de proyección en segundo plano y devuelve su ID.
+    Acepta 'estrategia', 'paralelo' y los presupuestos 'max_soluciones',
+    'max_nodos' y 'limite_ms' (en JSON o en la URL).
+    """
+    params = request.get_json(silent=True) or request.args
+    try:
+        presupuesto = _parse_presupuesto(params)
+        if presupuesto['max_soluciones'] is None:
+            presupuesto['max_soluciones'] = MAX_SOLUCIONES_TRABAJO
+        generador = GeneradorHorarios(
+            list(materias_proyeccion), params.get('estrategia', ESTRATEGIA_POR_DEFECTO),
+            paralelo=_parse_flag(params.get('paralelo')), **presupuesto
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
-    return _format_solutions_response(teoricas, soluciones)
+    try:
+        trabajo = gestor_trabajos.enviar(generador)
+    except RuntimeError as e:
+        return jsonify({'error': str(e)}), 429
+    return jsonify(trabajo.progreso()), 202
+
+@app.route('/api/proyeccion/jobs/<id_trabajo>', methods=['GET'])
+def proyeccion_job_status(id_trabajo):
+    """Estado y progreso (nodos explorados, horarios encontrados) de un trabajo."""
+    trabajo = gestor_trabajos.obtener(id_trabajo)
+    if trabajo is None:
+        return jsonify({'error': 'Trabajo no encontrado'}), 404
+    return jsonify(trabajo.progreso())
+
+@app.route('/api/proyeccion/jobs/<id_trabajo>/resultados', methods=['GET'])
+def proyeccion_job_results(id_trabajo):
+    """
+    Horarios encontrados hasta ahora por un trabajo, paginados con 'offset' y
+    'limit'; se pueden pedir mientras la búsqueda sigue en curso. Acepta
+    'formato' como los endpoints de generación.
+    """
+    trabajo = gestor_trabajos.obtener(id_trabajo)
+    if trabajo is None:
+        return jsonify({'error': 'Trabajo no encontrado'}), 404
+    try:
+        offset, limit = _parse_pagination(request.args)
+        formato = _parse_formato(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    # Se lee el estado antes que las soluciones: si ya terminó, la lista está completa
+    progreso = trabajo.progreso()
+    encontradas = progreso['encontradas']
+    pagina = trabajo.pagina(offset, limit, encontradas)
+    hay_mas = offset + len(pagina) < encontradas or trabajo.activo
+    extra = {
+        'offset': offset, 'limit': limit, 'hay_mas': hay_mas,
+        'estado': progreso['estado'], 'encontradas': encontradas,
+    }
+    if formato == 'ndjson':
+        def buscar():
+            return pagina, lambda: (progreso['nodos'], progreso['validas'], extra)
+        return _ndjson_response({'teoricas': progreso['teoricas']}, buscar)
+
+    return jsonify(_solutions_payload(
+        progreso['teoricas'], pagina, progreso['nodos'], validas=progreso['validas'],
+        extra=extra, compacto=formato == 'compacto'
+    ))
+
+@app.route('/api/proyeccion/jobs/<id_trabajo>/cancel', methods=['POST'])
+def proyeccion_job_cancel(id_trabajo):
+    """Cancela un trabajo; los horarios ya encontrados se conservan."""
+    trabajo = gestor_trabajos.cancelar(id_trabajo)
+    if trabajo is None:
+        return jsonify({'error': 'Trabajo no encontrado'}), 404
+    return jsonify(trabajo.progreso())
 
 @app.route('/api/proyeccion/chat', methods=['POST'])
 def proyeccion_chat():
@@ -336,7 +535,8 @@ def proyeccion_chat():
     data = request.json
     mensaje = data.get('mensaje', '')
 
-    resultado = SmartParser.parse(mensaje)
+    with metricas.fase('parseo'):
+        resultado = SmartParser.parse(mensaje)
 
     if 'error' in resultado:
         return jsonify({'success': False, 'message': resultado['error']})
@@ -350,11 +550,19 @@ def proyeccion_chat():
         'message': f"Agregada a proyección: {resultado['materia']} (Sec {resultado['seccion']}) [{dias_str} {resultado['inicio']}-{resultado['fin']}]"
     })
 
+@app.route('/api/proyeccion/chat/batch', methods=['POST'])
+def proyeccion_chat_batch():
+    """Agrega muchas materias a proyección a partir de una lista de líneas."""
+    try:
+        lineas = _parse_lineas_lote(request.get_json(silent=True))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return _chat_batch_internal(lineas, materias_proyeccion)
+
 @app.route('/api/proyeccion/clear', methods=['POST'])
 def proyeccion_clear():
     """Limpia toda la proyección personal."""
-    global materias_proyeccion
-    materias_proyeccion = []
+    materias_proyeccion.limpiar()
     return jsonify({'message': 'Proyección limpiada'})
 
 @app.route('/api/proyeccion/upload', methods=['POST'])
@@ -364,72 +572,489 @@ def proyeccion_upload():
 
 # === FUNCIONES INTERNAS ===
 
-def _add_materia_internal(data, materias_db):
+def _add_materia_internal(data, catalogo):
     """Función interna para agregar materia desde cualquier fuente."""
     nombre = data.get('materia')
-    id_sec = str(data.get('seccion'))
-    dias = data.get('dias')
 
+    # Crear sección (la materia se crea si no existe)
     try:
-        inicio = float(data.get('inicio'))
-        fin = float(data.get('fin'))
-    except (ValueError, TypeError):
-        return jsonify({'error': 'Horas inválidas'}), 400
+        nueva_seccion = Seccion.desde_datos(data)
+        catalogo.agregar_seccion(nombre, nueva_seccion)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
-    if not nombre or not id_sec:
-        return jsonify({'error': 'Faltan datos'}), 400
+    return jsonify({'message': f'Sección de {nombre} agregada', 'total_materias': len(catalogo)})
+
+def _parse_lineas_lote(data):
+    """
+    Lee las líneas de un lote del chat: 'lineas' (lista de textos) o 'texto'
+    (una materia por línea).
+
+    Raises:
+        ValueError: Si el cuerpo no es un objeto JSON o las líneas no son textos.
+    """
+    if not isinstance(data, dict):
+        raise ValueError('Se esperaba un objeto JSON con "lineas" o "texto"')
+    lineas = data.get('lineas')
+    if lineas is None:
+        texto = data.get('texto', '')
+        if not isinstance(texto, str):
+            raise ValueError('"texto" debe ser un texto con una materia por línea')
+        return texto
+    if not isinstance(lineas, list):
+        raise ValueError('"lineas" debe ser una lista de textos')
+    for numero, linea in enumerate(lineas):
+        if not isinstance(linea, str):
+            raise ValueError(f'La línea {numero} no es un texto')
+    return lineas
+
+def _chat_batch_internal(lineas, catalogo):
+    """
+    Interpreta varias líneas en lenguaje natural (ver _parse_lineas_lote) y
+    agrega al catálogo las que se entendieron en un solo lote. Devuelve un
+    resultado por línea.
+    """
+    resultados = []
+    filas = []
+    with metricas.fase('parseo'):
+        lote = SmartParser.parse_lote(lineas)
+    for numero, resultado in lote:
+        if 'error' in resultado:
+            resultados.append({'linea': numero, 'success': False, 'message': resultado['error']})
+            continue
+        dias_str = ", ".join(resultado['dias'])
+        resultados.append({
+            'linea': numero,
+            'success': True,
+            'message': f"Agregada: {resultado['materia']} (Sec {resultado['seccion']}) [{dias_str} {resultado['inicio']}-{resultado['fin']}]"
+        })
+        filas.append((len(resultados) - 1, resultado))
+
+    added, errors = catalogo.agregar_lote(resultado for _, resultado in filas)
+
+    # Los errores del lote se refieren a la posición dentro de 'filas'
+    for error in errors:
+        item = resultados[filas[error['fila']][0]]
+        item['success'] = False
+        item['message'] = error['error']
+
+    return jsonify({
+        'success': True,
+        'added': added,
+        'errors': len(resultados) - added,
+        'resultados': resultados
+    })
 
-    if inicio >= fin:
-        return jsonify({'error': 'La hora de inicio debe ser menor a la de fin'}), 400
+def _parse_pagination(params):
+    """
+    Lee 'offset' y 'limit' de los parámetros de la petición.
 
-    # Buscar o crear materia
-    materia_obj = next((m for m in materias_db if m.nombre == nombre), None)
-    if not materia_obj:
-        materia_obj = Materia(nombre)
-        materias_db.append(materia_obj)
+    Returns:
+        tuple: (offset, limit); limit es None si no se pidió paginación.
 
-    # Crear sección
-    nueva_seccion = Seccion(id_sec, dias, inicio, fin)
+    Raises:
+        ValueError: Si los valores no son enteros válidos.
+    """
     try:
-        materia_obj.agregar_seccion(nueva_seccion)
-    except ValueError as e:
-        return jsonify({'error': str(e)}), 400
+        offset = int(params.get('offset') or 0)
+        limit = params.get('limit')
+        limit = int(limit) if limit not in (None, '') else None
+    except (ValueError, TypeError):
+        raise ValueError('offset y limit deben ser enteros')
+
+    if offset < 0 or (limit is not None and limit <= 0):
+        raise ValueError('offset debe ser >= 0 y limit > 0')
+    return offset, limit
 
-    return jsonify({'message': f'Sección de {nombre} agregada', 'total_materias': len(materias_db)})
+def _parse_ranking(params):
+    """
+    Lee 'top' y 'ordenar_por' de los parámetros de la petición.
 
-def _format_solutions_response(teoricas, soluciones):
-    """Formatea la respuesta de soluciones para JSON."""
-    def format_hour(h):
-        """Convierte 14.5 a 2:30pm"""
-        hours = int(h)
-        minutes = int((h - hours) * 60)
-        period = "am" if hours < 12 else "pm"
-        if hours > 12:
-            hours -= 12
-        elif hours == 0:
-            hours = 12
+    Returns:
+        tuple: (top, criterio); (None, None) si no se pidió ranking.
 
-        if minutes == 0:
-            return f"{hours}{period}"
-        return f"{hours}:{minutes:02d}{period}"
+    Raises:
+        ValueError: Si los valores no son válidos.
+    """
+    top = params.get('top')
+    criterio = params.get('ordenar_por')
+    if top in (None, '') and not criterio:
+        return None, None
 
+    try:
+        top = int(top) if top not in (None, '') else TOP_POR_DEFECTO
+    except (ValueError, TypeError):
+        raise ValueError('top debe ser entero')
+    if top <= 0:
+        raise ValueError('top debe ser > 0')
+
+    criterio = criterio or CRITERIO_POR_DEFECTO
+    if criterio not in GeneradorHorarios.CRITERIOS:
+        raise ValueError(f"ordenar_por debe ser uno de: {', '.join(GeneradorHorarios.CRITERIOS)}")
+    return top, criterio
+
+def _parse_presupuesto(params):
+    """
+    Lee los presupuestos de búsqueda ('max_soluciones', 'max_nodos' y
+    'limite_ms') de los parámetros de la petición.
+
+    Returns:
+        dict: Argumentos para GeneradorHorarios; None en los que no se enviaron.
+
+    Raises:
+        ValueError: Si algún valor no es un entero positivo.
+    """
+    presupuesto = {}
+    for nombre in PRESUPUESTOS:
+        valor = params.get(nombre)
+        if valor in (None, ''):
+            presupuesto[nombre] = None
+            continue
+        try:
+            valor = int(valor)
+        except (ValueError, TypeError):
+            raise ValueError(f'{nombre} debe ser entero')
+        if valor <= 0:
+            raise ValueError(f'{nombre} debe ser > 0')
+        presupuesto[nombre] = valor
+    return presupuesto
+
+def _parse_formato(params):
+    """
+    Lee 'formato' de los parámetros de la petición (por defecto 'completo').
+
+    Raises:
+        ValueError: Si no es uno de FORMATOS.
+    """
+    formato = params.get('formato') or FORMATOS[0]
+    if formato not in FORMATOS:
+        raise ValueError(f"formato debe ser uno de: {', '.join(FORMATOS)}")
+    return formato
+
+def _parse_flag(valor):
+    """Interpreta un flag que puede venir como booleano JSON o como texto en la URL."""
+    if isinstance(valor, str):
+        return valor.strip().lower() in ('1', 'true', 'si', 'sí', 'yes')
+    return bool(valor)
+
+def _generate_response(materias, params, fases=None):
+    """
+    Ejecuta la generación de horarios y arma la respuesta JSON.
+    Si se envía 'limit', solo se busca hasta completar la página pedida.
+    Si se envía 'top' u 'ordenar_por', se devuelven solo los mejores horarios.
+    'formato' elige la forma de los horarios: 'completo' (por defecto),
+    'compacto' o 'ndjson' (ver _solutions_payload y _ndjson_response).
+
+    Con 'agrupar' cada horario lista las secciones intercambiables (misma
+    franja) juntas, p. ej. 'seccion': '01/02/05', en lugar de repetir el
+    horario por cada una; 'grupos' es la cantidad de horarios agrupados y
+    'validas' sigue contando horarios concretos.
+
+    Si el conjunto de soluciones es pequeño (ver SolucionesIncrementales) se
+    mantiene entre peticiones y la respuesta incluye 'modo': 'completo',
+    'incremental' o 'sin_cambios'. Las peticiones paginadas solo usan un
+    conjunto que ya estuviera guardado.
+
+    Con presupuestos ('max_soluciones', 'max_nodos', 'limite_ms') la búsqueda
+    se corta al agotar cualquiera de ellos y devuelve lo encontrado; la
+    respuesta incluye 'completo' y 'truncado' (el motivo del corte).
+
+    Si la búsqueda no recorrió todos los horarios (paginación, 'top' o presupuesto),
+    'validas' se cuenta sin enumerar con a lo sumo LIMITE_CONTEO transiciones;
+    si no alcanza (o no alcanzó el presupuesto), 'validas' es None.
+
+    Con 'debug_stats' la respuesta incluye los segundos de cada fase
+    (preparación, búsqueda y serialización) y los contadores de la búsqueda.
+    'fases' trae los tiempos ya medidos por el endpoint, si los hay.
+    """
+    if fases is None and _parse_flag(params.get('debug_stats')):
+        fases = {}
+
+    with metricas.fase('preparacion', fases):
+        try:
+            presupuesto = _parse_presupuesto(params)
+            generador = GeneradorHorarios(
+                materias, params.get('estrategia', ESTRATEGIA_POR_DEFECTO),
+                paralelo=_parse_flag(params.get('paralelo')), **presupuesto
+            )
+            offset, limit = _parse_pagination(params)
+            top, criterio = _parse_ranking(params)
+            formato = _parse_formato(params)
+            agrupar = _parse_flag(params.get('agrupar'))
+            if top is not None and limit is not None:
+                raise ValueError('top y limit no se pueden combinar')
+            if top is not None and agrupar:
+                raise ValueError('top y agrupar no se pueden combinar')
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        teoricas = generador.calcular_combinaciones_teoricas()
+
+    # Las soluciones incrementales necesitan el conjunto completo
+    con_presupuesto = any(valor is not None for valor in presupuesto.values())
+
+    def buscar():
+        return _buscar_horarios(generador, top, criterio, offset, limit, agrupar, con_presupuesto)
+
+    if formato == 'ndjson':
+        def al_terminar(tiempos, emitidos, final):
+            # La búsqueda y la serialización se alternan por bloques
+            for fase, segundos in tiempos.items():
+                metricas.observar('smartplanner_fase_segundos', segundos, fase=fase)
+            _registrar_busqueda(generador, final['nodos'], emitidos)
+            if fases is not None:
+                fases.update(tiempos)
+                final['debug_stats'] = _debug_stats(fases, generador, final['nodos'], emitidos)
+
+        return _ndjson_response({'teoricas': teoricas}, buscar, agrupar, al_terminar)
+
+    with metricas.fase('busqueda', fases):
+        horarios, resumen = buscar()
+        soluciones = list(horarios)
+        nodos, validas, extra = resumen()
+
+    _registrar_busqueda(generador, nodos, len(soluciones))
+
+    with metricas.fase('serializacion', fases):
+        respuesta = _solutions_payload(
+            teoricas, soluciones, nodos, validas, extra, compacto=formato == 'compacto', agrupado=agrupar
+        )
+        cuerpo = jsonify(respuesta)
+
+    if fases is None:
+        return cuerpo
+
+    # Los tiempos se conocen después de serializar: la respuesta se vuelve a
+    # codificar con ellos (solo cuando se piden)
+    respuesta['debug_stats'] = _debug_stats(fases, generador, nodos, len(soluciones))
+    return jsonify(respuesta)
+
+def _buscar_horarios(generador, top, criterio, offset, limit, agrupar, con_presupuesto):
+    """
+    Elige de dónde salen los horarios pedidos (mejores, conjunto guardado o
+    búsqueda perezosa) y devuelve (horarios, resumen). 'horarios' se recorre
+    de forma perezosa salvo con 'top'; resumen(), llamado después de
+    recorrerlos, da (nodos, validas, extra) para la respuesta.
+    """
+    vista = None
+    paginas_en_orden = limit is None or generador.estrategia == 'backtracking'
+    if top is None and not con_presupuesto and not agrupar and paginas_en_orden:
+        # Con 'limit' solo se reutilizan conjuntos ya guardados: armar uno
+        # nuevo enumeraría todos los horarios antes de la primera página. Los
+        # conjuntos siguen el orden del backtracking; con forward checking las
+        # páginas salen siempre de la búsqueda perezosa para no cambiar de orden
+        vista = soluciones_incrementales.resolver(generador, solo_guardados=limit is not None)
+
+    estado = {'emitidos': 0, 'concretos': 0, 'hay_mas': False}
+    if top is not None:
+        horarios = generador.mejores(top, criterio)
+    elif vista is not None:
+        inicio, fin = (0, len(vista)) if limit is None else (offset, min(offset + limit, len(vista)))
+        horarios = (vista[k] for k in range(inicio, fin))
+    else:
+        fuente = generador.iter_grupos() if agrupar else generador.iter_soluciones()
+        horarios = _recorrer(fuente, estado, 0 if limit is None else offset, limit, agrupar)
+
+    def resumen():
+        if top is not None:
+            # La latencia del ranking no debe depender del conteo exacto: va acotado
+            nodos, validas = generador.nodos_explorados, _contar_validas(generador)
+            extra = {'top': top, 'ordenar_por': criterio, 'puntajes': generador.puntajes}
+        elif vista is not None:
+            nodos, validas = vista.nodos, len(vista)
+            extra = {'modo': vista.modo}
+            if limit is not None:
+                extra.update({'offset': offset, 'limit': limit, 'hay_mas': offset + limit < len(vista)})
+        else:
+            nodos = generador.nodos_explorados
+            emitidos = estado['emitidos']
+            if agrupar:
+                # Cada horario agrupado vale el producto de los tamaños de sus clases
+                if limit is None and generador.completo:
+                    validas = estado['concretos']
+                else:
+                    validas = _contar_validas(generador)
+                extra = {'agrupado': True, 'grupos': emitidos}
+            elif limit is None:
+                validas = emitidos if generador.completo else _contar_validas(generador)
+                extra = {} if con_presupuesto else None
+            else:
+                # El total exacto se cuenta sin enumerar (acotado); si la búsqueda llegó al final ya se conoce
+                if estado['hay_mas'] or not generador.completo:
+                    validas = _contar_validas(generador)
+                else:
+                    validas = offset + emitidos
+                extra = {}
+            if limit is not None:
+                extra.update({'offset': offset, 'limit': limit, 'hay_mas': estado['hay_mas']})
+
+        if con_presupuesto:
+            extra.update({'completo': generador.truncado is None, 'truncado': generador.truncado})
+        return nodos, validas, extra
+
+    return horarios, resumen
+
+def _recorrer(horarios, estado, offset=0, limit=None, agrupado=False):
+    """
+    Recorre los horarios desde 'offset' (hasta 'limit', si se indica) anotando
+    en 'estado' cuántos salieron ('emitidos'), cuántos horarios concretos
+    representan los agrupados ('concretos') y si quedan más ('hay_mas').
+    """
+    # Pedimos un elemento extra para saber si quedan más soluciones
+    fin = None if limit is None else offset + limit + 1
+    for horario in islice(horarios, offset, fin):
+        if estado['emitidos'] == limit:
+            estado['hay_mas'] = True
+            return
+        estado['emitidos'] += 1
+        if agrupado:
+            estado['concretos'] += prod(len(clase) for _, clase in horario)
+        yield horario
+
+def _registrar_busqueda(generador, nodos, soluciones):
+    """Registra en las métricas los contadores de una búsqueda terminada."""
+    estrategia = generador.estrategia
+    metricas.observar('smartplanner_busqueda_nodos', nodos, estrategia=estrategia)
+    metricas.incrementar('smartplanner_busqueda_nodos_total', nodos, estrategia=estrategia)
+    metricas.incrementar('smartplanner_busqueda_podas_total', generador.podas, estrategia=estrategia)
+    metricas.incrementar('smartplanner_busqueda_comprobaciones_total', generador.comprobaciones, estrategia=estrategia)
+    metricas.incrementar('smartplanner_busqueda_soluciones_total', soluciones, estrategia=estrategia)
+    if generador.truncado is not None:
+        metricas.incrementar('smartplanner_busqueda_truncadas_total', motivo=generador.truncado)
+
+def _debug_stats(fases, generador, nodos, soluciones):
+    """Contenido de 'debug_stats': segundos por fase y contadores de la búsqueda."""
+    return {
+        'fases': {fase: round(segundos, 6) for fase, segundos in fases.items()},
+        'estrategia': generador.estrategia,
+        'nodos': nodos,
+        'podas': generador.podas,
+        'comprobaciones': generador.comprobaciones,
+        'soluciones': soluciones,
+    }
+
+def _contar_validas(generador):
+    """
+    Conteo exacto de horarios, o None si se agotó el presupuesto del generador
+    o el tope de LIMITE_CONTEO transiciones.
+    """
+    try:
+        return generador.contar_validas(LIMITE_CONTEO)
+    except BusquedaInterrumpida:
+        return None
+
+def _format_hour(minutos):
+    """Convierte 870 (minutos del día) a 2:30pm"""
+    hours, minutes = divmod(minutos, 60)
+    period = "am" if hours < 12 else "pm"
+    if hours > 12:
+        hours -= 12
+    elif hours == 0:
+        hours = 12
+
+    if minutes == 0:
+        return f"{hours}{period}"
+    return f"{hours}:{minutes:02d}{period}"
+
+def _formatear_horarios(soluciones, tabla, posiciones, compacto=False, agrupado=False):
+    """
+    Formatea horarios para JSON. Cada sección distinta se formatea una sola
+    vez y se agrega a 'tabla' ('posiciones' asocia su id con el índice), que
+    pueden venir de bloques anteriores. Con 'compacto' cada horario es la lista
+    de índices en la tabla; si no, repite el diccionario de cada sección. Con
+    'agrupado' cada materia del horario trae una tupla de secciones
+    equivalentes (ver GeneradorHorarios.iter_grupos).
+    """
     soluciones_json = []
     for sol in soluciones:
         horario_formateado = []
         for nombre_materia, seccion in sol:
-            horario_formateado.append({
-                'materia': nombre_materia,
-                'seccion': seccion.id_seccion,
-                'dias': seccion.dias,
-                'hora': f"{format_hour(seccion.hora_inicio)}/{format_hour(seccion.hora_fin)}"
-            })
+            if agrupado:
+                clase, seccion = seccion, seccion[0]
+            k = posiciones.get(id(seccion))
+            if k is None:
+                k = posiciones[id(seccion)] = len(tabla)
+                tabla.append({
+                    'materia': nombre_materia,
+                    'seccion': '/'.join(s.id_seccion for s in clase) if agrupado else seccion.id_seccion,
+                    'dias': seccion.dias,
+                    'hora': f"{_format_hour(seccion.inicio)}/{_format_hour(seccion.fin)}"
+                })
+            horario_formateado.append(k if compacto else tabla[k])
         soluciones_json.append(horario_formateado)
-
-    return jsonify({
+    return soluciones_json
+
+def _solutions_payload(teoricas, soluciones, nodos, validas=None, extra=None, compacto=False, agrupado=False):
+    """
+    Formatea la respuesta de soluciones (diccionario listo para JSON). Con
+    'compacto' las secciones van una vez en 'secciones' y cada horario es la
+    lista de los índices de sus secciones en esa tabla (ver _formatear_horarios).
+    """
+    tabla = []
+    soluciones_json = _formatear_horarios(soluciones, tabla, {}, compacto, agrupado)
+
+    respuesta = {
         'teoricas': teoricas,
-        'validas': len(soluciones),
+        'validas': len(soluciones) if extra is None else validas,
+        'nodos': nodos,
         'soluciones': soluciones_json
-    })
+    }
+    if compacto:
+        respuesta['secciones'] = tabla
+    if extra is not None:
+        respuesta.update(extra)
+
+    return respuesta
+
+def _linea_json(datos):
+    """Una línea NDJSON (JSON sin espacios y salto de línea)."""
+    return json.dumps(datos, separators=(',', ':')) + '\n'
+
+def _ndjson_response(cabecera, buscar, agrupado=False, al_terminar=None):
+    """
+    Respuesta en streaming del formato 'ndjson' (application/x-ndjson). La
+    búsqueda corre mientras se envía: buscar() devuelve (horarios, resumen)
+    como _buscar_horarios y los horarios se piden de a TAMANO_BLOQUE_NDJSON,
+    así que ni la lista de horarios ni la respuesta se arman completas.
+
+    Líneas: 'cabecera' (lo que se conoce antes de buscar); un bloque
+    {"secciones": [...], "soluciones": [...]} por cada TAMANO_BLOQUE_NDJSON
+    horarios, donde 'secciones' son las secciones que aparecen por primera vez
+    (se agregan al final de la tabla y los horarios son índices en ella); y al
+    final el resto de la respuesta (validas, nodos, paginación...).
+    al_terminar(tiempos, emitidos, final) puede completar esa última línea.
+    """
+    def lineas():
+        yield _linea_json(cabecera)
+
+        tiempos = {'busqueda': 0.0, 'serializacion': 0.0}
+        inicio = time.perf_counter()
+        horarios, resumen = buscar()
+        horarios = iter(horarios)
+        tabla, posiciones, emitidos = [], {}, 0
+        while True:
+            bloque = list(islice(horarios, TAMANO_BLOQUE_NDJSON))
+            if not bloque:
+                break
+            medio = time.perf_counter()
+            tiempos['busqueda'] += medio - inicio
+            nuevas = len(tabla)
+            soluciones = _formatear_horarios(bloque, tabla, posiciones, True, agrupado)
+            linea = _linea_json({'secciones': tabla[nuevas:], 'soluciones': soluciones})
+            tiempos['serializacion'] += time.perf_counter() - medio
+            emitidos += len(bloque)
+            yield linea
+            inicio = time.perf_counter()
+
+        nodos, validas, extra = resumen()
+        tiempos['busqueda'] += time.perf_counter() - inicio
+        final = {'validas': validas, 'nodos': nodos}
+        final.update(extra or {})
+        if al_terminar is not None:
+            al_terminar(tiempos, emitidos, final)
+        yield _linea_json(final)
+
+    return app.response_class(lineas(), mimetype='application/x-ndjson')
 
 if __name__ == '__main__':
     app.run(debug=True, port=5200)
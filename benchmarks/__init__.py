@@ -0,0 +1,12 @@
+"""
+SmartPlannerX - Benchmarks
+
+Equipo 3:
+- Cristian E. Sanchez R. (25-0688)
+- Hansel Augusto Perez (25-0461)
+- Lia De Oleo (25-0673)
+- Juan Jose Cruz Romero (25-0888)
+- Samir Gonzalez (25-0808)
+- Alejandro Bruno (25-0947)
+- Daniel Osvaldo Lopez (25-0655)
+"""
@@ -0,0 +1,115 @@
+"""
+Catálogos Sintéticos - SmartPlannerX
+Genera catálogos de tamaño controlable para los benchmarks, en los mismos
+formatos que reciben los endpoints (filas, JSON por bloques, NDJSON y chat).
+
+Equipo 3:
+- Cristian E. Sánchez R. (25-0688)
+- Hansel Augusto Pérez (25-0461)
+- Lia De Oleo (25-0673)
+- Juan José Cruz Romero (25-0888)
+- Samir Gonzalez (25-0808)
+- Alejandro Bruno (25-0947)
+- Daniel Osvaldo Lopez (25-0655)
+"""
+
+import json
+import random
+
+from src.logic import Catalogo
+
+DIAS = ['Lunes', 'Martes', 'Miercoles', 'Jueves', 'Viernes', 'Sabado']
+
+# Nombre del día tal como aparece en los archivos de la universidad
+_DIAS_ARCHIVO = {
+    'Lunes': 'LUNES', 'Martes': 'MARTES', 'Miercoles': 'MIERCOLES',
+    'Jueves': 'JUEVES', 'Viernes': 'VIERNES', 'Sabado': 'SABADO',
+}
+
+def generar_filas(materias=8, secciones=6, dias=DIAS[:5], dias_por_seccion=(2,),
+                  hora_min=7, hora_max=21, duraciones=(1.5, 2), densidad=0.3, paso=0.5, semilla=0):
+    """
+    Filas {materia, seccion, dias, inicio, fin} de un catálogo sintético.
+
+    Args:
+        materias: Número de materias.
+        secciones: Secciones por materia.
+        dias: Días en los que puede haber clase.
+        dias_por_seccion: Opciones de cuántos días tiene cada sección.
+        hora_min, hora_max: Franja del día en la que caben las clases.
+        duraciones: Opciones de duración (en horas) de cada clase.
+        densidad: 0 reparte los inicios en toda la franja; 1 los concentra al
+            principio, de modo que casi todas las secciones se solapan.
+        paso: Cada cuántas horas puede empezar una clase (0.5 = en punto o y media).
+        semilla: Semilla del generador aleatorio (mismo catálogo en cada corrida).
+    """
+    rnd = random.Random(semilla)
+    filas = []
+    for i in range(materias):
+        nombre = f"SIN{i:04d} - Materia Sintetica {i}"
+        for j in range(secciones):
+            duracion = rnd.choice(duraciones)
+            holgura = max(0.0, (hora_max - hora_min - duracion) * (1 - densidad))
+            inicio = hora_min + int(rnd.uniform(0, holgura) / paso + 0.5) * paso
+            cantidad = min(rnd.choice(dias_por_seccion), len(dias))
+            filas.append({
+                'materia': nombre,
+                'seccion': f"{j + 1:02d}",
+                'dias': sorted(rnd.sample(dias, cantidad), key=DIAS.index),
+                'inicio': inicio,
+                'fin': inicio + duracion,
+            })
+    return filas
+
+def catalogo(filas):
+    """Catalogo en memoria con las filas dadas."""
+    resultado = Catalogo()
+    resultado.agregar_lote(filas)
+    return resultado
+
+def _hora_archivo(hora):
+    """8.5 -> '08:30 AM' (formato de los archivos JSON)."""
+    horas, minutos = int(hora), round((hora - int(hora)) * 60)
+    periodo = 'AM' if horas < 12 else 'PM'
+    return f"{(horas - 1) % 12 + 1:02d}:{minutos:02d} {periodo}"
+
+def _materias_archivo(filas):
+    """Materias con el formato de los archivos {codigo, nombre, seccion, horarios}."""
+    for fila in filas:
+        codigo, nombre = fila['materia'].split(' - ', 1)
+        yield {
+            'codigo': codigo,
+            'nombre': nombre,
+            'seccion': fila['seccion'],
+            'horarios': [
+                {'dia': _DIAS_ARCHIVO[dia], 'hora': f"{_hora_archivo(fila['inicio'])} / {_hora_archivo(fila['fin'])}"}
+                for dia in fila['dias']
+            ],
+        }
+
+def a_json(filas, por_bloque=500):
+    """Contenido (bytes) de un JSON por bloques {BLOQUE: {materias: [...]}}."""
+    materias = list(_materias_archivo(filas))
+    bloques = {
+        f"BLOQUE{k // por_bloque + 1}": {'materias': materias[k:k + por_bloque]}
+        for k in range(0, len(materias), por_bloque)
+    }
+    return json.dumps(bloques).encode('utf-8')
+
+def a_ndjson(filas):
+    """Contenido (bytes) de un NDJSON con una materia por línea."""
+    return ''.join(json.dumps(m) + '\n' for m in _materias_archivo(filas)).encode('utf-8')
+
+def _hora_chat(hora):
+    """14.5 -> '2:30pm' (como se escribe en el chat)."""
+    horas, minutos = int(hora), round((hora - int(hora)) * 60)
+    texto = str((horas - 1) % 12 + 1) + (f":{minutos:02d}" if minutos else '')
+    return texto + ('am' if horas < 12 else 'pm')
+
+def a_lineas_chat(filas):
+    """Una línea de lenguaje natural por fila, como las que recibe el chat."""
+    return [
+        f"Materia{fila['materia'][3:7]} {int(fila['seccion'])} {' '.join(d.lower() for d in fila['dias'])} "
+        f"{_hora_chat(fila['inicio'])} a {_hora_chat(fila['fin'])}"
+        for fila in filas
+    ]
@@ -0,0 +1,54 @@
+"""
+Benchmark de Memoria del Catálogo - SmartPlannerX
+Mide la memoria que ocupa un catálogo sintético de N secciones.
+
+Uso:
+    python -m benchmarks.memoria_catalogo [secciones]
+
+Equipo 3:
+- Cristian E. Sánchez R. (25-0688)
+- Hansel Augusto Pérez (25-0461)
+- Lia De Oleo (25-0673)
+- Juan José Cruz Romero (25-0888)
+- Samir Gonzalez (25-0808)
+- Alejandro Bruno (25-0947)
+- Daniel Osvaldo Lopez (25-0655)
+"""
+
+import json
+import sys
+import tracemalloc
+
+from benchmarks import catalogo_sintetico
+from src.logic import Catalogo
+
+def filas_sinteticas(secciones, por_materia=8, semilla=0):
+    """
+    Filas de importación con la forma de un export real: 'por_materia'
+    secciones por materia y combinaciones de días y horas repetidas.
+    """
+    return catalogo_sintetico.generar_filas(
+        materias=-(-secciones // por_materia), secciones=por_materia, dias=catalogo_sintetico.DIAS,
+        dias_por_seccion=(1, 2, 2, 3), hora_min=7, hora_max=24, duraciones=(1, 1.5, 2, 3),
+        densidad=0.0, semilla=semilla,
+    )[:secciones]
+
+def medir(secciones):
+    """Bytes asignados (tracemalloc) por un catálogo con 'secciones' secciones."""
+    filas = list(filas_sinteticas(secciones))
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    catalogo = Catalogo()
+    catalogo.agregar_lote(filas)
+    del filas
+    usado = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    return {
+        'secciones': secciones,
+        'bytes': usado,
+        'bytes_por_seccion': round(usado / secciones, 1),
+        'catalogo': len(catalogo),
+    }
+
+if __name__ == '__main__':
+    print(json.dumps(medir(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)))
@@ -0,0 +1,287 @@
+"""
+Suite de Benchmarks - SmartPlannerX
+Mide el generador de horarios, el conteo, la importación de archivos, el
+parser de lenguaje natural y la persistencia en SQLite sobre catálogos
+sintéticos, y guarda los resultados en JSON para comparar corridas.
+
+Uso:
+    python -m benchmarks.suite                        # todos los escenarios
+    python -m benchmarks.suite -e nocturno ingenieria # solo algunos
+    python -m benchmarks.suite --comparar benchmarks/resultados/anterior.json
+
+Equipo 3:
+- Cristian E. Sánchez R. (25-0688)
+- Hansel Augusto Pérez (25-0461)
+- Lia De Oleo (25-0673)
+- Juan José Cruz Romero (25-0888)
+- Samir Gonzalez (25-0808)
+- Alejandro Bruno (25-0947)
+- Daniel Osvaldo Lopez (25-0655)
+"""
+
+from itertools import islice
+import argparse
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks import catalogo_sintetico
+from benchmarks.memoria_catalogo import medir as medir_memoria
+from src.file_parser import FileParser
+from src.logic import Catalogo, GeneradorHorarios
+from src.parser import SmartParser
+from src.persistencia import AlmacenCatalogo
+
+# Escenarios: parámetros de catalogo_sintetico.generar_filas. Los dos primeros
+# imitan cargas reales; los 'escala_*' crecen en materias y secciones.
+ESCENARIOS = {
+    'nocturno': {
+        'materias': 4, 'secciones': 6, 'dias': catalogo_sintetico.DIAS[:5], 'dias_por_seccion': (1, 2),
+        'hora_min': 18, 'hora_max': 22, 'duraciones': (2,), 'densidad': 0.0, 'paso': 2, 'semilla': 1,
+    },
+    'ingenieria': {
+        'materias': 7, 'secciones': 8, 'dias': catalogo_sintetico.DIAS[:5], 'dias_por_seccion': (2, 3),
+        'hora_min': 7, 'hora_max': 18, 'duraciones': (1.5, 2), 'densidad': 0.2, 'semilla': 2,
+    },
+    'sabatino': {
+        'materias': 5, 'secciones': 6, 'dias': ['Viernes', 'Sabado'], 'dias_por_seccion': (1,),
+        'hora_min': 8, 'hora_max': 20, 'duraciones': (3, 4), 'densidad': 0.0, 'semilla': 3,
+    },
+    'escala_8x10': {'materias': 8, 'secciones': 10, 'densidad': 0.3, 'semilla': 4},
+    'escala_9x10': {'materias': 9, 'secciones': 10, 'densidad': 0.3, 'semilla': 5},
+    'denso_8x10': {'materias': 8, 'secciones': 10, 'densidad': 0.5, 'semilla': 6},
+}
+
+# Tamaño (secciones) de los catálogos de importación, parser y memoria
+SECCIONES_IMPORTACION = 20000
+LINEAS_CHAT = 5000
+SECCIONES_MEMORIA = 100000
+SECCIONES_PERSISTENCIA = 50000
+
+# Tope de horarios enumerados por operación (los escenarios grandes tienen millones)
+MAX_SOLUCIONES = 200000
+
+def _medir(funcion, repeticiones, memoria):
+    """
+    Ejecuta funcion() 'repeticiones' veces y se queda con el menor tiempo. El
+    pico de memoria se mide aparte (tracemalloc hace más lento el código).
+
+    Returns:
+        tuple: (resultado de la última ejecución, segundos, pico en bytes o None)
+    """
+    mejor = None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        segundos = time.perf_counter() - inicio
+        mejor = segundos if mejor is None else min(mejor, segundos)
+
+    pico = None
+    if memoria:
+        tracemalloc.start()
+        funcion()
+        pico = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return resultado, mejor, pico
+
+def _registro(escenario, operacion, segundos, pico, **datos):
+    registro = {
+        'escenario': escenario, 'operacion': operacion,
+        'segundos': None if segundos is None else round(segundos, 6), 'pico_bytes': pico,
+    }
+    registro.update(datos)
+    return registro
+
+def _por_segundo(cantidad, segundos):
+    return round(cantidad / segundos, 1) if segundos > 0 else None
+
+def benchmark_generador(nombre, parametros, repeticiones=3, memoria=True):
+    """Generación (ambas estrategias), conteo exacto y mejores horarios de un escenario."""
+    materias = list(catalogo_sintetico.catalogo(catalogo_sintetico.generar_filas(**parametros)))
+    resultados = []
+
+    for estrategia in GeneradorHorarios.ESTRATEGIAS:
+        def enumerar():
+            generador = GeneradorHorarios(materias, estrategia)
+            soluciones = sum(1 for _ in islice(generador.iter_soluciones(), MAX_SOLUCIONES))
+            return soluciones, generador.nodos_explorados
+
+        (soluciones, nodos), segundos, pico = _medir(enumerar, repeticiones, memoria)
+        resultados.append(_registro(
+            nombre, f'generar_{estrategia}', segundos, pico,
+            soluciones=soluciones, truncado=soluciones == MAX_SOLUCIONES, nodos=nodos,
+            soluciones_por_segundo=_por_segundo(soluciones, segundos),
+        ))
+
+    generador = GeneradorHorarios(materias)
+    validas, segundos, pico = _medir(generador.contar_validas, repeticiones, memoria)
+    resultados.append(_registro(
+        nombre, 'contar_validas', segundos, pico,
+        validas=validas, teoricas=generador.calcular_combinaciones_teoricas(),
+    ))
+
+    for criterio in ('dias', 'huecos'):
+        def mejores():
+            generador = GeneradorHorarios(materias)
+            generador.mejores(10, criterio)
+            return generador.nodos_explorados, generador.podas
+
+        (nodos, podas), segundos, pico = _medir(mejores, repeticiones, memoria)
+        resultados.append(_registro(nombre, f'mejores_{criterio}', segundos, pico, nodos=nodos, podas=podas))
+
+    return resultados
+
+def benchmark_importacion(secciones=SECCIONES_IMPORTACION, repeticiones=3, memoria=True):
+    """Importación de un JSON por bloques y de un NDJSON hasta el catálogo."""
+    filas = catalogo_sintetico.generar_filas(materias=secciones // 10, secciones=10, semilla=7)
+    resultados = []
+    for formato, contenido, lector in (
+            ('json', catalogo_sintetico.a_json(filas), FileParser.iter_json),
+            ('ndjson', catalogo_sintetico.a_ndjson(filas), FileParser.iter_ndjson)):
+        def importar():
+            return Catalogo().agregar_lote(lector(io.BytesIO(contenido)))[0]
+
+        agregadas, segundos, pico = _medir(importar, repeticiones, memoria)
+        resultados.append(_registro(
+            'importacion', f'importar_{formato}', segundos, pico,
+            filas=agregadas, bytes=len(contenido), filas_por_segundo=_por_segundo(agregadas, segundos),
+        ))
+    return resultados
+
+def benchmark_parser(lineas=LINEAS_CHAT, repeticiones=3, memoria=True):
+    """Parser de lenguaje natural sobre un lote de líneas de chat."""
+    filas = catalogo_sintetico.generar_filas(materias=lineas // 5, secciones=5, semilla=8)
+    texto = catalogo_sintetico.a_lineas_chat(filas)
+    resultado, segundos, pico = _medir(lambda: SmartParser.parse_lote(texto), repeticiones, memoria)
+    validas = sum(1 for _, r in resultado if r.get('success'))
+    return [_registro(
+        'chat', 'parse_lote', segundos, pico,
+        lineas=len(texto), validas=validas, lineas_por_segundo=_por_segundo(len(texto), segundos),
+    )]
+
+def benchmark_persistencia(secciones=SECCIONES_PERSISTENCIA, repeticiones=3, memoria=True):
+    """Guardado del snapshot y carga de un catálogo en SQLite, con el tamaño de la base."""
+    filas = catalogo_sintetico.generar_filas(materias=secciones // 10, secciones=10, semilla=9)
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, 'catalogo.sqlite3')
+        almacen = AlmacenCatalogo(ruta)
+        almacen.cargar('benchmark').agregar_lote(filas)
+        _, guardar, pico_guardar = _medir(lambda: almacen.guardar('benchmark'), repeticiones, memoria)
+        almacen.cerrar() # Al cerrar, el WAL se vuelca en la base
+        tamano = os.path.getsize(ruta)
+
+        def cargar():
+            otro = AlmacenCatalogo(ruta)
+            try:
+                return sum(len(m) for m in otro.cargar('benchmark'))
+            finally:
+                otro.cerrar()
+
+        cargadas, segundos, pico = _medir(cargar, repeticiones, memoria)
+
+    return [
+        _registro('persistencia', 'guardar_snapshot', guardar, pico_guardar, secciones=secciones, bytes=tamano),
+        _registro(
+            'persistencia', 'cargar_snapshot', segundos, pico,
+            secciones=cargadas, bytes=tamano, secciones_por_segundo=_por_segundo(cargadas, segundos),
+        ),
+    ]
+
+def benchmark_memoria(secciones=SECCIONES_MEMORIA):
+    """
+    Memoria retenida por un catálogo grande (ver benchmarks/memoria_catalogo.py).
+    No se registra tiempo: la medición corre bajo tracemalloc.
+    """
+    medicion = medir_memoria(secciones)
+    return [_registro(
+        'memoria', 'catalogo', None, medicion['bytes'],
+        secciones=secciones, bytes_por_seccion=medicion['bytes_por_seccion'],
+    )]
+
+def ejecutar(escenarios=None, repeticiones=3, memoria=True):
+    """Corre los escenarios indicados (todos por defecto) y los benchmarks de E/S."""
+    resultados = []
+    for nombre in escenarios or ESCENARIOS:
+        resultados.extend(benchmark_generador(nombre, ESCENARIOS[nombre], repeticiones, memoria))
+    if not escenarios:
+        resultados.extend(benchmark_importacion(repeticiones=repeticiones, memoria=memoria))
+        resultados.extend(benchmark_parser(repeticiones=repeticiones, memoria=memoria))
+        resultados.extend(benchmark_persistencia(repeticiones=repeticiones, memoria=memoria))
+        if memoria:
+            resultados.extend(benchmark_memoria())
+    return {
+        'fecha': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'repeticiones': repeticiones,
+        'resultados': resultados,
+    }
+
+def comparar(actual, anterior, umbral=1.25):
+    """
+    Compara dos corridas operación por operación.
+
+    Returns:
+        list: (escenario, operacion, medida, antes, ahora, razón) de las
+        operaciones cuyo tiempo ('segundos') o pico de memoria ('pico_bytes')
+        creció más de 'umbral' veces.
+    """
+    previos = {(r['escenario'], r['operacion']): r for r in anterior['resultados']}
+    regresiones = []
+    for r in actual['resultados']:
+        previo = previos.get((r['escenario'], r['operacion']))
+        if not previo:
+            continue
+        for medida in ('segundos', 'pico_bytes'):
+            antes, ahora = previo.get(medida), r.get(medida)
+            if not antes or ahora is None:
+                continue
+            razon = ahora / antes
+            print(f"{r['escenario']:>14} {r['operacion']:<26} {medida:<10} {antes:>14.4f} -> {ahora:>14.4f}  x{razon:.2f}")
+            if razon > umbral:
+                regresiones.append((r['escenario'], r['operacion'], medida, antes, ahora, razon))
+    return regresiones
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmarks de SmartPlannerX')
+    parser.add_argument('-e', '--escenarios', nargs='+', choices=sorted(ESCENARIOS),
+                        help='Escenarios del generador (por defecto todos, más importación, chat, persistencia y memoria)')
+    parser.add_argument('-r', '--repeticiones', type=int, default=3)
+    parser.add_argument('--sin-memoria', action='store_true', help='No medir picos de memoria (más rápido)')
+    parser.add_argument('-o', '--salida', help='Archivo JSON de resultados (por defecto benchmarks/resultados/<fecha>.json)')
+    parser.add_argument('--comparar', help='Resultados anteriores con los que comparar')
+    parser.add_argument('--umbral', type=float, default=1.25,
+                        help='Razón de tiempo o memoria a partir de la cual hay regresión')
+    args = parser.parse_args(argv)
+
+    informe = ejecutar(args.escenarios, args.repeticiones, not args.sin_memoria)
+
+    salida = args.salida or os.path.join(
+        os.path.dirname(__file__), 'resultados', time.strftime('%Y%m%d-%H%M%S') + '.json')
+    directorio = os.path.dirname(salida)
+    if directorio:
+        os.makedirs(directorio, exist_ok=True)
+    with open(salida, 'w', encoding='utf-8') as f:
+        json.dump(informe, f, indent=2, ensure_ascii=False)
+
+    for r in informe['resultados']:
+        tiempo = '-' if r['segundos'] is None else f"{r['segundos']:.4f}s"
+        print(f"{r['escenario']:>14} {r['operacion']:<26} {tiempo:>10} {r['pico_bytes'] or 0:>12} B")
+    print(f"Resultados en {salida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as f:
+            regresiones = comparar(informe, json.load(f), args.umbral)
+        for escenario, operacion, medida, antes, ahora, razon in regresiones:
+            print(f"REGRESIÓN {escenario}/{operacion} ({medida}): {antes:.4f} -> {ahora:.4f} (x{razon:.2f})")
+        if regresiones:
+            return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
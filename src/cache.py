@@ -0,0 +1,93 @@
+"""
+Caché de Resultados - SmartPlannerX
+Guarda respuestas de generación de horarios para selecciones repetidas.
+
+Equipo 3:
+- Cristian E. Sánchez R. (25-0688)
+- Hansel Augusto Pérez (25-0461)
+- Lia De Oleo (25-0673)
+- Juan José Cruz Romero (25-0888)
+- Samir Gonzalez (25-0808)
+- Alejandro Bruno (25-0947)
+- Daniel Osvaldo Lopez (25-0655)
+"""
+
+from collections import OrderedDict
+import hashlib
+import json
+import threading
+
+def clave_seleccion(uuids, opciones=None):
+    """
+    Genera una clave canónica para una selección de secciones: el mismo conjunto
+    de UUIDs produce la misma clave sin importar el orden ni los duplicados.
+    'opciones' (estrategia, paginación, ranking...) forma parte de la clave.
+    """
+    canonico = json.dumps([sorted(set(uuids)), opciones or {}], sort_keys=True)
+    return hashlib.sha256(canonico.encode('utf-8')).hexdigest()
+
+class CacheResultados:
+    """
+    Caché LRU acotada por número de entradas y por bytes.
+
+    Cada entrada se guarda junto con la versión del catálogo vigente; al llamar
+    a invalidar() la versión aumenta y las entradas anteriores dejan de servirse.
+    """
+    def __init__(self, max_entradas=256, max_bytes=64 * 1024 * 1024):
+        self.max_entradas = max_entradas
+        self.max_bytes = max_bytes
+        self.version = 0
+        self.aciertos = 0
+        self.fallos = 0
+        self.bytes = 0
+        self._entradas = OrderedDict() # clave -> (version, valor)
+        self._lock = threading.Lock()
+
+    def obtener(self, clave):
+        """
+        Devuelve el valor guardado para la clave o None si no está (o es de una
+        versión anterior del catálogo). Un acierto marca la entrada como reciente.
+        """
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is None or entrada[0] != self.version:
+                self.fallos += 1
+                return None
+            self._entradas.move_to_end(clave)
+            self.aciertos += 1
+            return entrada[1]
+
+    def guardar(self, clave, valor):
+        """
+        Guarda un valor (bytes) y desaloja las entradas menos usadas hasta
+        respetar los límites. Los valores más grandes que el límite no se guardan.
+        """
+        if len(valor) > self.max_bytes:
+            return
+        with self._lock:
+            anterior = self._entradas.pop(clave, None)
+            if anterior is not None:
+                self.bytes -= len(anterior[1])
+            self._entradas[clave] = (self.version, valor)
+            self.bytes += len(valor)
+            while len(self._entradas) > self.max_entradas or self.bytes > self.max_bytes:
+                _, (_, desalojado) = self._entradas.popitem(last=False)
+                self.bytes -= len(desalojado)
+
+    def invalidar(self):
+        """Aumenta la versión del catálogo y descarta las entradas existentes."""
+        with self._lock:
+            self.version += 1
+            self._entradas.clear()
+            self.bytes = 0
+
+    def estadisticas(self):
+        """Resumen observable del estado de la caché."""
+        with self._lock:
+            return {
+                'version': self.version,
+                'entradas': len(self._entradas),
+                'bytes': self.bytes,
+                'aciertos': self.aciertos,
+                'fallos': self.fallos,
+            }
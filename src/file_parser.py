@@ -12,10 +12,85 @@ Equipo 3:
 - Daniel Osvaldo Lopez (25-0655)
 """
 
+import codecs
 import json
 import openpyxl
 from datetime import datetime
+from functools import lru_cache
 import re
+import sys
+
+# Patrones compilados una sola vez (no por fila)
+# Formato: HH:MM AM/PM / HH:MM AM/PM
+_PATRON_RANGO = re.compile(r'(\d{1,2}):(\d{2})\s*(AM|PM)\s*/\s*(\d{1,2}):(\d{2})\s*(AM|PM)', re.IGNORECASE)
+_PATRON_MARCADORES = re.compile(r'\[ASINCRÓNICA 100%\]|VIRTUAL|\[HÍBRIDA SINCRÓNICA/ASINCRÓNO 100%\]')
+
+_DIAS_MAP = {
+    'LUNES': 'Lunes',
+    'MARTES': 'Martes',
+    'MIERCOLES': 'Miercoles',
+    'MIÉRCOLES': 'Miercoles',
+    'JUEVES': 'Jueves',
+    'VIERNES': 'Viernes',
+    'SABADO': 'Sabado',
+    'SÁBADO': 'Sabado',
+    'DOMINGO': 'Domingo'
+}
+
+
+class _FlujoJSON:
+    """
+    Lee valores JSON de un flujo de texto por partes: solo pide más datos al
+    flujo cuando el valor actual todavía no está completo en el buffer.
+    """
+
+    def __init__(self, reader, chunk_size):
+        self.reader = reader
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ''
+        self.pos = 0
+
+    def _leer_mas(self):
+        """Agrega otro bloque al buffer descartando lo ya consumido. False al final del flujo."""
+        chunk = self.reader.read(max(self.chunk_size, len(self.buffer) - self.pos))
+        if not chunk:
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def siguiente(self):
+        """Salta espacios y devuelve el próximo carácter sin consumirlo ('' al final)."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos].isspace():
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._leer_mas():
+                return ''
+
+    def esperar(self, caracter):
+        """Consume el carácter indicado o lanza JSONDecodeError."""
+        if self.siguiente() != caracter:
+            raise json.JSONDecodeError(f"Se esperaba '{caracter}'", self.buffer, self.pos)
+        self.pos += 1
+
+    def valor(self):
+        """Decodifica y consume el próximo valor JSON completo."""
+        self.siguiente()
+        while True:
+            try:
+                valor, fin = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self._leer_mas():
+                    raise
+                continue
+            # Un número al final del buffer podría continuar en el próximo bloque
+            if fin == len(self.buffer) and self._leer_mas():
+                continue
+            self.pos = fin
+            return valor
 
 
 class FileParser:
@@ -41,62 +116,172 @@ class FileParser:
                     continue
 
                 for materia in bloque_data['materias']:
-                    codigo = materia.get('codigo', '')
-                    nombre = materia.get('nombre', 'Sin Nombre')
-                    seccion = materia.get('seccion', '01')
-                    horarios = materia.get('horarios', [])
+                    materias_parsed.extend(FileParser._filas_materia(materia))
 
-                    # Nombre completo: Código + Nombre
-                    nombre_completo = f"{codigo} - {nombre}" if codigo else nombre
+            return {'success': True, 'materias': materias_parsed, 'count': len(materias_parsed)}
 
-                    # Procesar cada horario
-                    for horario in horarios:
-                        dia = horario.get('dia', '')
-                        hora_str = horario.get('hora', '')
+        except json.JSONDecodeError as e:
+            return {'success': False, 'error': f'Error al parsear JSON: {str(e)}'}
+        except Exception as e:
+            return {'success': False, 'error': f'Error inesperado: {str(e)}'}
 
-                        # Saltar si no hay información válida
-                        if not dia or not hora_str or '------' in hora_str:
-                            continue
+    @staticmethod
+    def iter_json(stream, chunk_size=64 * 1024):
+        """
+        Recorre un JSON {BLOQUE_ID: {materias: [...]}} bloque por bloque desde un
+        flujo binario (p. ej. el archivo subido) y produce cada fila parseada sin
+        cargar el documento completo: en memoria solo está el bloque actual.
 
-                        # Limpiar hora de marcadores especiales
-                        hora_str = hora_str.replace('[ASINCRÓNICA 100%]', '').strip()
-                        hora_str = hora_str.replace('VIRTUAL', '').strip()
-                        hora_str = hora_str.replace('[HÍBRIDA SINCRÓNICA/ASINCRÓNO 100%]', '').strip()
+        Yields:
+            dict: Fila con formato {materia, seccion, dias, inicio, fin}
 
-                        # Extraer horas
-                        inicio, fin = FileParser._parse_time_range(hora_str)
-                        if inicio is None or fin is None:
-                            continue
+        Raises:
+            json.JSONDecodeError: Si el contenido no es JSON válido.
+        """
+        flujo = _FlujoJSON(codecs.getreader('utf-8')(stream), chunk_size)
 
-                        # Mapear día
-                        dias = [FileParser._normalize_day(dia)]
+        flujo.esperar('{')
+        if flujo.siguiente() == '}':
+            return
 
-                        materias_parsed.append({
-                            'materia': nombre_completo,
-                            'seccion': str(seccion),
-                            'dias': dias,
-                            'inicio': inicio,
-                            'fin': fin
-                        })
+        while True:
+            flujo.valor()  # BLOQUE_ID
+            flujo.esperar(':')
+            bloque_data = flujo.valor()
 
-            return {'success': True, 'materias': materias_parsed, 'count': len(materias_parsed)}
+            if 'materias' in bloque_data:
+                for materia in bloque_data['materias']:
+                    yield from FileParser._filas_materia(materia)
 
-        except json.JSONDecodeError as e:
-            return {'success': False, 'error': f'Error al parsear JSON: {str(e)}'}
-        except Exception as e:
-            return {'success': False, 'error': f'Error inesperado: {str(e)}'}
+            if flujo.siguiente() != ',':
+                flujo.esperar('}')
+                return
+            flujo.esperar(',')
+
+    @staticmethod
+    def iter_ndjson(stream):
+        """
+        Recorre un archivo NDJSON con una materia por línea (mismo formato que
+        los elementos de 'materias' en el JSON por bloques).
+
+        Yields:
+            dict: Fila con formato {materia, seccion, dias, inicio, fin}
+
+        Raises:
+            json.JSONDecodeError: Si alguna línea no es JSON válido.
+        """
+        for linea in codecs.getreader('utf-8')(stream):
+            if linea.strip():
+                yield from FileParser._filas_materia(json.loads(linea))
+
+    @staticmethod
+    def combinar_dias(filas):
+        """
+        Une en una sola fila las filas de una misma sección que solo difieren en
+        el día: se agrupan por (materia, seccion, inicio, fin) en una pasada con un
+        diccionario y se conserva el orden de aparición de secciones y días.
+
+        Returns:
+            list: Filas con formato {materia, seccion, dias, inicio, fin}
+        """
+        grupos = {}
+        for fila in filas:
+            clave = (fila['materia'], fila['seccion'], fila['inicio'], fila['fin'])
+            grupo = grupos.get(clave)
+            if grupo is None:
+                grupos[clave] = dict(fila, dias=list(fila['dias']))
+                continue
+            for dia in fila['dias']:
+                if dia not in grupo['dias']:
+                    grupo['dias'].append(dia)
+        return list(grupos.values())
+
+    @staticmethod
+    def _filas_materia(materia):
+        """
+        Convierte una materia del JSON ({codigo, nombre, seccion, horarios}) en
+        filas, una por sección y rango horario, con todos sus días combinados.
+        """
+        return FileParser.combinar_dias(FileParser._filas_horarios(materia))
+
+    @staticmethod
+    def _filas_horarios(materia):
+        """Una fila por cada horario válido de una materia del JSON."""
+        codigo = materia.get('codigo', '')
+        nombre = materia.get('nombre', 'Sin Nombre')
+        seccion = materia.get('seccion', '01')
+        horarios = materia.get('horarios', [])
+
+        # Nombre completo: Código + Nombre (internado: filas iguales comparten el string)
+        nombre_completo = sys.intern(f"{codigo} - {nombre}" if codigo else nombre)
+
+        # Procesar cada horario
+        for horario in horarios:
+            dia = horario.get('dia', '')
+            hora_str = horario.get('hora', '')
+
+            # Saltar si no hay información válida
+            if not dia or not hora_str or '------' in hora_str:
+                continue
+
+            # Limpiar hora de marcadores especiales y extraer horas
+            inicio, fin = FileParser._parse_hora_json(hora_str)
+            if inicio is None or fin is None:
+                continue
+
+            # Mapear día (lista compartida entre filas con el mismo día)
+            dias = FileParser._dias(dia)
+
+            yield {
+                'materia': nombre_completo,
+                'seccion': sys.intern(str(seccion)),
+                'dias': dias,
+                'inicio': inicio,
+                'fin': fin
+            }
 
     @staticmethod
     def parse_excel(file_path):
         """
         Parsea un archivo Excel con horarios universitarios.
+        'file_path' puede ser una ruta o un objeto tipo archivo (p. ej. io.BytesIO).
 
         Returns:
             list: Lista de diccionarios con formato {materia, seccion, dias, inicio, fin}
         """
         try:
-            wb = openpyxl.load_workbook(file_path, data_only=True)
-            materias_parsed = []
+            materias_parsed = list(FileParser.iter_excel(file_path))
+
+            if not materias_parsed:
+                return {'success': False, 'error': 'No se encontraron datos válidos en el archivo Excel'}
+
+            return {'success': True, 'materias': materias_parsed, 'count': len(materias_parsed)}
+
+        except Exception as e:
+            return {'success': False, 'error': f'Error al leer Excel: {str(e)}'}
+
+    @staticmethod
+    def iter_excel(source):
+        """
+        Recorre un Excel en modo de solo lectura, sin cargar el modelo completo de
+        celdas en memoria, y produce una fila por sección con sus días combinados.
+        Como los días de una sección pueden estar en cualquier parte de la hoja,
+        las secciones se emiten al terminar la lectura.
+        'source' puede ser una ruta o un objeto tipo archivo (p. ej. io.BytesIO).
+
+        Yields:
+            dict: Fila con formato {materia, seccion, dias, inicio, fin}
+
+        Raises:
+            Exception: Si el archivo no se puede abrir como Excel.
+        """
+        yield from FileParser.combinar_dias(FileParser._filas_excel(source))
+
+    @staticmethod
+    def _filas_excel(source):
+        """Una fila por cada (materia, sección, día, horario) válido del Excel."""
+        wb = openpyxl.load_workbook(source, read_only=True, data_only=True)
+        try:
             processed = set()  # Evitar duplicados
 
             # Intentar leer de la hoja "Resumen General" primero
@@ -106,21 +291,20 @@ class FileParser:
                 if sheet_name not in wb.sheetnames:
                     continue
 
-                ws = wb[sheet_name]
+                rows = wb[sheet_name].iter_rows(values_only=True)
 
-                # Buscar fila de encabezados
-                header_row = None
-                for idx, row in enumerate(ws.iter_rows(min_row=1, max_row=10), start=1):
-                    row_values = [str(cell.value).lower() if cell.value else '' for cell in row]
+                # Buscar fila de encabezados (entre las primeras 10)
+                headers = None
+                for _, row in zip(range(10), rows):
+                    row_values = [str(value).lower() if value else '' for value in row]
                     if 'codigo' in row_values or 'materia' in row_values:
-                        header_row = idx
+                        headers = row_values
                         break
 
-                if not header_row:
+                if not headers:
                     continue
 
                 # Mapear columnas
-                headers = [str(cell.value).lower() if cell.value else '' for cell in ws[header_row]]
                 col_map = {}
                 for i, header in enumerate(headers):
                     if 'codigo' in header or 'código' in header:
@@ -139,20 +323,21 @@ class FileParser:
                 if not all(col in col_map for col in required):
                     continue
 
-                # Leer datos
-                for row in ws.iter_rows(min_row=header_row + 1):
+                # Leer datos (el iterador continúa después de los encabezados)
+                found = False
+                for row in rows:
                     try:
-                        codigo = str(row[col_map.get('codigo', 0)].value or '').strip()
-                        materia = str(row[col_map['materia']].value or '').strip()
-                        seccion = str(row[col_map.get('seccion', 0)].value or '01').strip()
-                        dia = str(row[col_map['dia']].value or '').strip()
-                        horario = str(row[col_map['horario']].value or '').strip()
+                        codigo = str(row[col_map.get('codigo', 0)] or '').strip()
+                        materia = str(row[col_map['materia']] or '').strip()
+                        seccion = str(row[col_map.get('seccion', 0)] or '01').strip()
+                        dia = str(row[col_map['dia']] or '').strip()
+                        horario = str(row[col_map['horario']] or '').strip()
 
                         if not materia or not dia or not horario:
                             continue
 
                         # Nombre completo
-                        nombre_completo = f"{codigo} - {materia}" if codigo else materia
+                        nombre_completo = sys.intern(f"{codigo} - {materia}" if codigo else materia)
 
                         # Crear clave única para evitar duplicados
                         key = f"{nombre_completo}|{seccion}|{dia}|{horario}"
@@ -165,50 +350,41 @@ class FileParser:
                         if inicio is None or fin is None:
                             continue
 
-                        # Normalizar día
-                        dias = [FileParser._normalize_day(dia)]
+                        # Normalizar día (lista compartida entre filas con el mismo día)
+                        dias = FileParser._dias(dia)
 
-                        materias_parsed.append({
-                            'materia': nombre_completo,
-                            'seccion': seccion,
-                            'dias': dias,
-                            'inicio': inicio,
-                            'fin': fin
-                        })
-
-                    except Exception as e:
+                    except Exception:
                         continue  # Saltar filas con errores
 
+                    found = True
+                    yield {
+                        'materia': nombre_completo,
+                        'seccion': sys.intern(seccion),
+                        'dias': dias,
+                        'inicio': inicio,
+                        'fin': fin
+                    }
+
                 # Si encontramos datos, no seguir buscando en otras hojas
-                if materias_parsed:
+                if found:
                     break
 
+        finally:
             wb.close()
 
-            if not materias_parsed:
-                return {'success': False, 'error': 'No se encontraron datos válidos en el archivo Excel'}
-
-            return {'success': True, 'materias': materias_parsed, 'count': len(materias_parsed)}
-
-        except Exception as e:
-            return {'success': False, 'error': f'Error al leer Excel: {str(e)}'}
-
     @staticmethod
+    @lru_cache(maxsize=4096)
     def _parse_time_range(time_str):
         """
         Parsea un rango de tiempo del formato "05:00 PM / 08:00 PM" o "5:00 PM / 8:00 PM"
+        Los resultados se memorizan: un archivo real repite pocas decenas de rangos.
 
         Returns:
             tuple: (inicio_float, fin_float) o (None, None) si falla
         """
         try:
-            # Remover espacios extras y texto adicional
-            time_str = time_str.strip()
-
             # Buscar patrón de hora
-            # Formato: HH:MM AM/PM / HH:MM AM/PM
-            pattern = r'(\d{1,2}):(\d{2})\s*(AM|PM)\s*/\s*(\d{1,2}):(\d{2})\s*(AM|PM)'
-            match = re.search(pattern, time_str, re.IGNORECASE)
+            match = _PATRON_RANGO.search(time_str)
 
             if not match:
                 return None, None
@@ -223,6 +399,12 @@ class FileParser:
         except Exception:
             return None, None
 
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _parse_hora_json(hora_str):
+        """Quita los marcadores de modalidad del JSON y parsea el rango horario."""
+        return FileParser._parse_time_range(_PATRON_MARCADORES.sub('', hora_str).strip())
+
     @staticmethod
     def _time_to_float(hours, minutes, ampm):
         """
@@ -244,6 +426,7 @@ class FileParser:
         return hours + (minutes / 60.0)
 
     @staticmethod
+    @lru_cache(maxsize=256)
     def _normalize_day(day_str):
         """
         Normaliza el nombre del día al formato usado en el sistema.
@@ -251,17 +434,14 @@ class FileParser:
         Returns:
             str: Día normalizado
         """
-        day_map = {
-            'LUNES': 'Lunes',
-            'MARTES': 'Martes',
-            'MIERCOLES': 'Miercoles',
-            'MIÉRCOLES': 'Miercoles',
-            'JUEVES': 'Jueves',
-            'VIERNES': 'Viernes',
-            'SABADO': 'Sabado',
-            'SÁBADO': 'Sabado',
-            'DOMINGO': 'Domingo'
-        }
-
         day_str = day_str.upper().strip()
-        return day_map.get(day_str, day_str.capitalize())
+        return sys.intern(_DIAS_MAP.get(day_str, day_str.capitalize()))
+
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _dias(day_str):
+        """
+        Lista de días de una fila. Se devuelve siempre la misma lista para el mismo
+        día, así que no debe modificarse.
+        """
+        return [FileParser._normalize_day(day_str)]
@@ -12,34 +12,286 @@ Equipo 3:
 - Daniel Osvaldo Lopez (25-0655)
 """
 
-from itertools import product
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import count, product, repeat
 import copy
+import heapq
+import os
+import sys
+import threading
+import time
 import uuid
 
+# Días conocidos de la semana; cada uno ocupa un bloque de minutos en la máscara
+DIAS_SEMANA = ['Lunes', 'Martes', 'Miercoles', 'Jueves', 'Viernes', 'Sabado', 'Domingo']
+MINUTOS_DIA = 24 * 60
+
+_indices_dias = {dia: i for i, dia in enumerate(DIAS_SEMANA)}
+_dias_normalizados = {dia.lower(): dia for dia in DIAS_SEMANA}
+_SIN_TILDES = str.maketrans('áéíóú', 'aeiou')
+
+def normalizar_dia(dia):
+    """
+    Nombre del día como en DIAS_SEMANA, escrito con o sin tildes y con
+    cualquier combinación de mayúsculas (p. ej. 'MIÉRCOLES' -> 'Miercoles').
+
+    Raises:
+        ValueError: Si no es un día de la semana.
+    """
+    if isinstance(dia, str):
+        normalizado = _dias_normalizados.get(dia.strip().lower().translate(_SIN_TILDES))
+        if normalizado is not None:
+            return normalizado
+    raise ValueError(f'Día desconocido: {dia}')
+
+def _indice_dia(dia):
+    """
+    Devuelve la posición del día dentro de la máscara semanal. La tabla es
+    fija: los días se validan al crear la sección (ver normalizar_dia).
+
+    Raises:
+        ValueError: Si no es un día de DIAS_SEMANA.
+    """
+    indice = _indices_dias.get(dia)
+    if indice is None:
+        raise ValueError(f'Día desconocido: {dia}')
+    return indice
+
+@lru_cache(maxsize=4096)
+def _mascara(franja):
+    """
+    Codifica la franja (dias, inicio, fin) de una sección como un entero donde
+    cada bit es un minuto de la semana (día x minuto del día). Dos secciones
+    chocan si y solo si el AND de sus máscaras es distinto de cero.
+
+    Un catálogo repite pocos horarios distintos, así que el resultado se memoriza.
+    """
+    dias, inicio, fin = franja
+    inicio = max(0, inicio)
+    fin = min(MINUTOS_DIA, fin)
+    if fin <= inicio:
+        return 0
+
+    bloque = ((1 << (fin - inicio)) - 1) << inicio
+    mascara = 0
+    for dia in set(dias):
+        mascara |= bloque << (_indice_dia(dia) * MINUTOS_DIA)
+    return mascara
+
+_franjas = {} # (dias, inicio, fin) -> la misma tupla, compartida por las secciones
+
+def _franja(dias, inicio, fin):
+    """
+    Devuelve la franja horaria (dias, inicio, fin) de una sección, con los días
+    como tupla y las horas en minutos del día. Las franjas son inmutables e
+    internadas: un catálogo grande repite pocas combinaciones, así que todas las
+    secciones con el mismo horario comparten la misma tupla.
+    """
+    franja = (tuple(dias or ()), inicio, fin)
+    interna = _franjas.get(franja)
+    if interna is None:
+        for dia in franja[0]:
+            _indice_dia(dia) # Solo se guardan franjas con días válidos
+        interna = _franjas.setdefault(franja, franja)
+    return interna
+
+def _handle(uuid_seccion):
+    """Handle entero de una sección a partir de su UUID en texto, o None si no es válido."""
+    try:
+        hexadecimal = uuid_seccion.replace('-', '')
+        if len(hexadecimal) == 32:
+            return int(hexadecimal, 16)
+    except (AttributeError, ValueError):
+        pass
+    return None
+
+def _texto_uuid(handle):
+    """Inversa de _handle: el UUID en texto (8-4-4-4-12) de un handle."""
+    h = f"{handle:032x}"
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+def _bloques_dia(mascara):
+    """Recorre los bloques diarios no vacíos de una máscara semanal."""
+    bloque_dia = (1 << MINUTOS_DIA) - 1
+    while mascara:
+        bloque = mascara & bloque_dia
+        if bloque:
+            yield bloque
+        mascara >>= MINUTOS_DIA
+
+def evaluar_horario(criterio, mascara):
+    """
+    Métrica de un horario (dado por la unión de sus máscaras) según el criterio:
+    - 'dias': días con clase.
+    - 'huecos': minutos libres entre la primera y la última clase de cada día.
+    - 'inicio': hora de la clase más temprana de la semana.
+    - 'fin': hora de término de la clase más tardía de la semana.
+    """
+    if criterio == 'dias':
+        return sum(1 for _ in _bloques_dia(mascara))
+    if criterio == 'huecos':
+        total = 0
+        for bloque in _bloques_dia(mascara):
+            primero = (bloque & -bloque).bit_length() - 1
+            total += bloque.bit_length() - primero - bin(bloque).count('1')
+        return total
+    if criterio == 'inicio':
+        minutos = [(b & -b).bit_length() - 1 for b in _bloques_dia(mascara)]
+        return min(minutos, default=MINUTOS_DIA) / 60
+    if criterio == 'fin':
+        return max((b.bit_length() for b in _bloques_dia(mascara)), default=0) / 60
+    raise ValueError(f"Criterio desconocido: {criterio}")
+
+def _buscar_unidad(mascaras, prefijo):
+    """
+    Unidad de trabajo de la búsqueda en paralelo (se ejecuta en otro proceso).
+
+    'mascaras' contiene, por materia, las máscaras de sus secciones habilitadas y
+    'prefijo' fija los índices de sección de las primeras materias. Devuelve las
+    soluciones como tuplas de índices, en orden lexicográfico, y los nodos visitados.
+    """
+    ocupado = 0
+    for nivel, j in enumerate(prefijo):
+        ocupado |= mascaras[nivel][j]
+
+    soluciones = []
+    actual = list(prefijo)
+    nodos = 0
+
+    def recorrer(nivel, ocupado):
+        nonlocal nodos
+        nodos += 1
+        if nivel == len(mascaras):
+            soluciones.append(tuple(actual))
+            return
+        for j, mascara in enumerate(mascaras[nivel]):
+            if not (mascara & ocupado):
+                actual.append(j)
+                recorrer(nivel + 1, ocupado | mascara)
+                actual.pop()
+
+    recorrer(len(prefijo), ocupado)
+    return soluciones, nodos
+
 class Seccion:
     """
     Representa una sección de una materia con sus horarios.
+
+    El identificador interno es un entero de 128 bits ('handle'); el UUID en
+    texto solo se arma en la API. Días y horas (en minutos) forman una franja
+    compartida con las demás secciones del mismo horario.
+
+    Dentro de una Materia las secciones se guardan por columnas; las que
+    devuelve Materia.secciones son copias, y los cambios se hacen a través de
+    la materia o del Catalogo.
     """
-    def __init__(self, id_seccion, dias, hora_inicio, hora_fin):
-        self.uuid = str(uuid.uuid4()) # Identificador único interno
-        self.id_seccion = id_seccion
-        self.dias = dias  # Lista de strings: ["Lunes", "Miercoles"]
-        self.hora_inicio = hora_inicio # Entero 0-23
-        self.hora_fin = hora_fin # Entero 0-23
+    __slots__ = ('handle', 'id_seccion', 'franja', 'mascara', 'enabled')
+
+    def __init__(self, id_seccion, dias, hora_inicio, hora_fin, uuid_seccion=None):
+        if uuid_seccion is None:
+            self.handle = uuid.uuid4().int # Identificador único interno
+        else:
+            self.handle = _handle(uuid_seccion)
+            if self.handle is None:
+                raise ValueError(f"UUID de sección inválido: {uuid_seccion}")
+        self.id_seccion = sys.intern(id_seccion) if isinstance(id_seccion, str) else id_seccion
+        self.franja = _franja(dias, round(hora_inicio * 60), round(hora_fin * 60))
+        self.mascara = _mascara(self.franja) # Minutos ocupados en la semana
         self.enabled = True # Nuevo: Para selección manual
 
+    @classmethod
+    def _copia(cls, handle, id_seccion, franja, enabled):
+        """Arma una sección a partir de las columnas de una Materia."""
+        seccion = cls.__new__(cls)
+        seccion.handle = handle
+        seccion.id_seccion = id_seccion
+        seccion.franja = franja
+        seccion.mascara = _mascara(franja)
+        seccion.enabled = enabled
+        return seccion
+
+    @property
+    def uuid(self):
+        """UUID de la sección en texto (representación de la API)."""
+        return _texto_uuid(self.handle)
+
+    @property
+    def dias(self):
+        """Tupla de strings: ("Lunes", "Miercoles")"""
+        return self.franja[0]
+
+    @property
+    def inicio(self):
+        """Minuto del día en que empieza la sección."""
+        return self.franja[1]
+
+    @property
+    def fin(self):
+        """Minuto del día en que termina la sección."""
+        return self.franja[2]
+
+    @property
+    def hora_inicio(self):
+        """Hora de inicio en horas (14.5 = 2:30pm)."""
+        return self.franja[1] / 60
+
+    @property
+    def hora_fin(self):
+        """Hora de fin en horas."""
+        return self.franja[2] / 60
+
+    @classmethod
+    def desde_datos(cls, data):
+        """
+        Crea una sección a partir de un diccionario {materia, seccion, dias, inicio, fin}
+        (formulario, chat o fila de archivo) validando sus valores.
+
+        Los días se normalizan con normalizar_dia().
+
+        Raises:
+            ValueError: Si las horas o los días no son válidos o faltan datos.
+        """
+        try:
+            inicio = float(data.get('inicio'))
+            fin = float(data.get('fin'))
+        except (ValueError, TypeError):
+            raise ValueError('Horas inválidas')
+
+        id_sec = str(data.get('seccion'))
+        if not data.get('materia') or not id_sec:
+            raise ValueError('Faltan datos')
+
+        if inicio >= fin:
+            raise ValueError('La hora de inicio debe ser menor a la de fin')
+
+        dias = data.get('dias') or []
+        if not isinstance(dias, (list, tuple)):
+            raise ValueError('Los días deben ser una lista')
+        if not all(isinstance(dia, str) and dia in _indices_dias for dia in dias):
+            dias = [normalizar_dia(dia) for dia in dias]
+
+        return cls(id_sec, dias, inicio, fin)
+
     def choca_con(self, otra_seccion):
         """
         Verifica si esta sección se solapa en horario con otra.
+        Equivale a comparar días comunes y (StartA < EndB) y (StartB < EndA),
+        pero resuelto con un solo AND sobre las máscaras precalculadas.
         """
-        # Verificar intersección de días
-        dias_comunes = set(self.dias) & set(otra_seccion.dias)
-        if not dias_comunes:
-            return False
-        
-        # Si hay días comunes, verificar horas
-        # Chocan si (StartA < EndB) y (StartB < EndA)
-        return (self.hora_inicio < otra_seccion.hora_fin) and (otra_seccion.hora_inicio < self.hora_fin)
+        return (self.mascara & otra_seccion.mascara) != 0
+
+    def __eq__(self, otra):
+        # Dos copias de la misma sección son iguales
+        if not isinstance(otra, Seccion):
+            return NotImplemented
+        return (self.handle, self.id_seccion, self.franja, self.enabled) == \
+            (otra.handle, otra.id_seccion, otra.franja, otra.enabled)
+
+    def __hash__(self):
+        return hash(self.handle)
 
     def __repr__(self):
         return f"Sec {self.id_seccion} ({','.join(self.dias)} {self.hora_inicio}-{self.hora_fin})"
@@ -47,10 +299,38 @@ class Seccion:
 class Materia:
     """
     Representa una materia que contiene múltiples secciones posibles.
+
+    Las secciones se guardan por columnas (struct-of-arrays): UUIDs de 16 bytes
+    en un bytearray, IDs y franjas en listas de objetos compartidos y el estado
+    habilitado en otro bytearray. Así una sección ocupa unas decenas de bytes en
+    lugar de un objeto Python completo, y buscar por UUID es un find() en C.
+
+    Los IDs duplicados se buscan en la lista mientras la materia tiene hasta
+    UMBRAL_INDICE_IDS secciones (lo normal); con más se arma un set para
+    validarlos en O(1). Un set por materia costaba más que las columnas.
     """
+    __slots__ = ('nombre', '_uuids', '_ids', '_ids_usados', '_franjas', '_habilitadas')
+    UMBRAL_INDICE_IDS = 64
+
     def __init__(self, nombre):
         self.nombre = nombre
-        self.secciones = []
+        self._uuids = bytearray() # 16 bytes por sección (handle en big-endian)
+        self._ids = []
+        self._ids_usados = None # set de IDs, solo en materias grandes
+        self._franjas = []
+        self._habilitadas = bytearray()
+
+    def __len__(self):
+        return len(self._ids)
+
+    @property
+    def secciones(self):
+        """Tupla con una copia de cada sección, en orden de inserción."""
+        uuids = self._uuids
+        return tuple(
+            Seccion._copia(int.from_bytes(uuids[16 * i:16 * i + 16], 'big'), id_seccion, franja, bool(enabled))
+            for i, (id_seccion, franja, enabled) in enumerate(zip(self._ids, self._franjas, self._habilitadas))
+        )
 
     def agregar_seccion(self, seccion):
         """
@@ -59,18 +339,338 @@ class Materia:
         Raises:
             ValueError: Si ya existe una sección con el mismo ID.
         """
-        for s in self.secciones:
-            if s.id_seccion == seccion.id_seccion:
-                raise ValueError(f"La sección {seccion.id_seccion} ya existe en la materia {self.nombre}.")
-        self.secciones.append(seccion)
+        if self.tiene_id(seccion.id_seccion):
+            raise ValueError(f"La sección {seccion.id_seccion} ya existe en la materia {self.nombre}.")
+        self._agregar(seccion)
+
+    def tiene_id(self, id_seccion):
+        """True si la materia ya tiene una sección con ese ID."""
+        if self._ids_usados is None:
+            if len(self._ids) <= self.UMBRAL_INDICE_IDS:
+                return id_seccion in self._ids
+            self._ids_usados = set(self._ids)
+        return id_seccion in self._ids_usados
+
+    def _agregar(self, seccion):
+        """Agrega la sección a las columnas, sin validar su ID."""
+        self._uuids += seccion.handle.to_bytes(16, 'big')
+        self._ids.append(seccion.id_seccion)
+        if self._ids_usados is not None:
+            self._ids_usados.add(seccion.id_seccion)
+        self._franjas.append(seccion.franja)
+        self._habilitadas.append(bool(seccion.enabled))
+
+    def _posicion(self, handle):
+        """Posición de la sección con ese handle, o -1."""
+        if handle is None:
+            return -1
+        clave = handle.to_bytes(16, 'big')
+        posicion = self._uuids.find(clave)
+        while posicion > 0 and posicion % 16:
+            # Coincidencia que cruza dos UUIDs: se sigue buscando
+            posicion = self._uuids.find(clave, posicion + 1)
+        return posicion // 16 if posicion >= 0 else -1
+
+    def buscar_seccion(self, uuid_seccion):
+        """Devuelve (una copia de) la sección con ese UUID, o None."""
+        i = self._posicion(_handle(uuid_seccion))
+        if i < 0:
+            return None
+        return Seccion._copia(
+            int.from_bytes(self._uuids[16 * i:16 * i + 16], 'big'),
+            self._ids[i], self._franjas[i], bool(self._habilitadas[i])
+        )
+
+    def habilitar_seccion(self, uuid_seccion, enabled):
+        """Habilita o deshabilita la sección con ese UUID. Devuelve True si existía."""
+        i = self._posicion(_handle(uuid_seccion))
+        if i < 0:
+            return False
+        self._habilitadas[i] = bool(enabled)
+        return True
+
+    def eliminar_seccion(self, uuid_seccion):
+        """
+        Elimina la sección con el UUID indicado.
+
+        Returns:
+            Seccion: La sección eliminada, o None si no pertenecía a la materia.
+        """
+        seccion = self.buscar_seccion(uuid_seccion)
+        if seccion is None:
+            return None
+        i = self._posicion(seccion.handle)
+        del self._uuids[16 * i:16 * i + 16]
+        if self._ids_usados is not None:
+            self._ids_usados.discard(self._ids[i])
+        del self._ids[i]
+        del self._franjas[i]
+        del self._habilitadas[i]
+        return seccion
+
+class Catalogo:
+    """
+    Almacén de materias con índice por nombre de materia. Los endpoints siempre
+    indican la materia, así que una sección se busca por su UUID solo entre las
+    secciones de esa materia (un find() sobre su columna de UUIDs); un índice
+    global por UUID ocupaba más memoria que las propias secciones. Se itera en
+    el orden en que se agregaron las materias.
+
+    Si se asigna 'registro' (una función registro(operacion, datos)), cada
+    modificación se notifica con datos serializables; así se lleva el log de
+    cambios persistente (ver src/persistencia.py). Con registrar=False una
+    modificación no se notifica (al reaplicar el propio log).
+
+    Cada modificación, con su registro, se hace con 'lock' tomado (un RLock;
+    el almacén pasa el suyo para que sus recargas no se mezclen con ellas).
+    Las lecturas no lo toman: reemplazar() cambia todo el contenido de una vez.
+    """
+    def __init__(self, registro=None, lock=None):
+        self._materias = {} # nombre -> Materia
+        self.registro = registro
+        self.lock = lock or threading.RLock()
+
+    def _registrar(self, operacion, datos):
+        if self.registro is not None:
+            self.registro(operacion, datos)
+
+    @staticmethod
+    def datos_seccion(nombre_materia, seccion):
+        """Representación serializable de una sección (incluye UUID y estado)."""
+        return {
+            'materia': nombre_materia,
+            'uuid': seccion.uuid,
+            'seccion': seccion.id_seccion,
+            'dias': list(seccion.dias or []),
+            'inicio': seccion.hora_inicio,
+            'fin': seccion.hora_fin,
+            'enabled': seccion.enabled,
+        }
+
+    def __iter__(self):
+        return iter(self._materias.values())
+
+    def __len__(self):
+        return len(self._materias)
+
+    def materia(self, nombre):
+        """Devuelve la materia con ese nombre o None."""
+        return self._materias.get(nombre)
+
+    def seccion(self, nombre_materia, uuid_seccion):
+        """Devuelve la sección con ese UUID si pertenece a la materia indicada, o None."""
+        materia = self._materias.get(nombre_materia)
+        if materia is None:
+            return None
+        return materia.buscar_seccion(uuid_seccion)
+
+    def agregar_seccion(self, nombre_materia, seccion, registrar=True):
+        """
+        Agrega una sección, creando la materia si no existe.
+
+        Raises:
+            ValueError: Si la materia ya tiene una sección con el mismo ID.
+        """
+        with self.lock:
+            materia = self.crear_materia(nombre_materia)
+            materia.agregar_seccion(seccion)
+            if registrar and self.registro is not None:
+                self._registrar('agregar', [self.datos_seccion(nombre_materia, seccion)])
+            return materia
+
+    def crear_materia(self, nombre):
+        """Devuelve la materia con ese nombre, creándola (sin secciones) si no existe."""
+        with self.lock:
+            materia = self._materias.get(nombre)
+            if materia is None:
+                materia = Materia(nombre)
+                self._materias[nombre] = materia
+            return materia
+
+    def agregar_lote(self, filas):
+        """
+        Inserta de una vez muchas filas {materia, seccion, dias, inicio, fin}, por
+        ejemplo las de FileParser. En una sola pasada se valida cada fila, se
+        detectan IDs duplicados (contra el catálogo y dentro del lote) y se agrupa
+        por materia; luego cada grupo se inserta en bloque. Las filas inválidas
+        no detienen el lote.
+
+        Returns:
+            tuple: (agregadas, errores) donde errores es una lista de
+            {'fila': índice, 'materia': nombre, 'error': mensaje}.
+        """
+        with self.lock:
+            grupos = {} # nombre -> (ids usados, secciones nuevas)
+            errores = []
+            for i, fila in enumerate(filas):
+                nombre = fila.get('materia')
+                try:
+                    seccion = Seccion.desde_datos(fila)
+                except ValueError as e:
+                    errores.append({'fila': i, 'materia': nombre, 'error': str(e)})
+                    continue
+
+                grupo = grupos.get(nombre)
+                if grupo is None:
+                    existente = self._materias.get(nombre)
+                    grupo = (set(existente._ids) if existente else set(), [])
+                    grupos[nombre] = grupo
+
+                ids, nuevas = grupo
+                if seccion.id_seccion in ids:
+                    errores.append({
+                        'fila': i, 'materia': nombre,
+                        'error': f"La sección {seccion.id_seccion} ya existe en la materia {nombre}."
+                    })
+                    continue
+                ids.add(seccion.id_seccion)
+                nuevas.append(seccion)
+
+            total = 0
+            agregadas = []
+            for nombre, (_, nuevas) in grupos.items():
+                if not nuevas:
+                    continue
+                materia = self.crear_materia(nombre)
+                for seccion in nuevas:
+                    materia._agregar(seccion)
+                total += len(nuevas)
+                if self.registro is not None:
+                    # El UUID en texto solo se arma si hay un log que lo necesite
+                    agregadas.extend(self.datos_seccion(nombre, s) for s in nuevas)
+
+            if agregadas:
+                self._registrar('agregar', agregadas)
+            return total, errores
+
+    def eliminar_materia(self, nombre, registrar=True):
+        """Elimina una materia con todas sus secciones. Devuelve True si existía."""
+        with self.lock:
+            if self._materias.pop(nombre, None) is None:
+                return False
+            if registrar:
+                self._registrar('eliminar_materia', {'materia': nombre})
+            return True
+
+    def eliminar_seccion(self, nombre_materia, uuid_seccion, registrar=True):
+        """Elimina una sección de la materia indicada. Devuelve True si existía."""
+        with self.lock:
+            materia = self._materias.get(nombre_materia)
+            if materia is None or materia.eliminar_seccion(uuid_seccion) is None:
+                return False
+            if registrar:
+                self._registrar('eliminar_seccion', {'materia': nombre_materia, 'uuid': uuid_seccion})
+            return True
+
+    def habilitar_seccion(self, nombre_materia, uuid_seccion, enabled, registrar=True):
+        """Habilita o deshabilita una sección. Devuelve True si existía."""
+        with self.lock:
+            materia = self._materias.get(nombre_materia)
+            if materia is None or not materia.habilitar_seccion(uuid_seccion, enabled):
+                return False
+            if registrar:
+                self._registrar('habilitar', {'materia': nombre_materia, 'uuid': uuid_seccion, 'enabled': enabled})
+            return True
+
+    def limpiar(self, registrar=True):
+        """Elimina todas las materias."""
+        with self.lock:
+            self._materias = {}
+            if registrar:
+                self._registrar('limpiar', {})
+
+    def reemplazar(self, otro):
+        """
+        Toma de una vez el contenido de otro catálogo, sin registrarlo: quien
+        lee ve el contenido anterior o el nuevo, nunca uno a medio armar.
+        """
+        with self.lock:
+            self._materias = otro._materias
+
+class BusquedaInterrumpida(Exception):
+    """
+    La búsqueda se detuvo antes de terminar. 'motivo' es 'cancelado', 'nodos'
+    o 'tiempo' (ver GeneradorHorarios._controlar), o 'transiciones' si se
+    agotó el tope del conteo (ver GeneradorHorarios.contar_validas).
+    """
+    def __init__(self, motivo):
+        super().__init__(f"Búsqueda interrumpida: {motivo}")
+        self.motivo = motivo
 
 class GeneradorHorarios:
     """
     Clase para generar todas las combinaciones posibles de horarios sin choques.
+
+    Estrategias disponibles:
+    - 'backtracking': recorre las materias en el orden recibido.
+    - 'forward_checking': poda los dominios de las materias pendientes tras cada
+      asignación y elige primero la materia con menos secciones compatibles.
+
+    Con 'descomponer' activo, las materias se agrupan en componentes conexas del
+    grafo de conflictos y cada componente se resuelve por separado.
+
+    Con 'paralelo' activo, las componentes cuyo número de combinaciones teóricas
+    alcanza 'umbral_paralelo' se reparten entre 'procesos' procesos.
+
+    Las secciones habilitadas de cada materia se copian una vez al crear el
+    generador (self.activas), ya que las materias las guardan por columnas.
+
+    Las secciones de una materia con la misma franja (días y horas) son
+    intercambiables: forman una clase de equivalencia. La búsqueda recorre un
+    representante por clase (self.representantes) y cada horario encontrado se
+    expande a las secciones concretas al emitirse (iter_soluciones) o se
+    devuelve agrupado (iter_grupos). Los horarios que solo difieren en
+    secciones equivalentes salen seguidos.
+
+    Presupuestos opcionales de la búsqueda: 'max_soluciones' (horarios),
+    'max_nodos' y 'limite_ms' (tiempo desde la primera búsqueda o conteo del
+    generador, compartido por los siguientes). Se revisan cada
+    INTERVALO_CONTROL nodos (o cada max_nodos, si es menor), junto con
+    'detener' (un threading.Event para cancelar desde otro hilo). Los horarios
+    armados sin búsqueda, al combinar componentes independientes o expandir
+    clases de equivalencia (self.armados), cuentan para max_nodos y se revisan
+    con el mismo intervalo. Al agotarse uno, iter_soluciones() y mejores()
+    terminan con lo encontrado y dejan el motivo en self.truncado
+    ('soluciones', 'nodos', 'tiempo' o 'cancelado'); contar_validas() lanza
+    BusquedaInterrumpida porque un conteo parcial no sirve.
     """
-    def __init__(self, materias):
+    ESTRATEGIAS = ('backtracking', 'forward_checking')
+    # Criterios de mejores(): 1 si se minimiza la métrica, -1 si se maximiza
+    CRITERIOS = {'dias': 1, 'huecos': 1, 'inicio': -1, 'fin': 1}
+    UMBRAL_PARALELO = 200000 # Combinaciones teóricas mínimas para usar el pool
+    INTERVALO_CONTROL = 1024 # Cada cuántos nodos se revisa si hay que detenerse
+
+    def __init__(self, materias, estrategia='backtracking', descomponer=True,
+                 paralelo=False, umbral_paralelo=None, procesos=None,
+                 max_soluciones=None, max_nodos=None, limite_ms=None):
+        if estrategia not in self.ESTRATEGIAS:
+            raise ValueError(f"Estrategia desconocida: {estrategia}")
+        for nombre, valor in (('max_soluciones', max_soluciones), ('max_nodos', max_nodos), ('limite_ms', limite_ms)):
+            if valor is not None and valor <= 0:
+                raise ValueError(f"{nombre} debe ser > 0")
         self.materias = materias
+        self.activas = [[s for s in m.secciones if s.enabled] for m in materias]
+        self.representantes, self._clases = self._agrupar_equivalentes(self.activas)
+        self.estrategia = estrategia
+        self.descomponer = descomponer
+        self.paralelo = paralelo
+        self.umbral_paralelo = self.UMBRAL_PARALELO if umbral_paralelo is None else umbral_paralelo
+        self.procesos = procesos or os.cpu_count() or 1
         self.soluciones = []
+        self.nodos_explorados = 0 # Llamadas recursivas de la última búsqueda
+        self.armados = 0 # Horarios armados por combinación o expansión, sin búsqueda (cuentan para max_nodos)
+        self.podas = 0 # Ramas descartadas por un dominio vacío o por la cota (mejores)
+        self.comprobaciones = 0 # Comparaciones de máscaras (AND) entre secciones; no incluye la búsqueda en paralelo
+        self.transiciones = 0 # Transiciones del DP del último contar_validas()
+        self.puntajes = [] # Métrica de cada horario devuelto por mejores()
+        self.detener = None # threading.Event para interrumpir la búsqueda desde otro hilo
+        self.max_soluciones = max_soluciones
+        self.max_nodos = max_nodos
+        self.limite_ms = limite_ms
+        self.truncado = None # Motivo por el que la última búsqueda no terminó
+        self._vence = None # Instante (perf_counter) en que se agota limite_ms
+        self._validas = None # Resultado de contar_validas(), una vez calculado
+        self._intervalo = min(self.INTERVALO_CONTROL, max_nodos or self.INTERVALO_CONTROL)
 
     def calcular_combinaciones_teoricas(self):
         """
@@ -82,50 +682,738 @@ class GeneradorHorarios:
         número de secciones disponibles (y habilitadas) para cada materia.
         """
         total = 1
-        for m in self.materias:
-            secciones_activas = [s for s in m.secciones if s.enabled]
+        for secciones_activas in self.activas:
             if not secciones_activas:
                 return 0
             total *= len(secciones_activas)
         return total
 
+    def contar_validas(self, limite_transiciones=None):
+        """
+        Cuenta exactamente cuántos horarios sin choques existen, sin construirlos.
+
+        Programación dinámica sobre el estado "minutos ocupados": se procesan las
+        materias en orden y, para cada estado alcanzado, se acumula cuántas
+        combinaciones llevan a él. El estado se recorta a los minutos que todavía
+        pueden usar las materias pendientes, de modo que horarios parciales
+        distintos pero equivalentes para el resto se cuentan juntos. Las secciones
+        con la misma máscara se agrupan con su multiplicidad.
+
+        Como las componentes del grafo de conflictos son independientes, el total
+        es el producto de los conteos de cada componente. El resultado se
+        memoriza: las secciones habilitadas se fijan al crear el generador.
+
+        En catálogos densos los estados crecen mucho y contar puede costar más
+        que enumerar. Con 'limite_transiciones' el conteo se abandona antes de
+        procesar una materia que lo haría pasar de ese número de transiciones
+        (estado x máscara probada, sumando todas las componentes) y lanza
+        BusquedaInterrumpida('transiciones').
+        """
+        if self._validas is not None:
+            return self._validas
+        self._arrancar_limite()
+        self.transiciones = 0
+        total = 1
+        for componente in self.componentes():
+            total *= self._contar_componente(componente, limite_transiciones)
+            if not total:
+                break
+        self._validas = total
+        return total
+
+    def _contar_componente(self, indices, limite_transiciones=None):
+        """Conteo exacto (DP sobre minutos ocupados) de las materias indicadas."""
+        dominios = []
+        for i in indices:
+            multiplicidad = {}
+            for s in self.activas[i]:
+                multiplicidad[s.mascara] = multiplicidad.get(s.mascara, 0) + 1
+            if not multiplicidad:
+                return 0
+            dominios.append(list(multiplicidad.items()))
+
+        # restantes[i] = unión de las máscaras de las materias i, i+1, ...
+        restantes = [0] * (len(dominios) + 1)
+        for i in range(len(dominios) - 1, -1, -1):
+            union = restantes[i + 1]
+            for mascara, _ in dominios[i]:
+                union |= mascara
+            restantes[i] = union
+
+        estados = {0: 1}
+        for i, dominio in enumerate(dominios):
+            self.transiciones += len(estados) * len(dominio)
+            if limite_transiciones is not None and self.transiciones > limite_transiciones:
+                raise BusquedaInterrumpida('transiciones')
+            relevante = restantes[i + 1]
+            siguientes = {}
+            for n, (ocupado, cuenta) in enumerate(estados.items()):
+                if not n % self.INTERVALO_CONTROL:
+                    self._controlar()
+                for mascara, veces in dominio:
+                    if not (mascara & ocupado):
+                        clave = (ocupado | mascara) & relevante
+                        siguientes[clave] = siguientes.get(clave, 0) + cuenta * veces
+            if not siguientes:
+                return 0
+            estados = siguientes
+
+        return sum(estados.values())
+
+    def componentes(self):
+        """
+        Componentes conexas del grafo de conflictos entre materias.
+
+        Dos materias son adyacentes si alguna sección habilitada de una puede
+        chocar con alguna de la otra (la unión de sus máscaras se intersecta).
+        Devuelve listas de índices de materias, cada una en orden ascendente; la
+        primera es la componente con más combinaciones teóricas.
+        """
+        n = len(self.materias)
+        uniones = []
+        for secciones in self.activas:
+            union = 0
+            for s in secciones:
+                union |= s.mascara
+            uniones.append(union)
+
+        if not self.descomponer:
+            return [list(range(n))] if n else []
+
+        padre = list(range(n))
+
+        def raiz(i):
+            while padre[i] != i:
+                padre[i] = padre[padre[i]]
+                i = padre[i]
+            return i
+
+        for i in range(n):
+            for j in range(i + 1, n):
+                if uniones[i] & uniones[j]:
+                    padre[raiz(i)] = raiz(j)
+
+        grupos = {}
+        for i in range(n):
+            grupos.setdefault(raiz(i), []).append(i)
+
+        # El orden es estable: mayor componente primero, luego por su primera materia
+        return sorted(grupos.values(), key=lambda c: (-self._teoricas(c), c[0]))
+
+    def _teoricas(self, indices, secciones=None):
+        """
+        Combinaciones teóricas del subconjunto de materias indicado. Con
+        'secciones' (p. ej. self.representantes) se cuentan esas listas.
+        """
+        secciones = self.activas if secciones is None else secciones
+        total = 1
+        for i in indices:
+            total *= len(secciones[i])
+        return total
+
     def generar(self):
-        self.soluciones = []
-        # Ordenamos materias para consistencia
-        materias_lista = list(self.materias)
-        self._backtrack(materias_lista, [])
+        self.soluciones = list(self.iter_soluciones())
         return self.soluciones
 
-    def _backtrack(self, materias_restantes, horario_actual):
+    @property
+    def completo(self):
+        """True si la última búsqueda recorrió todo el árbol."""
+        return self.truncado is None
+
+    def _iniciar(self):
+        """Reinicia los contadores y, en la primera búsqueda, arranca limite_ms."""
+        self.nodos_explorados = 0
+        self.armados = 0
+        self.podas = 0
+        self.comprobaciones = 0
+        self.truncado = None
+        self._arrancar_limite()
+
+    def _arrancar_limite(self):
+        """Fija el vencimiento de limite_ms la primera vez que se usa el generador."""
+        if self.limite_ms is not None and self._vence is None:
+            self._vence = time.perf_counter() + self.limite_ms / 1000
+
+    def _armado(self):
+        """Cuenta un horario armado sin búsqueda y revisa los presupuestos cada _intervalo."""
+        self.armados += 1
+        if not self.armados % self._intervalo:
+            self._controlar()
+
+    @staticmethod
+    def _agrupar_equivalentes(activas):
+        """
+        Agrupa las secciones de cada materia por franja, en orden de aparición.
+
+        Returns:
+            tuple: (representantes por materia, dict id(representante) -> tupla
+            con las secciones de su clase, solo para clases de más de una).
+        """
+        representantes = []
+        clases = {}
+        for secciones in activas:
+            por_franja = {}
+            for seccion in secciones:
+                por_franja.setdefault(seccion.franja, []).append(seccion)
+            representantes.append([miembros[0] for miembros in por_franja.values()])
+            for miembros in por_franja.values():
+                if len(miembros) > 1:
+                    clases[id(miembros[0])] = tuple(miembros)
+        return representantes, clases
+
+    def equivalentes(self, seccion):
+        """Secciones de la clase de un representante (él mismo si está solo)."""
+        return self._clases.get(id(seccion)) or (seccion,)
+
+    def iter_soluciones(self):
+        """
+        Generador perezoso de soluciones: produce cada horario válido en cuanto
+        se encuentra, sin acumularlos. Permite tomar solo una página de
+        resultados (p. ej. con itertools.islice) sin recorrer todo el árbol.
+
+        Si hay varias componentes independientes, las secundarias se resuelven
+        por completo (son pequeñas) y la principal se recorre perezosamente; cada
+        horario es una combinación de una solución por componente, armada solo
+        cuando se pide.
+
+        Con max_soluciones, max_nodos o limite_ms la iteración termina al
+        agotar el presupuesto (ver self.truncado).
+        """
+        return self._limitar(self._expandir(self._combinar_componentes()))
+
+    def iter_grupos(self):
+        """
+        Como iter_soluciones(), pero sin expandir las clases de equivalencia:
+        cada materia del horario trae la tupla de sus secciones intercambiables
+        (nombre, (seccion, ...)). max_soluciones cuenta horarios agrupados.
+        """
+        grupos = (
+            [(nombre, self.equivalentes(seccion)) for nombre, seccion in horario]
+            for horario in self._combinar_componentes()
+        )
+        return self._limitar(grupos)
+
+    def _expandir(self, horarios):
+        """
+        Reemplaza cada representante por cada sección de su clase (producto).
+        Cada horario expandido cuenta como armado (ver _armado), así que un
+        horario con clases grandes respeta los presupuestos y la cancelación.
+        """
+        clases = self._clases
+        if not clases:
+            yield from horarios
+            return
+        for horario in horarios:
+            multiples = [k for k, (_, seccion) in enumerate(horario) if id(seccion) in clases]
+            if not multiples:
+                yield horario
+                continue
+            for combinacion in product(*(clases[id(horario[k][1])] for k in multiples)):
+                self._armado()
+                expandido = list(horario)
+                for k, seccion in zip(multiples, combinacion):
+                    expandido[k] = (horario[k][0], seccion)
+                yield expandido
+
+    def _limitar(self, horarios):
+        """
+        Recorre 'horarios' respetando los presupuestos (ver self.truncado). Tras
+        el horario número max_soluciones se busca uno más: el resultado queda
+        truncado solo si existe, no cuando el último horario cae justo en el tope.
+        """
+        self._iniciar()
+        encontradas = 0
+        try:
+            for horario in horarios:
+                if encontradas == self.max_soluciones:
+                    self.truncado = 'soluciones'
+                    return
+                yield horario
+                encontradas += 1
+        except BusquedaInterrumpida as e:
+            self.truncado = e.motivo
+
+    def _combinar_componentes(self):
+        """Horarios completos a partir de las soluciones de cada componente."""
+        componentes = self.componentes()
+        if len(componentes) <= 1:
+            yield from self._resolver(range(len(self.materias)))
+            return
+
+        secundarias = []
+        for componente in componentes[1:]:
+            soluciones = list(self._resolver(componente))
+            if not soluciones:
+                return
+            secundarias.append(soluciones)
+
+        # Posición de cada materia en el horario final (orden original)
+        posiciones = [i for componente in componentes for i in componente]
+        for principal in self._resolver(componentes[0]):
+            for resto in product(*secundarias):
+                self._armado()
+                horario = [None] * len(posiciones)
+                k = 0
+                for parcial in (principal,) + resto:
+                    for asignacion in parcial:
+                        horario[posiciones[k]] = asignacion
+                        k += 1
+                yield horario
+
+    def mejores(self, k, criterio='dias'):
+        """
+        Ramificación y Acotamiento (Branch and Bound):
+        Devuelve los k mejores horarios según 'criterio' sin enumerar todos.
+
+        Se mantiene un heap con los k mejores horarios completos encontrados. Antes
+        de bajar por una rama se calcula una cota optimista de su costo; si no
+        puede mejorar al k-ésimo actual, la rama se descarta. Los días, el inicio y
+        el fin solo empeoran al agregar secciones, así que su cota es el valor del
+        horario parcial; para los huecos se descuentan los minutos que aún podrían
+        rellenar las materias pendientes. Las secciones se prueban de mejor a peor
+        cota para encontrar pronto buenos horarios.
+
+        Los empates se resuelven a favor del horario encontrado primero. La
+        métrica de cada resultado queda en self.puntajes.
+        """
+        if criterio not in self.CRITERIOS:
+            raise ValueError(f"Criterio desconocido: {criterio}")
+        signo = self.CRITERIOS[criterio]
+
+        self._iniciar()
+        self.puntajes = []
+        if k <= 0:
+            return []
+
+        activas = self.activas
+        if not all(activas):
+            return []
+
+        # relleno[i] = minutos que como máximo pueden aportar las materias i, i+1, ...
+        relleno = [0] * (len(activas) + 1)
+        for i in range(len(activas) - 1, -1, -1):
+            relleno[i] = relleno[i + 1] + max(bin(s.mascara).count('1') for s in activas[i])
+
+        def cota(nivel, ocupado):
+            costo = signo * evaluar_horario(criterio, ocupado)
+            if criterio == 'huecos':
+                costo = max(0, costo - relleno[nivel])
+            return costo
+
+        heap = [] # (-costo, -orden, horario): la raíz es el peor de los k
+        orden = count()
+        horario = []
+
+        def recorrer(nivel, ocupado):
+            self.nodos_explorados += 1
+            if not self.nodos_explorados % self._intervalo:
+                self._controlar()
+            if nivel == len(activas):
+                entrada = (-signo * evaluar_horario(criterio, ocupado), -next(orden), list(horario))
+                if len(heap) < k:
+                    heapq.heappush(heap, entrada)
+                else:
+                    heapq.heappushpop(heap, entrada)
+                return
+
+            candidatos = []
+            self.comprobaciones += len(activas[nivel])
+            for seccion in activas[nivel]:
+                if not (seccion.mascara & ocupado):
+                    nuevo = ocupado | seccion.mascara
+                    candidatos.append((cota(nivel + 1, nuevo), len(candidatos), seccion, nuevo))
+            candidatos.sort(key=lambda c: c[:2])
+
+            for costo, _, seccion, nuevo in candidatos:
+                if len(heap) == k and costo >= -heap[0][0]:
+                    # Los candidatos siguientes tienen cotas iguales o peores
+                    self.podas += 1
+                    break
+                horario.append((self.materias[nivel].nombre, seccion))
+                recorrer(nivel + 1, nuevo)
+                horario.pop()
+
+        try:
+            recorrer(0, 0)
+        except BusquedaInterrumpida as e:
+            # Se devuelven los mejores entre los horarios ya encontrados
+            self.truncado = e.motivo
+
+        resultado = sorted(heap, key=lambda e: (-e[0], -e[1]))
+        self.puntajes = [signo * -costo for costo, _, _ in resultado]
+        return [h for _, _, h in resultado]
+
+    def _resolver(self, indices):
+        """
+        Recorre las soluciones del subconjunto de materias indicado con la
+        estrategia elegida. Cada solución sigue el orden de 'indices'.
+        """
+        indices = list(indices)
+        # El tamaño real de la búsqueda es el de las clases de equivalencia
+        if self.paralelo and indices and self._teoricas(indices, self.representantes) >= self.umbral_paralelo:
+            yield from self._resolver_paralelo(indices)
+            return
+
+        if self.estrategia == 'forward_checking':
+            dominios = {}
+            for i in indices:
+                representantes = self.representantes[i]
+                if not representantes:
+                    return
+                dominios[i] = self._dominio(representantes)
+            yield from self._forward_checking(dominios, {})
+            return
+
+        # Ordenamos materias para consistencia
+        niveles = [(self.materias[i].nombre, self.representantes[i]) for i in indices]
+        yield from self._backtrack(niveles, 0, [], 0)
+
+    def _resolver_paralelo(self, indices):
+        """
+        Búsqueda en paralelo: el árbol se corta en las primeras una o dos materias
+        y cada prefijo compatible es una unidad de trabajo para un ProcessPoolExecutor.
+        A los procesos solo viajan las máscaras y vuelven índices de sección, así
+        que no se serializan objetos Seccion. Los resultados se consumen en el orden
+        de las unidades, por lo que el orden final es el mismo del backtracking.
+        """
+        activas = [self.representantes[i] for i in indices]
+        if not all(activas):
+            return
+        mascaras = [[s.mascara for s in secciones] for secciones in activas]
+
+        unidades = [(j,) for j in range(len(mascaras[0]))]
+        if len(unidades) < 4 * self.procesos and len(mascaras) > 1:
+            unidades = [
+                (j, k)
+                for j, primera in enumerate(mascaras[0])
+                for k, segunda in enumerate(mascaras[1])
+                if not (primera & segunda)
+            ]
+
+        executor = ProcessPoolExecutor(max_workers=self.procesos)
+        try:
+            for soluciones, nodos in executor.map(_buscar_unidad, repeat(mascaras), unidades):
+                self._controlar()
+                self.nodos_explorados += nodos
+                for solucion in soluciones:
+                    yield [
+                        (self.materias[i].nombre, activas[k][j])
+                        for k, (i, j) in enumerate(zip(indices, solucion))
+                    ]
+        finally:
+            # Si el consumidor deja de iterar (paginación) no esperamos al resto
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _backtrack(self, niveles, nivel, horario_actual, ocupado):
         """
         Algoritmo de Recurrencia (Backtracking):
         Es una técnica algorítmica para encontrar todas las soluciones posibles 
         a un problema computacional mediante la construcción incremental de candidatos 
         a soluciones, y abandona un candidato ("backtracks") tan pronto como determina 
         que el candidato no puede completar una solución válida.
+
+        'niveles' son las materias como (nombre, secciones habilitadas) y 'nivel'
+        la primera pendiente (se avanza por índice, sin copiar la lista).
+        'ocupado' es la unión de las máscaras de las secciones ya asignadas, así
+        que validar una sección nueva es un solo AND en lugar de recorrer el horario.
         """
+        self.nodos_explorados += 1
+        if not self.nodos_explorados % self._intervalo:
+            self._controlar()
+
         # Caso Base: No quedan materias por asignar (Solución encontrada)
-        if not materias_restantes:
-            self.soluciones.append(copy.copy(horario_actual))
+        if nivel == len(niveles):
+            yield copy.copy(horario_actual)
             return
 
-        materia_actual = materias_restantes[0]
-        
-        # Filtrar solo secciones habilitadas
-        secciones_activas = [s for s in materia_actual.secciones if s.enabled]
-        
-        # Intentar cada sección de la materia actual
+        nombre, secciones_activas = niveles[nivel]
+        self.comprobaciones += len(secciones_activas)
+
+        # Intentar cada sección habilitada de la materia actual
         for seccion in secciones_activas:
-            if self._es_valido(seccion, horario_actual):
+            if not (seccion.mascara & ocupado):
                 # Paso Recursivo: Asignar sección y avanzar a la siguiente materia
-                horario_actual.append((materia_actual.nombre, seccion))
-                self._backtrack(materias_restantes[1:], horario_actual)
+                horario_actual.append((nombre, seccion))
+                yield from self._backtrack(niveles, nivel + 1, horario_actual, ocupado | seccion.mascara)
                 
                 # Backtracking: Deshacer el paso para probar la siguiente sección (Recurrencia)
                 horario_actual.pop()
 
-    def _es_valido(self, nueva_seccion, horario_actual):
-        for _, seccion_existente in horario_actual:
-            if nueva_seccion.choca_con(seccion_existente):
-                return False
-        return True
+    def _forward_checking(self, dominios, asignacion):
+        """
+        Backtracking con Forward Checking:
+        'dominios' asocia el índice de cada materia pendiente con las secciones
+        que aún son compatibles con lo asignado (junto con la unión de sus máscaras).
+        Tras cada asignación se filtran los dominios restantes y, si alguno queda
+        vacío, se retrocede de inmediato sin explorar esa rama.
+
+        Se asigna primero la materia con el dominio más pequeño (la más restringida);
+        las soluciones se devuelven en el orden original de las materias.
+        """
+        self.nodos_explorados += 1
+        if not self.nodos_explorados % self._intervalo:
+            self._controlar()
+
+        # Caso Base: Todas las materias tienen sección asignada
+        if not dominios:
+            yield [(self.materias[i].nombre, asignacion[i]) for i in sorted(asignacion)]
+            return
+
+        indice = min(dominios, key=lambda i: len(dominios[i][0]))
+
+        for seccion in dominios[indice][0]:
+            # Filtrar los dominios pendientes contra la sección elegida
+            nuevos_dominios = {}
+            for i, dominio in dominios.items():
+                if i == indice:
+                    continue
+                secciones, union = dominio
+                self.comprobaciones += 1
+                if not (union & seccion.mascara):
+                    # Ninguna sección de esta materia toca a la elegida
+                    nuevos_dominios[i] = dominio
+                    continue
+                self.comprobaciones += len(secciones)
+                compatibles = [s for s in secciones if not (s.mascara & seccion.mascara)]
+                if not compatibles:
+                    self.podas += 1
+                    break
+                nuevos_dominios[i] = self._dominio(compatibles)
+            else:
+                asignacion[indice] = seccion
+                yield from self._forward_checking(nuevos_dominios, asignacion)
+                del asignacion[indice]
+
+    def _controlar(self):
+        """Interrumpe la búsqueda si se canceló o se agotó algún presupuesto."""
+        if self.detener is not None and self.detener.is_set():
+            raise BusquedaInterrumpida('cancelado')
+        if self.max_nodos is not None and self.nodos_explorados + self.armados >= self.max_nodos:
+            raise BusquedaInterrumpida('nodos')
+        if self._vence is not None and time.perf_counter() >= self._vence:
+            raise BusquedaInterrumpida('tiempo')
+
+    @staticmethod
+    def _dominio(secciones):
+        """Empaqueta secciones candidatas con la unión de sus máscaras."""
+        union = 0
+        for s in secciones:
+            union |= s.mascara
+        return (secciones, union)
+
+class SolucionesIncrementales:
+    """
+    Conserva el conjunto completo de soluciones de las selecciones recientes
+    para no repetir la búsqueda cuando solo cambia qué secciones están
+    habilitadas (p. ej. al activar o desactivar una sección y volver a generar).
+
+    Cada estado se identifica por la estructura de la selección (materias y sus
+    secciones, sin el estado habilitado) y guarda las soluciones como un índice
+    compacto: un entero por horario en base mixta, donde la cifra de cada
+    materia es la posición de su sección, en un array('q').
+
+    Con la misma estructura y otras secciones habilitadas:
+    - deshabilitar secciones solo filtra los horarios que las usan;
+    - habilitar secciones solo busca en los subárboles donde la primera materia
+      que usa una sección nueva la tiene fijada (las materias anteriores usan
+      solo secciones que ya estaban, las posteriores cualquiera habilitada) y
+      mezcla lo encontrado con lo anterior.
+
+    Los horarios se guardan en el orden en que los emite la búsqueda con
+    backtracking (ver _clave_orden), también después de cada actualización:
+    una página sale igual del conjunto guardado que de la búsqueda perezosa.
+    Solo se mantienen conjuntos de hasta 'max_soluciones' horarios; con más,
+    resolver() devuelve None y conviene la búsqueda perezosa normal.
+    """
+    MAX_SOLUCIONES = 50000
+    # Tope de transiciones del conteo previo; si no alcanza, se enumera hasta
+    # pasar de max_soluciones (ver GeneradorHorarios.contar_validas)
+    LIMITE_CONTEO = 100000
+
+    def __init__(self, max_estados=16, max_soluciones=None):
+        self.max_estados = max_estados
+        self.max_soluciones = self.MAX_SOLUCIONES if max_soluciones is None else max_soluciones
+        self._estados = OrderedDict() # estructura -> (habilitadas, códigos)
+        self._lock = threading.Lock()
+
+    def resolver(self, generador, solo_guardados=False):
+        """
+        Soluciones de las materias del generador, actualizando el estado guardado
+        si esa estructura ya se resolvió antes. Con 'solo_guardados' no se arma
+        un conjunto nuevo (habría que enumerar todos los horarios): si la
+        estructura no tiene estado guardado se devuelve None sin buscar.
+
+        Returns:
+            VistaSoluciones: Los horarios (decodificados al pedirlos), con los
+            nodos explorados y el modo ('completo', 'incremental' o 'sin_cambios');
+            None si hay más de max_soluciones horarios, si un presupuesto del
+            generador cortó la búsqueda o si no había estado con 'solo_guardados'.
+        """
+        materias = generador.materias
+        secciones = [m.secciones for m in materias]
+        estructura = tuple(
+            (m.nombre, tuple((s.handle, s.franja) for s in lista))
+            for m, lista in zip(materias, secciones)
+        )
+        habilitadas = tuple(tuple(s.enabled for s in lista) for lista in secciones)
+
+        bases = [len(lista) or 1 for lista in secciones]
+        pesos = [1] * len(bases)
+        for i in range(len(bases) - 2, -1, -1):
+            pesos[i] = pesos[i + 1] * bases[i + 1]
+        limite = pesos[0] * bases[0] if bases else 1
+
+        with self._lock:
+            if solo_guardados and estructura not in self._estados:
+                return None
+            anterior = self._estados.pop(estructura, None)
+
+        if anterior is None:
+            try:
+                if generador.contar_validas(self.LIMITE_CONTEO) > self.max_soluciones:
+                    return None
+            except BusquedaInterrumpida:
+                pass # Conteo demasiado caro: el tope se revisa al enumerar
+            posiciones = [{s.handle: k for k, s in enumerate(lista)} for lista in secciones]
+            codigos = []
+            for horario in generador.iter_soluciones():
+                if len(codigos) == self.max_soluciones:
+                    return None
+                codigos.append(sum(posiciones[i][s.handle] * pesos[i] for i, (_, s) in enumerate(horario)))
+            if not generador.completo:
+                return None # Un presupuesto cortó la búsqueda: el conjunto no sirve
+            if generador.estrategia != 'backtracking':
+                codigos.sort(key=self._clave_orden(generador, secciones, bases, pesos))
+            nodos, modo = generador.nodos_explorados, 'completo'
+        elif anterior[0] == habilitadas:
+            codigos, nodos, modo = anterior[1], 0, 'sin_cambios'
+        else:
+            codigos, nodos = self._actualizar(anterior, habilitadas, secciones, bases, pesos)
+            modo = 'incremental'
+            if len(codigos) > self.max_soluciones:
+                return None
+            codigos.sort(key=self._clave_orden(generador, secciones, bases, pesos))
+
+        codigos = array('q', codigos) if limite <= 2 ** 63 else list(codigos)
+        with self._lock:
+            self._estados[estructura] = (habilitadas, codigos)
+            while len(self._estados) > self.max_estados:
+                self._estados.popitem(last=False)
+
+        return VistaSoluciones(materias, secciones, codigos, bases, pesos, nodos, modo)
+
+    @staticmethod
+    def _actualizar(anterior, habilitadas, secciones, bases, pesos):
+        """
+        Lleva los códigos del estado anterior a las nuevas secciones habilitadas.
+
+        Returns:
+            tuple: (lista de códigos, sin ordenar; nodos explorados en los subárboles)
+        """
+        antes, codigos = anterior
+
+        # Deshabilitadas: se descartan los horarios que las usan
+        for i, (a, d) in enumerate(zip(antes, habilitadas)):
+            quitadas = {k for k, (x, y) in enumerate(zip(a, d)) if x and not y}
+            if quitadas:
+                peso, base = pesos[i], bases[i]
+                codigos = [c for c in codigos if (c // peso) % base not in quitadas]
+
+        # Habilitadas: se busca solo donde aparece alguna sección nueva
+        nuevos = []
+        nodos = 0
+        for i, (a, d) in enumerate(zip(antes, habilitadas)):
+            agregadas = [k for k, (x, y) in enumerate(zip(a, d)) if y and not x]
+            if not agregadas:
+                continue
+            dominios = []
+            for j, (x, y) in enumerate(zip(antes, habilitadas)):
+                if j < i:
+                    dominios.append([k for k in range(len(y)) if x[k] and y[k]])
+                elif j == i:
+                    dominios.append(agregadas)
+                else:
+                    dominios.append([k for k in range(len(y)) if y[k]])
+            if not all(dominios):
+                continue
+            mascaras = [[secciones[j][k].mascara for k in dominio] for j, dominio in enumerate(dominios)]
+            soluciones, visitados = _buscar_unidad(mascaras, ())
+            nodos += visitados
+            nuevos.extend(
+                sum(dominios[j][k] * pesos[j] for j, k in enumerate(solucion))
+                for solucion in soluciones
+            )
+
+        codigos = list(codigos)
+        codigos.extend(nuevos)
+        return codigos, nodos
+
+    @staticmethod
+    def _clave_orden(generador, secciones, bases, pesos):
+        """
+        Clave para ordenar los códigos como los emite el backtracking del
+        generador (con las secciones habilitadas actuales): las componentes, la
+        principal primero, recorren las clases de equivalencia de cada materia
+        en orden de aparición (ver GeneradorHorarios._agrupar_equivalentes) y,
+        dentro de cada horario, las secciones de cada clase salen en orden.
+
+        La clave es otro entero en base mixta con esas cifras (las clases en el
+        orden de las componentes y luego la sección dentro de su clase, por
+        materia); se arma sumando el aporte de cada materia desde una tabla.
+        """
+        clases, miembros = [], []
+        for lista in secciones:
+            rangos = {} # franja -> (rango de la clase, secciones vistas)
+            clase, miembro = [0] * len(lista), [0] * len(lista)
+            for k, seccion in enumerate(lista):
+                if seccion.enabled:
+                    rango, vistas = rangos.get(seccion.franja, (len(rangos), 0))
+                    rangos[seccion.franja] = (rango, vistas + 1)
+                    clase[k], miembro[k] = rango, vistas
+            clases.append(clase)
+            miembros.append(miembro)
+
+        cifras = [clases[i] for componente in generador.componentes() for i in componente]
+        materias = [i for componente in generador.componentes() for i in componente]
+        cifras += miembros
+        materias += range(len(secciones))
+
+        tablas = [[0] * base for base in bases]
+        peso = 1
+        for cifra, i in zip(reversed(cifras), reversed(materias)):
+            for k, rango in enumerate(cifra):
+                tablas[i][k] += rango * peso
+            peso *= bases[i]
+
+        decodificar = list(zip(tablas, pesos, bases))
+        def clave(codigo):
+            return sum(tabla[(codigo // p) % b] for tabla, p, b in decodificar)
+        return clave
+
+class VistaSoluciones:
+    """
+    Secuencia de horarios guardados como códigos en base mixta; cada horario
+    [(materia, sección), ...] se arma solo al pedirlo (p. ej. una página).
+    """
+    def __init__(self, materias, secciones, codigos, bases, pesos, nodos, modo):
+        self.materias = materias
+        self.secciones = secciones
+        self.codigos = codigos
+        self.bases = bases
+        self.pesos = pesos
+        self.nodos = nodos # Nodos explorados para obtener este conjunto
+        self.modo = modo
+
+    def __len__(self):
+        return len(self.codigos)
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            return [self._horario(c) for c in self.codigos[indice]]
+        return self._horario(self.codigos[indice])
+
+    def _horario(self, codigo):
+        return [
+            (m.nombre, self.secciones[i][(codigo // self.pesos[i]) % self.bases[i]])
+            for i, m in enumerate(self.materias)
+        ]
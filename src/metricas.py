@@ -0,0 +1,157 @@
+"""
+Métricas - SmartPlannerX
+Contadores, indicadores e histogramas de las rutas críticas (búsqueda,
+serialización, importación), exportados en el formato de texto de Prometheus.
+
+Equipo 3:
+- Cristian E. Sánchez R. (25-0688)
+- Hansel Augusto Pérez (25-0461)
+- Lia De Oleo (25-0673)
+- Juan José Cruz Romero (25-0888)
+- Samir Gonzalez (25-0808)
+- Alejandro Bruno (25-0947)
+- Daniel Osvaldo Lopez (25-0655)
+"""
+
+from bisect import bisect_left
+from contextlib import contextmanager, nullcontext
+import threading
+import time
+
+# Límites (le) de los histogramas
+BUCKETS_SEGUNDOS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+BUCKETS_CANTIDAD = (1, 10, 100, 1000, 10000, 100000, 1000000, 10000000)
+
+_NULO = nullcontext()
+
+def _escapar(valor):
+    """Escapa el valor de una etiqueta (\\, comillas y saltos de línea)."""
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+class Metricas:
+    """
+    Registro de métricas en memoria del proceso.
+
+    Los nombres válidos y su tipo están en DEFINICIONES. Con 'habilitado' en
+    False todos los métodos regresan de inmediato (fase() devuelve un contexto
+    vacío), de modo que la instrumentación casi no cuesta.
+    """
+    # nombre -> (tipo, descripción, buckets de los histogramas)
+    DEFINICIONES = {
+        'smartplanner_peticion_segundos': ('histogram', 'Duración de las peticiones HTTP por endpoint', BUCKETS_SEGUNDOS),
+        'smartplanner_fase_segundos': ('histogram', 'Duración de cada fase de la generación de horarios', BUCKETS_SEGUNDOS),
+        'smartplanner_busqueda_nodos': ('histogram', 'Nodos explorados por búsqueda', BUCKETS_CANTIDAD),
+        'smartplanner_busqueda_nodos_total': ('counter', 'Nodos explorados por el generador', None),
+        'smartplanner_busqueda_podas_total': ('counter', 'Ramas podadas por el generador', None),
+        'smartplanner_busqueda_comprobaciones_total': ('counter', 'Comparaciones de máscaras entre secciones', None),
+        'smartplanner_busqueda_soluciones_total': ('counter', 'Horarios devueltos por el generador', None),
+        'smartplanner_busqueda_truncadas_total': ('counter', 'Búsquedas cortadas por un presupuesto, por motivo', None),
+        'smartplanner_importacion_segundos': ('histogram', 'Duración de la importación de archivos', BUCKETS_SEGUNDOS),
+        'smartplanner_importacion_filas_total': ('counter', 'Filas leídas al importar archivos', None),
+        'smartplanner_importacion_errores_total': ('counter', 'Filas rechazadas al importar archivos', None),
+        'smartplanner_importacion_filas_por_segundo': ('gauge', 'Filas por segundo de la última importación', None),
+        'smartplanner_cache_aciertos': ('gauge', 'Aciertos de la caché de resultados', None),
+        'smartplanner_cache_fallos': ('gauge', 'Fallos de la caché de resultados', None),
+        'smartplanner_cache_entradas': ('gauge', 'Entradas en la caché de resultados', None),
+        'smartplanner_cache_bytes': ('gauge', 'Bytes en la caché de resultados', None),
+    }
+
+    def __init__(self, habilitado=True):
+        self.habilitado = habilitado
+        self._valores = {} # (nombre, etiquetas) -> número, o [conteos por bucket, suma, total]
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _clave(nombre, etiquetas):
+        return nombre, tuple(sorted(etiquetas.items()))
+
+    def incrementar(self, nombre, valor=1, **etiquetas):
+        """Suma 'valor' a un contador."""
+        if not self.habilitado:
+            return
+        clave = self._clave(nombre, etiquetas)
+        with self._lock:
+            self._valores[clave] = self._valores.get(clave, 0) + valor
+
+    def fijar(self, nombre, valor, **etiquetas):
+        """Fija el valor actual de un indicador (gauge)."""
+        if not self.habilitado:
+            return
+        clave = self._clave(nombre, etiquetas)
+        with self._lock:
+            self._valores[clave] = valor
+
+    def observar(self, nombre, valor, **etiquetas):
+        """Agrega una observación a un histograma."""
+        if not self.habilitado:
+            return
+        buckets = self.DEFINICIONES[nombre][2]
+        clave = self._clave(nombre, etiquetas)
+        with self._lock:
+            histograma = self._valores.get(clave)
+            if histograma is None:
+                histograma = self._valores[clave] = [[0] * (len(buckets) + 1), 0, 0]
+            histograma[0][bisect_left(buckets, valor)] += 1
+            histograma[1] += valor
+            histograma[2] += 1
+
+    def fase(self, nombre, destino=None):
+        """
+        Contexto que mide la duración de una fase en 'smartplanner_fase_segundos'.
+        Si se pasa un dict en 'destino' la duración también se acumula ahí
+        (para 'debug_stats'), aunque las métricas estén deshabilitadas.
+        """
+        if not self.habilitado and destino is None:
+            return _NULO
+        return self._medir(nombre, destino)
+
+    @contextmanager
+    def _medir(self, nombre, destino):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            segundos = time.perf_counter() - inicio
+            if destino is not None:
+                destino[nombre] = destino.get(nombre, 0) + segundos
+            self.observar('smartplanner_fase_segundos', segundos, fase=nombre)
+
+    def reiniciar(self):
+        """Descarta todos los valores registrados."""
+        with self._lock:
+            self._valores.clear()
+
+    @staticmethod
+    def _etiquetas(etiquetas, extra=()):
+        pares = list(etiquetas) + list(extra)
+        if not pares:
+            return ''
+        return '{' + ','.join(f'{k}="{_escapar(v)}"' for k, v in pares) + '}'
+
+    def exportar(self):
+        """Texto en formato de exposición de Prometheus (versión 0.0.4)."""
+        with self._lock:
+            valores = {
+                clave: [list(v[0]), v[1], v[2]] if isinstance(v, list) else v
+                for clave, v in self._valores.items()
+            }
+
+        lineas = []
+        for nombre, (tipo, descripcion, buckets) in self.DEFINICIONES.items():
+            series = sorted(((etiquetas, v) for (n, etiquetas), v in valores.items() if n == nombre), key=lambda e: e[0])
+            if not series:
+                continue
+            lineas.append(f'# HELP {nombre} {descripcion}')
+            lineas.append(f'# TYPE {nombre} {tipo}')
+            for etiquetas, valor in series:
+                if tipo != 'histogram':
+                    lineas.append(f'{nombre}{self._etiquetas(etiquetas)} {valor}')
+                    continue
+                conteos, suma, total = valor
+                acumulado = 0
+                for limite, conteo in zip(buckets + ('+Inf',), conteos):
+                    acumulado += conteo
+                    lineas.append(f'{nombre}_bucket{self._etiquetas(etiquetas, [("le", limite)])} {acumulado}')
+                lineas.append(f'{nombre}_sum{self._etiquetas(etiquetas)} {suma}')
+                lineas.append(f'{nombre}_count{self._etiquetas(etiquetas)} {total}')
+        return '\n'.join(lineas) + '\n'
@@ -27,6 +27,39 @@ class SmartParser:
         'sabado': 'Sabado', 'sábado': 'Sabado', 'sab': 'Sabado'
     }
 
+    # Patrones compilados una sola vez: todas las formas de los días en una sola
+    # alternativa (las más largas primero) y el rango de horas
+    PATRON_DIAS = re.compile(
+        r'\b(' + '|'.join(re.escape(k) for k in sorted(DIAS_MAP, key=len, reverse=True)) + r')\b'
+    )
+    # Regex: (num)(:min)?(am/pm)? ... (num)(:min)?(am/pm)?
+    PATRON_HORAS = re.compile(r'(\d{1,2})(?::(\d{2}))?\s*(am|pm)?\s*(?:a|-|hasta)\s*(\d{1,2})(?::(\d{2}))?\s*(am|pm)?')
+
+    # Orden de los días en la respuesta (el de DIAS_MAP)
+    ORDEN_DIAS = {}
+    for _dia in DIAS_MAP.values():
+        ORDEN_DIAS.setdefault(_dia, len(ORDEN_DIAS))
+    del _dia
+
+    PALABRAS_IGNORAR = frozenset(
+        ['agrega', 'crea', 'pon', 'el', 'la', 'los', 'las', 'de', 'a', 'y', 'materia', 'clase', 'curso',
+         'por', 'favor', 'tengo', 'que', 'seccion', 'del', 'al', 'am', 'pm'] + list(DIAS_MAP)
+    )
+
+    @staticmethod
+    def parse_lote(lineas):
+        """
+        Analiza muchas líneas (p. ej. una lista pegada desde un PDF) en una sola llamada.
+        Acepta una lista de strings o un texto con una materia por línea; las
+        líneas vacías se ignoran.
+
+        Returns:
+            list: Tuplas (número de línea, resultado de parse) en el orden recibido.
+        """
+        if isinstance(lineas, str):
+            lineas = lineas.splitlines()
+        return [(i, SmartParser.parse(linea)) for i, linea in enumerate(lineas) if linea.strip()]
+
     @staticmethod
     def parse(text):
         """
@@ -41,19 +74,17 @@ class SmartParser:
         """
         text_lower = text.lower()
         
-        # 1. Detectar Días
-        dias_encontrados = []
-        for key, val in SmartParser.DIAS_MAP.items():
-            if re.search(r'\b' + re.escape(key) + r'\b', text_lower):
-                if val not in dias_encontrados:
-                    dias_encontrados.append(val)
+        # 1. Detectar Días (una sola pasada con la alternativa compilada)
+        dias_encontrados = sorted(
+            {SmartParser.DIAS_MAP[d] for d in SmartParser.PATRON_DIAS.findall(text_lower)},
+            key=SmartParser.ORDEN_DIAS.get
+        )
         
         if not dias_encontrados:
             return {'error': 'No entendí los días. Usa palabras completas como "Lunes".'}
 
         # 2. Detectar Horas (Soporte AM/PM y rangos)
-        # Regex: (num)(:min)?(am/pm)? ... (num)(:min)?(am/pm)?
-        horas_match = re.search(r'(\d{1,2})(?::(\d{2}))?\s*(am|pm)?\s*(?:a|-|hasta)\s*(\d{1,2})(?::(\d{2}))?\s*(am|pm)?', text_lower)
+        horas_match = SmartParser.PATRON_HORAS.search(text_lower)
         
         if not horas_match:
             return {'error': 'No encontré las horas. Usa formato "8 a 10" o "2:30pm a 4pm".'}
@@ -93,13 +124,10 @@ class SmartParser:
                 break # Tomar el primer número como sección
 
         # 4. Detectar Materia (Todo lo que no sea día, hora, sección o stopword)
-        palabras_ignorar = ['agrega', 'crea', 'pon', 'el', 'la', 'los', 'las', 'de', 'a', 'y', 'materia', 'clase', 'curso', 'por', 'favor', 'tengo', 'que', 'seccion', 'del', 'al']
-        palabras_ignorar += list(SmartParser.DIAS_MAP.keys())
-        
         nombre_parts = []
         for p in parts:
             p_clean = p.strip('.,-')
-            if p_clean not in palabras_ignorar and not p_clean.isdigit() and p_clean not in ['am', 'pm']:
+            if p_clean not in SmartParser.PALABRAS_IGNORAR and not p_clean.isdigit():
                 nombre_parts.append(p_clean.capitalize())
         
         nombre_materia = " ".join(nombre_parts)
@@ -0,0 +1,297 @@
+"""
+Persistencia del Catálogo - SmartPlannerX
+Guarda los catálogos en SQLite para recuperarlos al reiniciar el servidor.
+
+Equipo 3:
+- Cristian E. Sánchez R. (25-0688)
+- Hansel Augusto Pérez (25-0461)
+- Lia De Oleo (25-0673)
+- Juan José Cruz Romero (25-0888)
+- Samir Gonzalez (25-0808)
+- Alejandro Bruno (25-0947)
+- Daniel Osvaldo Lopez (25-0655)
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from src.logic import Catalogo, Seccion
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS materias (
+    catalogo TEXT NOT NULL,
+    orden INTEGER NOT NULL,
+    nombre TEXT NOT NULL,
+    PRIMARY KEY (catalogo, orden)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS secciones (
+    catalogo TEXT NOT NULL,
+    orden INTEGER NOT NULL,
+    materia TEXT NOT NULL,
+    uuid TEXT NOT NULL,
+    id_seccion TEXT NOT NULL,
+    dias TEXT NOT NULL,
+    inicio REAL NOT NULL,
+    fin REAL NOT NULL,
+    enabled INTEGER NOT NULL,
+    PRIMARY KEY (catalogo, orden)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS cambios (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    catalogo TEXT NOT NULL,
+    operacion TEXT NOT NULL,
+    datos TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS estado (
+    catalogo TEXT PRIMARY KEY,
+    generacion INTEGER NOT NULL,
+    base INTEGER NOT NULL
+);
+"""
+
+class AlmacenCatalogo:
+    """
+    Almacén SQLite de catálogos con snapshot + log de cambios.
+
+    Cada catálogo (por nombre) se guarda como un snapshot (tablas 'materias' y
+    'secciones') más un log de solo-agregar ('cambios') con las modificaciones
+    posteriores. Al cargar se lee el snapshot, se reaplica el log y se compacta
+    (nuevo snapshot, log vacío), de modo que el siguiente arranque solo lee el
+    snapshot. El log también se compacta al superar 'max_cambios' entradas.
+
+    Varios procesos (workers) pueden compartir la misma base: la base es el único
+    camino de escritura y cada proceso llama a sincronizar() antes de leer. La
+    comprobación es un PRAGMA data_version (no toca disco si nadie escribió); si
+    hubo cambios se aplican solo las entradas nuevas del log, o se recarga el
+    snapshot si otro proceso lo compactó (tabla 'estado': generación y último
+    cambio incluido). Esto da consistencia entre procesos, no memoria
+    compartida: cada proceso arma su propio Catalogo en memoria. El mmap de
+    SQLite solo evita copiar las páginas de la base al leerlas.
+
+    Los catálogos cargados comparten el lock del almacén: una modificación (en
+    memoria y en el log) no se intercala con una recarga, y la recarga arma
+    un Catalogo aparte que luego reemplaza el contenido de una vez.
+    """
+    MMAP_BYTES = 256 * 1024 * 1024
+
+    def __init__(self, ruta, max_cambios=5000):
+        self.ruta = ruta
+        self.max_cambios = max_cambios
+        self.ultima_carga = {} # nombre -> {'secciones', 'cambios', 'segundos'}
+        self._catalogos = {} # nombre -> estado de sincronización del catálogo cargado
+        self._data_version = None
+        self._lock = threading.RLock()
+
+        directorio = os.path.dirname(ruta)
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+        self._conexion = sqlite3.connect(ruta, check_same_thread=False, timeout=30)
+        self._conexion.execute('PRAGMA journal_mode=WAL')
+        self._conexion.execute(f'PRAGMA mmap_size={self.MMAP_BYTES}')
+        self._conexion.executescript(_ESQUEMA)
+
+    def cargar(self, nombre):
+        """
+        Reconstruye el catálogo 'nombre' (snapshot + cambios) y lo devuelve con
+        el registro de cambios ya conectado a este almacén.
+        """
+        inicio = time.perf_counter()
+        catalogo = Catalogo(lock=self._lock)
+        info = {'catalogo': catalogo, 'generacion': 0, 'ultimo': 0, 'propios': set(), 'pendientes': 0}
+        with self._lock:
+            self._catalogos[nombre] = info
+            total, cambios = self._recargar(nombre)
+            if cambios:
+                self.guardar(nombre)
+            self._data_version = self._version_datos()
+
+        self.ultima_carga[nombre] = {
+            'secciones': total,
+            'cambios': cambios,
+            'segundos': time.perf_counter() - inicio,
+        }
+
+        def registrar(operacion, datos):
+            self.registrar(nombre, operacion, datos)
+            if info['pendientes'] >= self.max_cambios:
+                self.guardar(nombre)
+
+        catalogo.registro = registrar
+        return catalogo
+
+    def sincronizar(self):
+        """
+        Trae a memoria lo que otros procesos escribieron desde la última llamada.
+
+        Returns:
+            set: Nombres de los catálogos que cambiaron.
+        """
+        with self._lock:
+            version = self._version_datos()
+            if version == self._data_version:
+                return set()
+            self._data_version = version
+
+            cambiados = set()
+            for nombre, info in self._catalogos.items():
+                fila = self._conexion.execute(
+                    'SELECT generacion FROM estado WHERE catalogo = ?', (nombre,)).fetchone()
+                if (fila[0] if fila else 0) != info['generacion']:
+                    self._recargar(nombre)
+                    cambiados.add(nombre)
+                elif self._aplicar_cambios(nombre):
+                    cambiados.add(nombre)
+            return cambiados
+
+    def registrar(self, nombre, operacion, datos):
+        """Agrega una operación al log de cambios del catálogo."""
+        with self._lock:
+            with self._conexion:
+                cursor = self._conexion.execute(
+                    'INSERT INTO cambios (catalogo, operacion, datos) VALUES (?, ?, ?)',
+                    (nombre, operacion, json.dumps(datos)))
+            info = self._catalogos.get(nombre)
+            if info is not None:
+                # Ya está aplicado en memoria: sincronizar() no debe repetirlo
+                info['propios'].add(cursor.lastrowid)
+                info['pendientes'] += 1
+
+    def guardar(self, nombre):
+        """
+        Escribe un snapshot completo del catálogo cargado y descarta del log las
+        entradas que ya incluye. Antes aplica lo que otros procesos hayan escrito.
+        """
+        with self._lock:
+            info = self._catalogos[nombre]
+            self._aplicar_cambios(nombre)
+
+            materias = []
+            secciones = []
+            textos_dias = {} # Las tuplas de días son compartidas: se codifican una vez
+            for m in info['catalogo']:
+                materias.append((nombre, len(materias), m.nombre))
+                for s in m.secciones:
+                    dias = textos_dias.get(s.dias)
+                    if dias is None:
+                        dias = textos_dias[s.dias] = json.dumps(list(s.dias))
+                    secciones.append((
+                        nombre, len(secciones), m.nombre, s.uuid, s.id_seccion,
+                        dias, s.hora_inicio, s.hora_fin, int(bool(s.enabled))
+                    ))
+
+            with self._conexion:
+                self._conexion.execute('DELETE FROM materias WHERE catalogo = ?', (nombre,))
+                self._conexion.execute('DELETE FROM secciones WHERE catalogo = ?', (nombre,))
+                self._conexion.execute(
+                    'DELETE FROM cambios WHERE catalogo = ? AND id <= ?', (nombre, info['ultimo']))
+                self._conexion.executemany('INSERT INTO materias VALUES (?, ?, ?)', materias)
+                self._conexion.executemany('INSERT INTO secciones VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)', secciones)
+                self._conexion.execute(
+                    'INSERT INTO estado VALUES (?, 1, ?) ON CONFLICT(catalogo) '
+                    'DO UPDATE SET generacion = generacion + 1, base = excluded.base',
+                    (nombre, info['ultimo']))
+            info['generacion'] = self._conexion.execute(
+                'SELECT generacion FROM estado WHERE catalogo = ?', (nombre,)).fetchone()[0]
+            info['pendientes'] = 0
+
+    def cerrar(self):
+        """Cierra la conexión con la base de datos."""
+        with self._lock:
+            self._conexion.close()
+
+    def tamano(self):
+        """Tamaño en bytes del archivo de la base de datos (sin el WAL)."""
+        return os.path.getsize(self.ruta) if os.path.exists(self.ruta) else 0
+
+    def _version_datos(self):
+        return self._conexion.execute('PRAGMA data_version').fetchone()[0]
+
+    def _recargar(self, nombre):
+        """
+        Rehace el contenido guardado (snapshot + log) en un Catalogo aparte y lo
+        pasa de una vez al catálogo cargado. Se llama con el lock tomado.
+
+        Returns:
+            tuple: (secciones del snapshot, cambios reaplicados)
+        """
+        info = self._catalogos[nombre]
+        nuevo = Catalogo()
+        fila = self._conexion.execute(
+            'SELECT generacion, base FROM estado WHERE catalogo = ?', (nombre,)).fetchone()
+        info['generacion'], info['ultimo'] = fila if fila else (0, 0)
+        info['propios'].clear()
+
+        for (materia,) in self._conexion.execute(
+                'SELECT nombre FROM materias WHERE catalogo = ? ORDER BY orden', (nombre,)):
+            nuevo.crear_materia(materia)
+
+        filas = self._conexion.execute(
+            'SELECT materia, uuid, id_seccion, dias, inicio, fin, enabled '
+            'FROM secciones WHERE catalogo = ? ORDER BY orden', (nombre,))
+        total = 0
+        listas_dias = {} # Pocas combinaciones distintas: se decodifican una vez
+        for materia, uuid_seccion, id_seccion, dias, hora_inicio, hora_fin, enabled in filas:
+            lista = listas_dias.get(dias)
+            if lista is None:
+                lista = listas_dias[dias] = json.loads(dias)
+            try:
+                seccion = self._seccion(uuid_seccion, id_seccion, lista, hora_inicio, hora_fin, enabled)
+            except ValueError:
+                continue # Días no reconocidos, guardados antes de que se validaran
+            nuevo.agregar_seccion(materia, seccion)
+            total += 1
+
+        cambios = self._aplicar_log(nombre, nuevo)
+        info['catalogo'].reemplazar(nuevo)
+        return total, cambios
+
+    def _aplicar_cambios(self, nombre):
+        """Aplica las entradas del log posteriores a las ya vistas. Devuelve cuántas aplicó."""
+        return self._aplicar_log(nombre, self._catalogos[nombre]['catalogo'])
+
+    def _aplicar_log(self, nombre, catalogo):
+        """Aplica sobre 'catalogo' las entradas del log de 'nombre' que aún no vio."""
+        info = self._catalogos[nombre]
+        filas = self._conexion.execute(
+            'SELECT id, operacion, datos FROM cambios WHERE catalogo = ? AND id > ? ORDER BY id',
+            (nombre, info['ultimo'])).fetchall()
+
+        aplicados = 0
+        for id_cambio, operacion, datos in filas:
+            info['ultimo'] = id_cambio
+            if id_cambio in info['propios']:
+                info['propios'].discard(id_cambio)
+                continue
+            self._aplicar(catalogo, operacion, json.loads(datos))
+            aplicados += 1
+        return aplicados
+
+    @staticmethod
+    def _seccion(uuid_seccion, id_seccion, dias, hora_inicio, hora_fin, enabled):
+        seccion = Seccion(id_seccion, dias, hora_inicio, hora_fin, uuid_seccion)
+        seccion.enabled = bool(enabled)
+        return seccion
+
+    @classmethod
+    def _aplicar(cls, catalogo, operacion, datos):
+        """Reaplica una operación del log sobre el catálogo, sin volver a registrarla."""
+        if operacion == 'agregar':
+            for d in datos:
+                try:
+                    seccion = cls._seccion(d['uuid'], d['seccion'], d['dias'], d['inicio'], d['fin'], d['enabled'])
+                    catalogo.agregar_seccion(d['materia'], seccion, registrar=False)
+                except ValueError:
+                    # Otro proceso agregó el mismo ID a la vez (gana el primero)
+                    # o los días no se reconocen (entrada anterior a validarlos)
+                    pass
+        elif operacion == 'eliminar_materia':
+            catalogo.eliminar_materia(datos['materia'], registrar=False)
+        elif operacion == 'eliminar_seccion':
+            catalogo.eliminar_seccion(datos['materia'], datos['uuid'], registrar=False)
+        elif operacion == 'habilitar':
+            catalogo.habilitar_seccion(datos['materia'], datos['uuid'], datos['enabled'], registrar=False)
+        elif operacion == 'limpiar':
+            catalogo.limpiar(registrar=False)
@@ -0,0 +1,203 @@
+"""
+Trabajos de Generación - SmartPlannerX
+Ejecuta generaciones de horarios en segundo plano para que las búsquedas
+grandes no ocupen el hilo de la petición: se consultan el progreso y los
+resultados parciales, y se pueden cancelar.
+
+Equipo 3:
+- Cristian E. Sánchez R. (25-0688)
+- Hansel Augusto Pérez (25-0461)
+- Lia De Oleo (25-0673)
+- Juan José Cruz Romero (25-0888)
+- Samir Gonzalez (25-0808)
+- Alejandro Bruno (25-0947)
+- Daniel Osvaldo Lopez (25-0655)
+"""
+
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import copy
+import threading
+import time
+import uuid
+
+from src.logic import BusquedaInterrumpida
+
+class Trabajo:
+    """
+    Una generación en segundo plano.
+
+    Estados: 'pendiente' (en cola), 'ejecutando', 'terminado', 'cancelado' y
+    'error'. Las soluciones se guardan a medida que se encuentran, así que se
+    pueden leer (con pagina()) mientras la búsqueda sigue. Los presupuestos
+    (max_soluciones, max_nodos, limite_ms) son los del generador.
+
+    Cada horario se guarda compacto: la posición de su sección entre las
+    habilitadas de cada materia (generador.activas), una cifra por materia en
+    un array plano. Se decodifica solo la página que se pide.
+
+    El total exacto ('validas') se cuenta en otro hilo mientras se enumera,
+    acotado a LIMITE_CONTEO transiciones: en catálogos densos contar cuesta
+    tanto como enumerar. Si no alcanza queda en None hasta que la búsqueda
+    termina completa (entonces son los encontrados).
+    """
+    FINALES = ('terminado', 'cancelado', 'error')
+    LIMITE_CONTEO = 1000000 # Transiciones del conteo exacto (unos segundos de CPU)
+
+    def __init__(self, generador):
+        self.id = uuid.uuid4().hex
+        self.generador = generador
+        self.estado = 'pendiente'
+        self.codigos = array('H' if max(map(len, generador.activas), default=0) <= 0xFFFF else 'L')
+        self.encontradas = 0
+        self.validas = None # Total exacto, cuando se conoce
+        self.error = None
+        self.creado = time.time()
+        self.inicio = None
+        self.fin = None
+        self.cancelacion = threading.Event()
+        generador.detener = self.cancelacion
+        self._fin_conteo = threading.Event()
+
+    @property
+    def activo(self):
+        return self.estado not in self.FINALES
+
+    def ejecutar(self):
+        """Corre la búsqueda completa (en un hilo del pool)."""
+        if self.cancelacion.is_set():
+            self.estado = 'cancelado'
+            self.fin = time.perf_counter()
+            return
+        self.estado = 'ejecutando'
+        self.inicio = time.perf_counter()
+        # El conteo usa una copia del generador: sus contadores y su forma de
+        # detenerse no se mezclan con los de la enumeración
+        threading.Thread(target=self._contar, args=(copy.copy(self.generador),), daemon=True).start()
+        try:
+            posiciones = {
+                id(seccion): j for secciones in self.generador.activas for j, seccion in enumerate(secciones)
+            }
+            for solucion in self.generador.iter_soluciones():
+                self.codigos.extend([posiciones[id(seccion)] for _, seccion in solucion])
+                self.encontradas += 1
+            self.estado = 'cancelado' if self.cancelacion.is_set() else 'terminado'
+            if self.estado == 'terminado' and self.generador.completo:
+                self.validas = self.encontradas
+        except Exception as e:
+            self.estado = 'error'
+            self.error = str(e)
+        finally:
+            self._fin_conteo.set()
+            self.fin = time.perf_counter()
+
+    def _contar(self, contador):
+        """Conteo exacto acotado, en su propio hilo; se abandona al terminar la búsqueda."""
+        contador.detener = self._fin_conteo
+        try:
+            validas = contador.contar_validas(self.LIMITE_CONTEO)
+        except BusquedaInterrumpida:
+            return
+        if self.validas is None:
+            self.validas = validas
+
+    def cancelar(self):
+        """Pide detener la búsqueda; un trabajo en cola ya no se ejecuta."""
+        self.cancelacion.set()
+        if self.estado == 'pendiente':
+            self.estado = 'cancelado'
+            self.fin = time.perf_counter()
+
+    def pagina(self, offset=0, limit=None, total=None):
+        """
+        Horarios [(materia, sección), ...] encontrados en [offset, offset + limit),
+        sin pasar de 'total' (por defecto, los encontrados hasta ahora).
+        """
+        total = self.encontradas if total is None else total
+        fin = total if limit is None else min(total, offset + limit)
+        nombres = [m.nombre for m in self.generador.materias]
+        activas = self.generador.activas
+        n = len(nombres)
+        return [
+            [(nombres[i], activas[i][j]) for i, j in enumerate(self.codigos[k * n:(k + 1) * n])]
+            for k in range(offset, fin)
+        ]
+
+    def progreso(self):
+        """Resumen observable del estado del trabajo."""
+        encontradas = self.encontradas
+        objetivo = self.validas
+        if objetivo is not None and self.generador.max_soluciones is not None:
+            objetivo = min(objetivo, self.generador.max_soluciones)
+        if self.inicio is None:
+            segundos = 0
+        else:
+            segundos = (self.fin if self.fin is not None else time.perf_counter()) - self.inicio
+        return {
+            'id': self.id,
+            'estado': self.estado,
+            'estrategia': self.generador.estrategia,
+            'teoricas': self.generador.calcular_combinaciones_teoricas(),
+            'validas': self.validas,
+            'encontradas': encontradas,
+            'nodos': self.generador.nodos_explorados,
+            'progreso': round(encontradas / objetivo, 4) if objetivo else (1.0 if self.estado == 'terminado' else 0.0),
+            'completo': self.estado == 'terminado' and self.generador.completo,
+            'truncado': self.generador.truncado,
+            'segundos': round(segundos, 4),
+            'error': self.error,
+        }
+
+class GestorTrabajos:
+    """
+    Cola de trabajos de generación atendida por un pool de hilos.
+
+    Se conservan a lo sumo 'max_trabajos'; al llegar al límite se descartan
+    los trabajos terminados más antiguos. Si todos siguen activos, enviar()
+    lanza RuntimeError. Los trabajos terminados se descartan también 'ttl'
+    segundos después de terminar.
+    """
+    def __init__(self, max_workers=2, max_trabajos=32, ttl=600):
+        self.max_trabajos = max_trabajos
+        self.ttl = ttl
+        self._trabajos = OrderedDict() # id -> Trabajo, del más antiguo al más nuevo
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='generacion')
+        self._lock = threading.Lock()
+
+    def enviar(self, generador):
+        """Encola la generación y devuelve el Trabajo creado."""
+        trabajo = Trabajo(generador)
+        with self._lock:
+            self._expirar()
+            if len(self._trabajos) >= self.max_trabajos:
+                for id_trabajo, anterior in list(self._trabajos.items()):
+                    if not anterior.activo:
+                        del self._trabajos[id_trabajo]
+                        if len(self._trabajos) < self.max_trabajos:
+                            break
+                else:
+                    raise RuntimeError('Demasiados trabajos en curso, intente más tarde')
+            self._trabajos[trabajo.id] = trabajo
+        self._executor.submit(trabajo.ejecutar)
+        return trabajo
+
+    def obtener(self, id_trabajo):
+        """Devuelve el trabajo o None si no existe (o ya fue descartado)."""
+        with self._lock:
+            self._expirar()
+            return self._trabajos.get(id_trabajo)
+
+    def _expirar(self):
+        """Descarta los trabajos que terminaron hace más de 'ttl' segundos (con el lock tomado)."""
+        limite = time.perf_counter() - self.ttl
+        for id_trabajo, trabajo in list(self._trabajos.items()):
+            if not trabajo.activo and trabajo.fin is not None and trabajo.fin < limite:
+                del self._trabajos[id_trabajo]
+
+    def cancelar(self, id_trabajo):
+        """Cancela el trabajo; devuelve None si no existe."""
+        trabajo = self.obtener(id_trabajo)
+        if trabajo is not None:
+            trabajo.cancelar()
+        return trabajo
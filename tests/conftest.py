@@ -0,0 +1,18 @@
+"""
+Configuración de las pruebas - SmartPlannerX
+Las pruebas trabajan solo en memoria: la persistencia se desactiva antes de
+importar la aplicación.
+
+Equipo 3:
+- Cristian E. Sánchez R. (25-0688)
+- Hansel Augusto Pérez (25-0461)
+- Lia De Oleo (25-0673)
+- Juan José Cruz Romero (25-0888)
+- Samir Gonzalez (25-0808)
+- Alejandro Bruno (25-0947)
+- Daniel Osvaldo Lopez (25-0655)
+"""
+
+import os
+
+os.environ['SMARTPLANNER_DB'] = ''
@@ -0,0 +1,233 @@
+"""
+Pruebas de los endpoints - SmartPlannerX
+Cada prueba usa catálogos, caché y soluciones guardadas nuevos.
+
+Equipo 3:
+- Cristian E. Sánchez R. (25-0688)
+- Hansel Augusto Pérez (25-0461)
+- Lia De Oleo (25-0673)
+- Juan José Cruz Romero (25-0888)
+- Samir Gonzalez (25-0808)
+- Alejandro Bruno (25-0947)
+- Daniel Osvaldo Lopez (25-0655)
+"""
+
+import io
+import json
+
+import pytest
+
+import app as servidor
+from benchmarks import catalogo_sintetico
+from src.cache import CacheResultados
+from src.logic import Catalogo, SolucionesIncrementales
+from tests.test_file_parser import FILAS_EXCEL, FILAS_JSON, MATERIAS_JSON, documento_json, excel
+
+@pytest.fixture
+def cliente(monkeypatch):
+    monkeypatch.setattr(servidor, 'materias_institucionales', Catalogo())
+    monkeypatch.setattr(servidor, 'materias_proyeccion', Catalogo())
+    monkeypatch.setattr(servidor, 'cache_resultados', CacheResultados())
+    monkeypatch.setattr(servidor, 'soluciones_incrementales', SolucionesIncrementales())
+    return servidor.app.test_client()
+
+def proyeccion(filas):
+    servidor.materias_proyeccion.agregar_lote(filas)
+
+def filas_sin_choques():
+    """2 materias en días distintos con 2 secciones cada una: exactamente 4 horarios."""
+    return [
+        {'materia': materia, 'seccion': seccion, 'dias': [dia], 'inicio': inicio, 'fin': inicio + 2}
+        for materia, dia in (('Calculo', 'Lunes'), ('Fisica', 'Martes'))
+        for seccion, inicio in (('01', 8), ('02', 10))
+    ]
+
+def test_pagina_con_conteo_exacto(cliente):
+    proyeccion(catalogo_sintetico.generar_filas(materias=4, secciones=4, semilla=3))
+    total = len(cliente.get('/api/proyeccion/generate').get_json()['soluciones'])
+
+    respuesta = cliente.get('/api/proyeccion/generate?limit=3').get_json()
+    assert len(respuesta['soluciones']) == 3
+    assert respuesta['validas'] == total
+    assert respuesta['hay_mas']
+
+def test_pagina_con_conteo_demasiado_caro(cliente):
+    # 10 materias de 10 secciones muy solapadas: el conteo exacto pasa del tope
+    proyeccion(catalogo_sintetico.generar_filas(materias=10, secciones=10, densidad=0.0, semilla=1))
+
+    respuesta = cliente.get('/api/proyeccion/generate?limit=10').get_json()
+    assert len(respuesta['soluciones']) == 10
+    assert respuesta['validas'] is None
+    assert respuesta['hay_mas']
+
+def test_top_no_depende_del_conteo_exacto(cliente):
+    proyeccion(catalogo_sintetico.generar_filas(materias=10, secciones=10, densidad=0.0, semilla=1))
+
+    respuesta = cliente.get('/api/proyeccion/generate?top=3&ordenar_por=dias').get_json()
+    assert len(respuesta['soluciones']) == 3
+    assert respuesta['puntajes'] == sorted(respuesta['puntajes'])
+    assert respuesta['validas'] is None
+
+def test_presupuesto_de_soluciones_justo(cliente):
+    proyeccion(filas_sin_choques())
+    total = 4
+
+    respuesta = cliente.get(f'/api/proyeccion/generate?max_soluciones={total}').get_json()
+    assert len(respuesta['soluciones']) == total
+    assert respuesta['completo'] and respuesta['truncado'] is None
+
+    respuesta = cliente.get(f'/api/proyeccion/generate?max_soluciones={total - 1}').get_json()
+    assert len(respuesta['soluciones']) == total - 1
+    assert not respuesta['completo'] and respuesta['truncado'] == 'soluciones'
+
+def test_paginas_en_el_mismo_orden_con_o_sin_conjunto_guardado(cliente):
+    # Las secciones 01 y 03 de Calculo son equivalentes: la búsqueda emite
+    # ambas con cada sección de Fisica, antes que la 02
+    proyeccion([
+        {'materia': materia, 'seccion': seccion, 'dias': [dia], 'inicio': inicio, 'fin': inicio + 2}
+        for materia, dia, secciones in (
+            ('Calculo', 'Lunes', (('01', 8), ('02', 10), ('03', 8))),
+            ('Fisica', 'Martes', (('01', 8), ('02', 10))),
+        )
+        for seccion, inicio in secciones
+    ])
+
+    def pagina(offset):
+        url = f'/api/proyeccion/generate?limit=2&offset={offset}'
+        return cliente.get(url).get_json()['soluciones']
+
+    primera = pagina(0) # Sin conjunto guardado: búsqueda perezosa
+    completa = cliente.get('/api/proyeccion/generate').get_json()['soluciones']
+    assert primera + pagina(2) + pagina(4) == completa # Desde el conjunto guardado
+    assert [h[0]['seccion'] for h in completa] == ['01', '03', '01', '03', '02', '02']
+
+def test_lote_del_chat(cliente):
+    respuesta = cliente.post('/api/proyeccion/chat/batch', json={
+        'lineas': ['Calculo 1 lunes 8 a 10', '', 'sin horario', 'Calculo 1 martes 8 a 10'],
+    }).get_json()
+    assert respuesta['added'] == 1 and respuesta['errors'] == 2
+    assert [r['linea'] for r in respuesta['resultados']] == [0, 2, 3]
+    assert [r['success'] for r in respuesta['resultados']] == [True, False, False]
+
+    respuesta = cliente.post('/api/proyeccion/chat/batch', json={'texto': 'Fisica 2 jueves 2pm a 4pm'}).get_json()
+    assert respuesta['added'] == 1
+    assert [m.nombre for m in servidor.materias_proyeccion] == ['Calculo', 'Fisica']
+
+@pytest.mark.parametrize('cuerpo', [{'lineas': [1, 2]}, {'lineas': 'Calculo'}, {'texto': None}, [], 'texto'])
+def test_lote_del_chat_invalido(cliente, monkeypatch, cuerpo):
+    invalidaciones = []
+    monkeypatch.setattr(servidor.cache_resultados, 'invalidar', lambda: invalidaciones.append(1))
+    for ruta in ('/api/chat/batch', '/api/proyeccion/chat/batch'):
+        respuesta = cliente.post(ruta, json=cuerpo)
+        assert respuesta.status_code == 400
+        assert 'error' in respuesta.get_json()
+    assert invalidaciones == []
+    assert len(servidor.materias_institucionales) == len(servidor.materias_proyeccion) == 0
+
+def test_cache_de_generate_student(cliente):
+    servidor.materias_institucionales.agregar_lote(filas_sin_choques())
+    seleccion = [f'{m.nombre}|{s.uuid}' for m in servidor.materias_institucionales for s in m.secciones]
+
+    primera = cliente.post('/api/generate_student', json={'selected': seleccion}).get_json()
+    segunda = cliente.post('/api/generate_student', json={'selected': seleccion[::-1]}).get_json()
+    assert segunda == primera
+    assert cliente.get('/api/cache/stats').get_json()['aciertos'] == 1
+
+    # Cambiar el catálogo invalida lo guardado
+    materia = next(iter(servidor.materias_institucionales))
+    cliente.post('/api/toggle_section', json={
+        'materia': materia.nombre, 'uuid': materia.secciones[0].uuid, 'enabled': False})
+    tercera = cliente.post('/api/generate_student', json={'selected': seleccion}).get_json()
+    estadisticas = cliente.get('/api/cache/stats').get_json()
+    assert estadisticas['version'] == 1 and estadisticas['aciertos'] == 1
+    assert len(primera['soluciones']) == 4 and len(tercera['soluciones']) == 2
+
+def test_rutas_del_catalogo(cliente):
+    fila = {'materia': 'Calculo', 'seccion': '01', 'dias': ['Lunes'], 'inicio': 8, 'fin': 10}
+    assert cliente.post('/api/add', json=fila).get_json()['total_materias'] == 1
+    respuesta = cliente.post('/api/add', json=fila)
+    assert respuesta.status_code == 400 and 'ya existe' in respuesta.get_json()['error']
+    cliente.post('/api/add', json=dict(fila, seccion='02', inicio=10, fin=12))
+
+    lista = cliente.get('/api/list').get_json()
+    assert [(m['nombre'], [s['id'] for s in m['secciones']]) for m in lista] == [('Calculo', ['01', '02'])]
+    uuid_seccion = lista[0]['secciones'][0]['uuid']
+
+    assert cliente.post('/api/toggle_section', json={
+        'materia': 'Calculo', 'uuid': uuid_seccion, 'enabled': False}).get_json()['success']
+    assert not cliente.post('/api/toggle_section', json={
+        'materia': 'Fisica', 'uuid': uuid_seccion, 'enabled': False}).get_json()['success']
+    assert cliente.post('/api/delete_section', json={'materia': 'Calculo', 'uuid': uuid_seccion}).get_json()['success']
+    assert [s['id'] for s in cliente.get('/api/list').get_json()[0]['secciones']] == ['02']
+    cliente.post('/api/delete', json={'materia': 'Calculo'})
+    assert cliente.get('/api/list').get_json() == []
+
+def subir(cliente, ruta, contenido, nombre):
+    return cliente.post(ruta, data={'file': (io.BytesIO(contenido), nombre)}, content_type='multipart/form-data')
+
+def test_subir_excel(cliente):
+    respuesta = subir(cliente, '/api/proyeccion/upload', excel(FILAS_EXCEL), 'horarios.xlsx').get_json()
+    assert respuesta['success'] and respuesta['added'] == 3 and respuesta['errors'] == 0
+    assert [m.nombre for m in servidor.materias_proyeccion] == ['MAT101 - Calculo', 'FIS101 - Fisica']
+
+    respuesta = subir(cliente, '/api/proyeccion/upload', excel([]), 'vacio.xlsx')
+    assert respuesta.status_code == 400 and not respuesta.get_json()['success']
+    assert subir(cliente, '/api/proyeccion/upload', b'x', 'horarios.csv').status_code == 400
+
+def test_subir_json(cliente):
+    respuesta = subir(cliente, '/api/upload', documento_json(), 'horarios.json').get_json()
+    assert respuesta['success'] and respuesta['added'] == 3
+    assert [m.nombre for m in servidor.materias_institucionales] == [fila['materia'] for fila in FILAS_JSON]
+
+    # Volver a subir lo mismo: cada fila es un error de sección repetida
+    contenido = '\n'.join(json.dumps(m) for m in MATERIAS_JSON).encode('utf-8')
+    respuesta = subir(cliente, '/api/upload', contenido, 'horarios.ndjson').get_json()
+    assert respuesta['added'] == 0 and respuesta['errors'] == 3
+
+    respuesta = subir(cliente, '/api/upload', b'{"B1": {"materias": [', 'roto.json')
+    assert respuesta.status_code == 400 and 'JSON' in respuesta.get_json()['error']
+
+def test_subir_seccion_de_varios_dias(cliente):
+    materia = {'codigo': 'MAT101', 'nombre': 'Calculo', 'seccion': '01', 'horarios': [
+        {'dia': 'LUNES', 'hora': '05:00 PM / 08:00 PM'}, {'dia': 'MIERCOLES', 'hora': '05:00 PM / 08:00 PM'}]}
+    contenido = json.dumps({'B1': {'materias': [materia]}}).encode('utf-8')
+    respuesta = subir(cliente, '/api/proyeccion/upload', contenido, 'horarios.json').get_json()
+    assert respuesta['added'] == 1 and respuesta['errors'] == 0
+
+    lista = cliente.get('/api/proyeccion/list').get_json()
+    assert [s['dias'] for s in lista[0]['secciones']] == [['Lunes', 'Miercoles']]
+
+def test_formato_compacto(cliente):
+    proyeccion(catalogo_sintetico.generar_filas(materias=4, secciones=4, semilla=3))
+    completo = cliente.get('/api/proyeccion/generate').get_json()
+
+    compacto = cliente.get('/api/proyeccion/generate?formato=compacto').get_json()
+    tabla = compacto.pop('secciones')
+    assert len(tabla) == len({json.dumps(s, sort_keys=True) for h in completo['soluciones'] for s in h})
+    # Las peticiones siguientes salen del conjunto guardado: 'modo' y 'nodos' cambian
+    assert [[tabla[k] for k in horario] for horario in compacto['soluciones']] == completo['soluciones']
+    assert (compacto['teoricas'], compacto['validas']) == (completo['teoricas'], completo['validas'])
+
+    respuesta = cliente.get('/api/proyeccion/generate?formato=binario')
+    assert respuesta.status_code == 400 and 'error' in respuesta.get_json()
+
+def test_formato_ndjson(cliente, monkeypatch):
+    monkeypatch.setattr(servidor, 'TAMANO_BLOQUE_NDJSON', 3)
+    proyeccion(catalogo_sintetico.generar_filas(materias=4, secciones=4, semilla=3))
+    completo = cliente.get('/api/proyeccion/generate').get_json()
+
+    respuesta = cliente.get('/api/proyeccion/generate?formato=ndjson')
+    assert respuesta.mimetype == 'application/x-ndjson'
+    lineas = [json.loads(linea) for linea in respuesta.get_data(as_text=True).splitlines()]
+    cabecera, bloques, final = lineas[0], lineas[1:-1], lineas[-1]
+    assert cabecera == {'teoricas': completo['teoricas']}
+    assert all(len(b['soluciones']) <= 3 for b in bloques)
+
+    # Cada bloque agrega al final de la tabla solo las secciones nuevas
+    tabla, soluciones = [], []
+    for bloque in bloques:
+        tabla += bloque['secciones']
+        soluciones += [[tabla[k] for k in horario] for horario in bloque['soluciones']]
+    assert soluciones == completo['soluciones']
+    assert len(tabla) == len({json.dumps(s, sort_keys=True) for s in tabla})
+    assert final['validas'] == completo['validas'] and final['modo'] == 'sin_cambios'
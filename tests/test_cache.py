@@ -0,0 +1,50 @@
+"""
+Pruebas de la caché de resultados - SmartPlannerX
+Claves canónicas, desalojo LRU por entradas y por bytes, e invalidación por
+versión del catálogo.
+
+Equipo 3:
+- Cristian E. Sánchez R. (25-0688)
+- Hansel Augusto Pérez (25-0461)
+- Lia De Oleo (25-0673)
+- Juan José Cruz Romero (25-0888)
+- Samir Gonzalez (25-0808)
+- Alejandro Bruno (25-0947)
+- Daniel Osvaldo Lopez (25-0655)
+"""
+
+from src.cache import CacheResultados, clave_seleccion
+
+def test_clave_canonica():
+    assert clave_seleccion(['b', 'a', 'a']) == clave_seleccion(['a', 'b'])
+    assert clave_seleccion(['a', 'b'], {'limit': 5}) != clave_seleccion(['a', 'b'])
+    assert clave_seleccion(['a', 'b'], {'x': 1, 'y': 2}) == clave_seleccion(['b', 'a'], {'y': 2, 'x': 1})
+
+def test_desalojo_por_entradas():
+    cache = CacheResultados(max_entradas=2)
+    cache.guardar('a', b'1')
+    cache.guardar('b', b'2')
+    assert cache.obtener('a') == b'1' # 'a' pasa a ser la más reciente
+    cache.guardar('c', b'3')
+    assert cache.obtener('b') is None
+    assert cache.obtener('a') == b'1' and cache.obtener('c') == b'3'
+
+def test_desalojo_por_bytes():
+    cache = CacheResultados(max_bytes=10)
+    cache.guardar('a', b'x' * 6)
+    cache.guardar('b', b'y' * 4)
+    cache.guardar('a', b'z' * 5) # Reemplazar descuenta el valor anterior
+    assert cache.bytes == 9
+    cache.guardar('c', b'w' * 3)
+    assert cache.obtener('b') is None and cache.obtener('a') == b'z' * 5
+    cache.guardar('grande', b'g' * 11) # Más grande que el límite: no se guarda
+    assert cache.obtener('grande') is None
+    assert cache.bytes == 8
+
+def test_invalidar_y_estadisticas():
+    cache = CacheResultados()
+    cache.guardar('a', b'123')
+    assert cache.obtener('a') == b'123'
+    cache.invalidar()
+    assert cache.obtener('a') is None
+    assert cache.estadisticas() == {'version': 1, 'entradas': 0, 'bytes': 0, 'aciertos': 1, 'fallos': 1}
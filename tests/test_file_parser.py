@@ -0,0 +1,127 @@
+"""
+Pruebas de la importación de archivos - SmartPlannerX
+Arma en memoria archivos Excel y JSON con la forma de los exports reales y
+compara las filas que produce FileParser.
+
+Equipo 3:
+- Cristian E. Sánchez R. (25-0688)
+- Hansel Augusto Pérez (25-0461)
+- Lia De Oleo (25-0673)
+- Juan José Cruz Romero (25-0888)
+- Samir Gonzalez (25-0808)
+- Alejandro Bruno (25-0947)
+- Daniel Osvaldo Lopez (25-0655)
+"""
+
+import io
+import json
+
+import openpyxl
+import pytest
+
+from src.file_parser import FileParser
+
+def excel(filas, hoja='Resumen General'):
+    """Libro con un título, los encabezados del export y una fila por (sección, día)."""
+    libro = openpyxl.Workbook()
+    libro.active.title = hoja
+    libro.active.append(['Horarios del trimestre'])
+    libro.active.append(['Codigo', 'Materia', 'Seccion', 'Dia', 'Horario'])
+    for fila in filas:
+        libro.active.append(fila)
+    contenido = io.BytesIO()
+    libro.save(contenido)
+    return contenido.getvalue()
+
+FILAS_EXCEL = [
+    ('MAT101', 'Calculo', '01', 'LUNES', '08:00 AM / 10:00 AM'),
+    ('MAT101', 'Calculo', '02', 'MARTES', '02:00 PM / 04:00 PM'),
+    ('MAT101', 'Calculo', '02', 'MARTES', '02:00 PM / 04:00 PM'), # Repetida
+    ('FIS101', 'Fisica', None, 'VIERNES', '5:00 PM / 8:00 PM'),
+    ('FIS101', 'Fisica', '03', 'JUEVES', 'por definir'),            # Sin horario válido
+    (None, None, None, None, None),
+]
+
+def test_excel_desde_memoria():
+    filas = list(FileParser.iter_excel(io.BytesIO(excel(FILAS_EXCEL))))
+    assert filas == [
+        {'materia': 'MAT101 - Calculo', 'seccion': '01', 'dias': ['Lunes'], 'inicio': 8.0, 'fin': 10.0},
+        {'materia': 'MAT101 - Calculo', 'seccion': '02', 'dias': ['Martes'], 'inicio': 14.0, 'fin': 16.0},
+        {'materia': 'FIS101 - Fisica', 'seccion': '01', 'dias': ['Viernes'], 'inicio': 17.0, 'fin': 20.0},
+    ]
+    resultado = FileParser.parse_excel(io.BytesIO(excel(FILAS_EXCEL)))
+    assert resultado['success'] and resultado['materias'] == filas
+
+def test_excel_en_otra_hoja():
+    filas = list(FileParser.iter_excel(io.BytesIO(excel(FILAS_EXCEL[:1], hoja='Hoja1'))))
+    assert [fila['materia'] for fila in filas] == ['MAT101 - Calculo']
+
+def test_excel_sin_datos():
+    assert not FileParser.parse_excel(io.BytesIO(excel([])))['success']
+    assert not FileParser.parse_excel(io.BytesIO(b'no es un excel'))['success']
+
+MATERIAS_JSON = [
+    {'codigo': 'MAT101', 'nombre': 'Calculo {I}, "diurno"', 'seccion': '01',
+     'horarios': [{'dia': 'LUNES', 'hora': '08:00 AM / 10:00 AM'}]},
+    {'codigo': 'FIS101', 'nombre': 'Física', 'seccion': 2,
+     'horarios': [{'dia': 'SÁBADO', 'hora': '[ASINCRÓNICA 100%] 09:00 AM / 11:30 AM'},
+                  {'dia': '', 'hora': '------'}]},
+    {'nombre': 'Taller', 'horarios': [{'dia': 'JUEVES', 'hora': '01:00 PM / 03:00 PM'}]},
+]
+
+def documento_json(materias=MATERIAS_JSON):
+    """Export por bloques: cada bloque con parte de las materias, y uno sin 'materias'."""
+    return json.dumps({
+        'B1': {'materias': materias[:2]},
+        'B2': {'nota': 'sin materias'},
+        'B3': {'materias': materias[2:]},
+    }, ensure_ascii=False, indent=1).encode('utf-8')
+
+FILAS_JSON = [
+    {'materia': 'MAT101 - Calculo {I}, "diurno"', 'seccion': '01', 'dias': ['Lunes'], 'inicio': 8.0, 'fin': 10.0},
+    {'materia': 'FIS101 - Física', 'seccion': '2', 'dias': ['Sabado'], 'inicio': 9.0, 'fin': 11.5},
+    {'materia': 'Taller', 'seccion': '01', 'dias': ['Jueves'], 'inicio': 13.0, 'fin': 15.0},
+]
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 64 * 1024])
+def test_json_por_bloques(chunk_size):
+    # Con bloques de lectura pequeños los valores quedan partidos entre lecturas
+    filas = list(FileParser.iter_json(io.BytesIO(documento_json()), chunk_size=chunk_size))
+    assert filas == FILAS_JSON
+    assert FileParser.parse_json(documento_json().decode('utf-8'))['materias'] == FILAS_JSON
+
+def test_json_vacio_e_invalido():
+    assert list(FileParser.iter_json(io.BytesIO(b' { } '))) == []
+    for contenido in (b'{"B1": {"materias": [', b'[1, 2]', b'{"B1" {}}'):
+        with pytest.raises(json.JSONDecodeError):
+            list(FileParser.iter_json(io.BytesIO(contenido)))
+
+def test_ndjson():
+    contenido = '\n'.join(json.dumps(m, ensure_ascii=False) for m in MATERIAS_JSON) + '\n\n'
+    assert list(FileParser.iter_ndjson(io.BytesIO(contenido.encode('utf-8')))) == FILAS_JSON
+
+def test_dias_de_una_seccion_combinados_en_json():
+    materia = {'codigo': 'MAT101', 'nombre': 'Calculo', 'seccion': '01', 'horarios': [
+        {'dia': 'LUNES', 'hora': '05:00 PM / 08:00 PM'},
+        {'dia': 'VIERNES', 'hora': '08:00 AM / 10:00 AM'},
+        {'dia': 'MIÉRCOLES', 'hora': '05:00 PM / 08:00 PM'},
+        {'dia': 'LUNES', 'hora': '05:00 PM / 08:00 PM'},
+    ]}
+    contenido = json.dumps({'B1': {'materias': [materia]}}).encode('utf-8')
+    assert [(f['dias'], f['inicio']) for f in FileParser.iter_json(io.BytesIO(contenido))] == [
+        (['Lunes', 'Miercoles'], 17.0), (['Viernes'], 8.0)]
+    # Las listas de días compartidas entre filas no se modifican
+    assert FileParser._dias('LUNES') == ['Lunes']
+
+def test_dias_de_una_seccion_combinados_en_excel():
+    contenido = excel([
+        ('MAT101', 'Calculo', '01', 'LUNES', '05:00 PM / 08:00 PM'),
+        ('FIS101', 'Fisica', '01', 'MARTES', '05:00 PM / 08:00 PM'),
+        ('MAT101', 'Calculo', '01', 'MIERCOLES', '05:00 PM / 08:00 PM'),
+        ('MAT101', 'Calculo', '02', 'MIERCOLES', '05:00 PM / 08:00 PM'),
+    ])
+    assert [(f['materia'], f['seccion'], f['dias']) for f in FileParser.iter_excel(io.BytesIO(contenido))] == [
+        ('MAT101 - Calculo', '01', ['Lunes', 'Miercoles']),
+        ('FIS101 - Fisica', '01', ['Martes']),
+        ('MAT101 - Calculo', '02', ['Miercoles']),
+    ]
@@ -0,0 +1,373 @@
+"""
+Pruebas del generador de horarios - SmartPlannerX
+Compara el generador con la enumeración por fuerza bruta sobre catálogos
+aleatorios pequeños.
+
+Equipo 3:
+- Cristian E. Sánchez R. (25-0688)
+- Hansel Augusto Pérez (25-0461)
+- Lia De Oleo (25-0673)
+- Juan José Cruz Romero (25-0888)
+- Samir Gonzalez (25-0808)
+- Alejandro Bruno (25-0947)
+- Daniel Osvaldo Lopez (25-0655)
+"""
+
+import itertools
+import random
+import threading
+
+import pytest
+
+from src.logic import (
+    BusquedaInterrumpida, Catalogo, GeneradorHorarios, Materia, Seccion, SolucionesIncrementales, evaluar_horario,
+)
+
+DIAS = ['Lunes', 'Martes', 'Miercoles', 'Jueves', 'Viernes']
+SEMILLAS = range(40)
+
+def catalogo_aleatorio(rng, max_materias=6, max_franjas=4, max_repetidas=3, deshabilitadas=0.15):
+    """
+    Materias con pocas franjas, cada una repetida en varias secciones (para que
+    haya clases de equivalencia), y algunas secciones deshabilitadas.
+    """
+    materias = []
+    for i in range(rng.randint(0, max_materias)):
+        materia = Materia(f'M{i}')
+        k = 0
+        for _ in range(rng.randint(1, max_franjas)):
+            inicio = rng.randint(7, 19)
+            dias = rng.sample(DIAS, rng.randint(1, 2))
+            fin = inicio + rng.choice([1, 1.5, 2])
+            for _ in range(rng.randint(1, max_repetidas)):
+                k += 1
+                materia.agregar_seccion(Seccion(f'{k:02d}', dias, inicio, fin))
+        for seccion in materia.secciones:
+            if rng.random() < deshabilitadas:
+                materia.habilitar_seccion(seccion.uuid, False)
+        materias.append(materia)
+    return materias
+
+def fuerza_bruta(materias):
+    """Todas las combinaciones de secciones habilitadas sin choques, como tuplas de handles."""
+    activas = [[s for s in m.secciones if s.enabled] for m in materias]
+    return sorted(
+        tuple(s.handle for s in combinacion)
+        for combinacion in itertools.product(*activas)
+        if not any(a.choca_con(b) for a, b in itertools.combinations(combinacion, 2))
+    )
+
+def clave(horarios):
+    return sorted(tuple(s.handle for _, s in horario) for horario in horarios)
+
+def en_orden(horarios):
+    return [tuple(s.handle for _, s in horario) for horario in horarios]
+
+@pytest.mark.parametrize('semilla', SEMILLAS)
+@pytest.mark.parametrize('estrategia', GeneradorHorarios.ESTRATEGIAS)
+def test_estrategias_coinciden_con_fuerza_bruta(estrategia, semilla):
+    materias = catalogo_aleatorio(random.Random(semilla))
+    generador = GeneradorHorarios(materias, estrategia, descomponer=False)
+    horarios = generador.generar()
+
+    assert clave(horarios) == fuerza_bruta(materias)
+    assert generador.completo
+    # Forward checking asigna en otro orden, pero devuelve el de las materias
+    assert all([n for n, _ in h] == [m.nombre for m in materias] for h in horarios)
+
+def test_estrategia_por_defecto_y_desconocida():
+    assert GeneradorHorarios([]).estrategia == 'backtracking'
+    with pytest.raises(ValueError):
+        GeneradorHorarios([], 'tabu')
+
+@pytest.mark.parametrize('semilla', SEMILLAS)
+def test_contar_validas_coincide_con_fuerza_bruta(semilla):
+    materias = catalogo_aleatorio(random.Random(semilla))
+    assert GeneradorHorarios(materias).contar_validas() == len(fuerza_bruta(materias))
+
+@pytest.mark.parametrize('semilla', SEMILLAS)
+@pytest.mark.parametrize('estrategia', GeneradorHorarios.ESTRATEGIAS)
+def test_componentes_coinciden_con_fuerza_bruta(estrategia, semilla):
+    materias = catalogo_aleatorio(random.Random(semilla))
+    horarios = GeneradorHorarios(materias, estrategia, descomponer=True).generar()
+
+    assert clave(horarios) == fuerza_bruta(materias)
+    assert all([n for n, _ in h] == [m.nombre for m in materias] for h in horarios)
+
+def test_componentes_independientes():
+    # Mañana (M0, M2) y noche (M1, M3) nunca se cruzan
+    materias = []
+    for i, (dia, inicio) in enumerate([('Lunes', 8), ('Martes', 18), ('Lunes', 9), ('Martes', 19)]):
+        materia = Materia(f'M{i}')
+        for j in range(3):
+            materia.agregar_seccion(Seccion(f'{j:02d}', [dia], inicio + j, inicio + j + 1.5))
+        materias.append(materia)
+
+    generador = GeneradorHorarios(materias)
+    assert sorted(generador.componentes()) == [[0, 2], [1, 3]]
+    assert clave(generador.generar()) == fuerza_bruta(materias)
+    assert generador.contar_validas() == len(fuerza_bruta(materias))
+    assert GeneradorHorarios(materias, descomponer=False).componentes() == [[0, 1, 2, 3]]
+
+@pytest.mark.parametrize('semilla', range(6))
+def test_paralelo_mantiene_el_orden_del_backtracking(semilla):
+    materias = catalogo_aleatorio(random.Random(semilla), max_materias=5)
+    esperado = [
+        [(n, s.handle) for n, s in h]
+        for h in GeneradorHorarios(materias, descomponer=False).generar()
+    ]
+    generador = GeneradorHorarios(materias, descomponer=False, paralelo=True, umbral_paralelo=0, procesos=2)
+    assert [[(n, s.handle) for n, s in h] for h in generador.generar()] == esperado
+
+@pytest.mark.parametrize('semilla', range(20))
+@pytest.mark.parametrize('criterio', sorted(GeneradorHorarios.CRITERIOS))
+def test_mejores_coincide_con_fuerza_bruta(criterio, semilla):
+    materias = catalogo_aleatorio(random.Random(semilla), max_materias=5)
+    signo = GeneradorHorarios.CRITERIOS[criterio]
+    mascaras = {s.handle: s.mascara for m in materias for s in m.secciones}
+    valores = sorted(
+        (evaluar_horario(criterio, sum(mascaras[h] for h in horario)) for horario in fuerza_bruta(materias)),
+        key=lambda valor: signo * valor
+    )
+
+    generador = GeneradorHorarios(materias)
+    horarios = generador.mejores(5, criterio)
+    assert len(horarios) == len(valores[:5])
+    assert generador.puntajes == valores[:5]
+    assert all(tuple(s.handle for _, s in h) in fuerza_bruta(materias) for h in horarios)
+
+@pytest.mark.parametrize('semilla', SEMILLAS)
+@pytest.mark.parametrize('estrategia', GeneradorHorarios.ESTRATEGIAS)
+def test_grupos_se_expanden_a_las_soluciones(estrategia, semilla):
+    materias = catalogo_aleatorio(random.Random(semilla))
+    generador = GeneradorHorarios(materias, estrategia)
+
+    expandidos = sorted(
+        tuple(s.handle for s in combinacion)
+        for grupo in generador.iter_grupos()
+        for combinacion in itertools.product(*[clase for _, clase in grupo])
+    )
+    assert expandidos == fuerza_bruta(materias)
+
+def test_clases_de_equivalencia():
+    materia = Materia('Fisica')
+    for id_seccion, inicio in (('01', 8), ('02', 8), ('03', 10)):
+        materia.agregar_seccion(Seccion(id_seccion, ['Lunes'], inicio, inicio + 2))
+    generador = GeneradorHorarios([materia])
+
+    primera, tercera = generador.representantes[0]
+    assert [s.id_seccion for s in generador.equivalentes(primera)] == ['01', '02']
+    assert [s.id_seccion for s in generador.equivalentes(tercera)] == ['03']
+    grupos = [[[s.id_seccion for s in clase] for _, clase in h] for h in generador.iter_grupos()]
+    assert grupos == [[['01', '02']], [['03']]]
+    # Los horarios que solo difieren en secciones equivalentes salen seguidos
+    assert [[s.id_seccion for _, s in h] for h in generador.generar()] == [['01'], ['02'], ['03']]
+
+def test_expansion_respeta_el_presupuesto_de_nodos():
+    # Una sola franja por materia: la búsqueda visita 4 nodos y todo lo demás es expansión
+    materias = []
+    for i in range(3):
+        materia = Materia(f'M{i}')
+        for j in range(20):
+            materia.agregar_seccion(Seccion(f'{j:02d}', [DIAS[i]], 8, 10))
+        materias.append(materia)
+
+    generador = GeneradorHorarios(materias, max_nodos=100)
+    horarios = generador.generar()
+    assert generador.truncado == 'nodos'
+    assert len(horarios) <= 100
+    assert len(GeneradorHorarios(materias).generar()) == 20 ** 3
+
+def materias_solapadas(cantidad=5, secciones=6):
+    """Materias con secciones el mismo día que se solapan en parte."""
+    materias = []
+    for i in range(cantidad):
+        materia = Materia(f'M{i}')
+        for j in range(secciones):
+            inicio = 7 + (i + 2 * j) % 9
+            materia.agregar_seccion(Seccion(f'{j:02d}', ['Lunes', DIAS[1 + j % 3]], inicio, inicio + 1.5))
+        materias.append(materia)
+    return materias
+
+def test_conteo_acotado_por_transiciones():
+    materias = materias_solapadas()
+    generador = GeneradorHorarios(materias)
+    with pytest.raises(BusquedaInterrumpida) as error:
+        generador.contar_validas(limite_transiciones=50)
+    assert error.value.motivo == 'transiciones'
+    # Un conteo abandonado no se memoriza
+    assert generador.contar_validas() == len(fuerza_bruta(materias))
+    assert generador.transiciones > 50
+
+def test_soluciones_incrementales_sin_conteo(monkeypatch):
+    # Si el conteo previo no alcanza, max_soluciones se revisa al enumerar
+    monkeypatch.setattr(SolucionesIncrementales, 'LIMITE_CONTEO', 1)
+    materias = materias_solapadas()
+    total = len(fuerza_bruta(materias))
+
+    vista = SolucionesIncrementales(max_soluciones=total).resolver(GeneradorHorarios(materias))
+    assert clave(vista[:]) == fuerza_bruta(materias)
+    assert SolucionesIncrementales(max_soluciones=total - 1).resolver(GeneradorHorarios(materias)) is None
+
+def materias_sin_choques(cantidad, secciones):
+    """Materias en días distintos: todas las combinaciones son válidas."""
+    materias = []
+    for i in range(cantidad):
+        materia = Materia(f'M{i}')
+        for j in range(secciones):
+            materia.agregar_seccion(Seccion(f'{j:02d}', [DIAS[i]], 7 + j, 8 + j))
+        materias.append(materia)
+    return materias
+
+@pytest.mark.parametrize('estrategia', GeneradorHorarios.ESTRATEGIAS)
+def test_presupuesto_de_soluciones(estrategia):
+    generador = GeneradorHorarios(materias_sin_choques(4, 4), estrategia, max_soluciones=7)
+    assert len(generador.generar()) == 7
+    assert generador.truncado == 'soluciones'
+
+@pytest.mark.parametrize('agrupar', [False, True])
+def test_presupuesto_de_soluciones_justo(agrupar):
+    # Exactamente 4 horarios con max_soluciones=4: el resultado está completo
+    generador = GeneradorHorarios(materias_sin_choques(2, 2), max_soluciones=4)
+    horarios = list(generador.iter_grupos() if agrupar else generador.iter_soluciones())
+    assert len(horarios) == 4
+    assert generador.completo
+
+@pytest.mark.parametrize('descomponer', [True, False])
+def test_presupuesto_de_nodos(descomponer):
+    # Con descomponer cada materia es una componente y los horarios se arman combinándolas
+    generador = GeneradorHorarios(materias_sin_choques(5, 6), descomponer=descomponer, max_nodos=50)
+    horarios = generador.generar()
+    assert generador.truncado == 'nodos'
+    assert len(horarios) < 6 ** 5
+    assert generador.nodos_explorados + generador.armados <= 100
+
+def test_presupuesto_de_tiempo():
+    generador = GeneradorHorarios(materias_sin_choques(5, 10), limite_ms=1)
+    assert len(generador.generar()) < 10 ** 5
+    assert generador.truncado == 'tiempo'
+
+def test_busqueda_y_conteo_cancelados():
+    generador = GeneradorHorarios(materias_sin_choques(5, 10))
+    generador.detener = threading.Event()
+    generador.detener.set()
+    assert len(generador.generar()) <= generador.INTERVALO_CONTROL
+    assert generador.truncado == 'cancelado'
+    with pytest.raises(BusquedaInterrumpida) as error:
+        generador.contar_validas()
+    assert error.value.motivo == 'cancelado'
+
+def test_presupuesto_invalido():
+    with pytest.raises(ValueError):
+        GeneradorHorarios([], max_nodos=0)
+
+@pytest.mark.parametrize('semilla', range(30))
+def test_soluciones_incrementales_tras_cambios(semilla):
+    rng = random.Random(semilla)
+    materias = catalogo_aleatorio(rng, max_materias=5, deshabilitadas=0.3)
+    incrementales = SolucionesIncrementales(max_estados=4)
+    modos = set()
+
+    for _ in range(8):
+        vista = incrementales.resolver(GeneradorHorarios(materias, rng.choice(GeneradorHorarios.ESTRATEGIAS)))
+        modos.add(vista.modo)
+        assert clave(vista[:]) == fuerza_bruta(materias)
+        # Mismo orden que una búsqueda nueva con backtracking, para paginar
+        assert en_orden(vista[:]) == en_orden(GeneradorHorarios(materias).generar())
+
+        for _ in range(rng.randint(1, 3)):
+            if materias:
+                materia = rng.choice(materias)
+                seccion = rng.choice(materia.secciones)
+                materia.habilitar_seccion(seccion.uuid, not seccion.enabled)
+
+    assert 'completo' in modos
+
+def test_soluciones_incrementales_sin_guardados():
+    materias = catalogo_aleatorio(random.Random(1), max_materias=3)
+    incrementales = SolucionesIncrementales()
+    assert incrementales.resolver(GeneradorHorarios(materias), solo_guardados=True) is None
+    assert incrementales.resolver(GeneradorHorarios(materias)).modo == 'completo'
+    assert incrementales.resolver(GeneradorHorarios(materias), solo_guardados=True).modo == 'sin_cambios'
+
+@pytest.mark.parametrize('cantidad', [3, Materia.UMBRAL_INDICE_IDS + 10])
+def test_ids_duplicados(cantidad):
+    # Con pocas secciones se busca en la lista; con muchas, en el set
+    materia = Materia('M0')
+    for j in range(cantidad):
+        materia.agregar_seccion(Seccion(f'{j:03d}', ['Lunes'], 8, 10))
+    with pytest.raises(ValueError):
+        materia.agregar_seccion(Seccion('001', ['Martes'], 8, 10))
+
+    materia.eliminar_seccion(materia.secciones[1].uuid)
+    materia.agregar_seccion(Seccion('001', ['Martes'], 8, 10))
+    assert len(materia) == cantidad
+    assert [s.id_seccion for s in materia.secciones].count('001') == 1
+
+def test_dias_normalizados():
+    datos = {'materia': 'Calculo', 'seccion': '01', 'inicio': 8, 'fin': 10}
+    seccion = Seccion.desde_datos(dict(datos, dias=['MIÉRCOLES', ' sábado', 'Lunes']))
+    assert seccion.dias == ('Miercoles', 'Sabado', 'Lunes')
+    assert seccion.choca_con(Seccion('02', ['Sabado'], 9, 11))
+
+    for dias in (['Lunes', 'Funday'], 'Lunes', [None]):
+        with pytest.raises(ValueError):
+            Seccion.desde_datos(dict(datos, dias=dias))
+    with pytest.raises(ValueError):
+        Seccion('01', ['Mon'], 8, 10)
+
+def test_catalogo():
+    registro = []
+    catalogo = Catalogo(registro=lambda operacion, datos: registro.append(operacion))
+    calculo = Seccion('01', ['Lunes'], 8, 10)
+    catalogo.agregar_seccion('Calculo', calculo)
+    catalogo.agregar_seccion('Fisica', Seccion('01', ['Martes'], 8, 10))
+    catalogo.agregar_seccion('Calculo', Seccion('02', ['Lunes'], 10, 12))
+    with pytest.raises(ValueError):
+        catalogo.agregar_seccion('Calculo', Seccion('02', ['Jueves'], 10, 12))
+
+    assert [m.nombre for m in catalogo] == ['Calculo', 'Fisica'] and len(catalogo) == 2
+    assert catalogo.seccion('Calculo', calculo.uuid) == calculo
+    assert catalogo.seccion('Fisica', calculo.uuid) is None # Se busca solo en su materia
+    assert catalogo.seccion('Quimica', calculo.uuid) is None
+
+    assert catalogo.habilitar_seccion('Calculo', calculo.uuid, False)
+    assert not catalogo.seccion('Calculo', calculo.uuid).enabled
+    assert not catalogo.habilitar_seccion('Fisica', calculo.uuid, False)
+    assert catalogo.eliminar_seccion('Calculo', calculo.uuid)
+    assert not catalogo.eliminar_seccion('Calculo', calculo.uuid)
+    assert [s.id_seccion for s in catalogo.materia('Calculo').secciones] == ['02']
+    assert catalogo.eliminar_materia('Fisica') and not catalogo.eliminar_materia('Fisica')
+    catalogo.limpiar()
+    assert len(catalogo) == 0
+
+    assert registro == [
+        'agregar', 'agregar', 'agregar', 'habilitar', 'eliminar_seccion', 'eliminar_materia', 'limpiar']
+
+def test_agregar_lote():
+    registro = []
+    catalogo = Catalogo(registro=lambda operacion, datos: registro.append((operacion, datos)))
+    catalogo.agregar_seccion('Calculo', Seccion('01', ['Lunes'], 8, 10))
+    registro.clear()
+
+    fila = {'materia': 'Calculo', 'seccion': '02', 'dias': ['Lunes'], 'inicio': 10, 'fin': 12}
+    agregadas, errores = catalogo.agregar_lote([
+        fila,
+        dict(fila, seccion='01'),                   # Ya existe en el catálogo
+        dict(fila, materia='Fisica'),
+        dict(fila, materia='Fisica'),               # Repetida dentro del lote
+        dict(fila, seccion='03', inicio='x'),
+        dict(fila, seccion='04', inicio=12, fin=9),
+        dict(fila, materia=''),
+        dict(fila, seccion='05', dias=['Funday']),
+        dict(fila, seccion='06', inicio='13.5', fin='15'),
+    ])
+    assert agregadas == 3
+    assert [(e['fila'], e['materia']) for e in errores] == [
+        (1, 'Calculo'), (3, 'Fisica'), (4, 'Calculo'), (5, 'Calculo'), (6, ''), (7, 'Calculo')]
+    assert [s.id_seccion for s in catalogo.materia('Calculo').secciones] == ['01', '02', '06']
+    assert catalogo.materia('Calculo').secciones[2].hora_inicio == 13.5
+
+    # Todo el lote se registra en una sola operación
+    assert [operacion for operacion, _ in registro] == ['agregar']
+    assert [(d['materia'], d['seccion']) for d in registro[0][1]] == [('Calculo', '02'), ('Calculo', '06'), ('Fisica', '02')]
@@ -0,0 +1,118 @@
+"""
+Pruebas del parser de lenguaje natural - SmartPlannerX
+Compara SmartParser.parse con la versión anterior (una búsqueda por cada forma
+de los días) sobre textos aleatorios.
+
+Equipo 3:
+- Cristian E. Sánchez R. (25-0688)
+- Hansel Augusto Pérez (25-0461)
+- Lia De Oleo (25-0673)
+- Juan José Cruz Romero (25-0888)
+- Samir Gonzalez (25-0808)
+- Alejandro Bruno (25-0947)
+- Daniel Osvaldo Lopez (25-0655)
+"""
+
+import random
+import re
+
+import pytest
+
+from src.parser import SmartParser
+
+def parse_referencia(text):
+    """SmartParser.parse antes de compilar los patrones."""
+    text_lower = text.lower()
+
+    dias_encontrados = []
+    for key, val in SmartParser.DIAS_MAP.items():
+        if re.search(r'\b' + re.escape(key) + r'\b', text_lower):
+            if val not in dias_encontrados:
+                dias_encontrados.append(val)
+
+    if not dias_encontrados:
+        return {'error': 'No entendí los días. Usa palabras completas como "Lunes".'}
+
+    horas_match = re.search(r'(\d{1,2})(?::(\d{2}))?\s*(am|pm)?\s*(?:a|-|hasta)\s*(\d{1,2})(?::(\d{2}))?\s*(am|pm)?', text_lower)
+
+    if not horas_match:
+        return {'error': 'No encontré las horas. Usa formato "8 a 10" o "2:30pm a 4pm".'}
+
+    try:
+        inicio_h = int(horas_match.group(1))
+        inicio_m = int(horas_match.group(2) or 0)
+        inicio_ampm = horas_match.group(3)
+
+        fin_h = int(horas_match.group(4))
+        fin_m = int(horas_match.group(5) or 0)
+        fin_ampm = horas_match.group(6)
+
+        def to_24h_float(h, m, ampm):
+            if ampm == 'pm' and h < 12: h += 12
+            if ampm == 'am' and h == 12: h = 0
+            return h + (m / 60.0)
+
+        inicio = to_24h_float(inicio_h, inicio_m, inicio_ampm)
+        fin = to_24h_float(fin_h, fin_m, fin_ampm)
+
+        if inicio >= fin and not fin_ampm:
+            fin += 12
+    except ValueError:
+        return {'error': 'Error calculando horas.'}
+
+    text_no_hours = text_lower.replace(horas_match.group(0), "")
+
+    parts = text_no_hours.split()
+    seccion = "Unica"
+    for p in parts:
+        if p.isdigit():
+            seccion = p
+            break
+
+    palabras_ignorar = ['agrega', 'crea', 'pon', 'el', 'la', 'los', 'las', 'de', 'a', 'y', 'materia', 'clase', 'curso', 'por', 'favor', 'tengo', 'que', 'seccion', 'del', 'al']
+    palabras_ignorar += list(SmartParser.DIAS_MAP.keys())
+
+    nombre_parts = []
+    for p in parts:
+        p_clean = p.strip('.,-')
+        if p_clean not in palabras_ignorar and not p_clean.isdigit() and p_clean not in ['am', 'pm']:
+            nombre_parts.append(p_clean.capitalize())
+
+    nombre_materia = " ".join(nombre_parts)
+    if not nombre_materia:
+        nombre_materia = "Materia Desconocida"
+
+    return {
+        'success': True,
+        'materia': nombre_materia,
+        'seccion': seccion,
+        'dias': dias_encontrados,
+        'inicio': inicio,
+        'fin': fin
+    }
+
+# Piezas para armar textos: formas de los días (también dentro de otras
+# palabras), horas, números sueltos y palabras comunes del chat
+PIEZAS = list(SmartParser.DIAS_MAP) + [
+    'Lunes', 'MARTES', 'Miércoles', 'marzo', 'mares', 'sabados', 'juevesito', 'lun-mie', 'vie,', 'mar.',
+    'agrega', 'la', 'materia', 'calculo', 'Física', 'de', 'seccion', 'y', 'am', 'pm', 'a', 'hasta', '-',
+    '8 a 10', '2:30pm a 4pm', '11am-1pm', '7 hasta 9', '12am a 2', '9:15 a 10:45am', '10 a 8', '3 - 5pm',
+    '1', '02', '15', '123', '', '  ',
+]
+
+def texto_aleatorio(rng):
+    return ' '.join(rng.choice(PIEZAS) for _ in range(rng.randint(0, 9)))
+
+@pytest.mark.parametrize('semilla', range(20))
+def test_parse_coincide_con_la_referencia(semilla):
+    rng = random.Random(semilla)
+    for _ in range(1000):
+        texto = texto_aleatorio(rng)
+        assert SmartParser.parse(texto) == parse_referencia(texto), texto
+
+def test_parse_lote():
+    resultado = SmartParser.parse_lote('Calculo 1 lunes 8 a 10\n\nFisica martes y jueves 2pm a 4pm')
+    assert [i for i, _ in resultado] == [0, 2]
+    assert [r['materia'] for _, r in resultado] == ['Calculo', 'Fisica']
+    assert resultado[1][1]['dias'] == ['Martes', 'Jueves']
+    assert resultado[1][1]['inicio'] == 14 and resultado[1][1]['fin'] == 16
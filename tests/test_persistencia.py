@@ -0,0 +1,158 @@
+"""
+Pruebas de la persistencia del catálogo - SmartPlannerX
+Cada prueba usa una base SQLite nueva; dos almacenes sobre la misma base hacen
+de dos workers.
+
+Equipo 3:
+- Cristian E. Sánchez R. (25-0688)
+- Hansel Augusto Pérez (25-0461)
+- Lia De Oleo (25-0673)
+- Juan José Cruz Romero (25-0888)
+- Samir Gonzalez (25-0808)
+- Alejandro Bruno (25-0947)
+- Daniel Osvaldo Lopez (25-0655)
+"""
+
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from src.logic import Seccion
+from src.persistencia import AlmacenCatalogo
+
+@pytest.fixture
+def ruta(tmp_path):
+    return str(tmp_path / 'catalogo.sqlite3')
+
+@pytest.fixture
+def almacenes(ruta):
+    abiertos = []
+    def abrir(**opciones):
+        almacen = AlmacenCatalogo(ruta, **opciones)
+        abiertos.append(almacen)
+        return almacen
+    yield abrir
+    for almacen in abiertos:
+        almacen.cerrar()
+
+def filas(materias, secciones, dia='Lunes'):
+    return [
+        {'materia': f'M{i}', 'seccion': f'{j:02d}', 'dias': [dia], 'inicio': 7 + j, 'fin': 8 + j}
+        for i in range(materias) for j in range(secciones)
+    ]
+
+def contenido(catalogo):
+    return {
+        m.nombre: [(s.uuid, s.id_seccion, s.dias, s.hora_inicio, s.hora_fin, s.enabled) for s in m.secciones]
+        for m in catalogo
+    }
+
+def test_sincronizar_entre_workers(almacenes):
+    a, b = almacenes(), almacenes()
+    catalogo_a, catalogo_b = a.cargar('proyeccion'), b.cargar('proyeccion')
+
+    catalogo_a.agregar_lote(filas(2, 3))
+    seccion = catalogo_a.materia('M0').secciones[1]
+    catalogo_a.habilitar_seccion('M0', seccion.uuid, False)
+    catalogo_a.eliminar_materia('M1')
+    assert b.sincronizar() == {'proyeccion'}
+    assert contenido(catalogo_b) == contenido(catalogo_a)
+    assert a.sincronizar() == set() # Sus propios cambios ya estaban aplicados
+
+    # Tras compactar, el otro worker recarga el snapshot en el mismo objeto
+    catalogo_b.agregar_seccion('M2', Seccion('01', ['Martes'], 8, 10))
+    b.guardar('proyeccion')
+    assert a.sincronizar() == {'proyeccion'}
+    assert contenido(catalogo_a) == contenido(catalogo_b)
+
+def test_recarga_sin_catalogo_a_medio_armar(almacenes, monkeypatch):
+    a, b = almacenes(), almacenes()
+    catalogo_a, catalogo_b = a.cargar('proyeccion'), b.cargar('proyeccion')
+    catalogo_a.agregar_lote(filas(3, 20))
+    a.guardar('proyeccion')
+    b.sincronizar()
+    antes = contenido(catalogo_b)
+    catalogo_a.agregar_seccion('M3', Seccion('01', ['Martes'], 8, 10))
+    a.guardar('proyeccion')
+
+    # A mitad de la recarga de b: otro hilo lee y otro escribe en su catálogo
+    vistos = []
+    escritor = threading.Thread(
+        target=catalogo_b.agregar_seccion, args=('M4', Seccion('01', ['Jueves'], 8, 10)))
+    seccion_original = AlmacenCatalogo._seccion
+    def seccion_en_recarga(*args):
+        if not vistos:
+            vistos.append(contenido(catalogo_b))
+            escritor.start()
+            time.sleep(0.05)
+        return seccion_original(*args)
+    monkeypatch.setattr(AlmacenCatalogo, '_seccion', staticmethod(seccion_en_recarga))
+
+    assert b.sincronizar() == {'proyeccion'}
+    escritor.join()
+    assert vistos == [antes]
+
+    # La escritura esperó a la recarga: queda en memoria y en el log
+    assert catalogo_b.materia('M3') is not None and catalogo_b.materia('M4') is not None
+    a.sincronizar()
+    assert contenido(catalogo_a) == contenido(catalogo_b)
+
+def cambios_en_log(ruta):
+    with sqlite3.connect(ruta) as conexion:
+        return conexion.execute('SELECT COUNT(*) FROM cambios').fetchone()[0]
+
+def test_snapshot_y_log_al_reiniciar(ruta, almacenes):
+    catalogo = almacenes().cargar('institucional')
+    catalogo.agregar_lote(filas(3, 4))
+    seccion = catalogo.materia('M1').secciones[2]
+    catalogo.habilitar_seccion('M1', seccion.uuid, False)
+    catalogo.eliminar_seccion('M2', catalogo.materia('M2').secciones[0].uuid)
+    catalogo.agregar_seccion('M0', Seccion('99', ['Sabado', 'Domingo'], 8.5, 10.25))
+    assert cambios_en_log(ruta) == 4
+
+    # Al arrancar se reaplica el log y se compacta en un snapshot nuevo
+    reiniciado = almacenes()
+    recargado = reiniciado.cargar('institucional')
+    assert contenido(recargado) == contenido(catalogo)
+    assert reiniciado.ultima_carga['institucional']['cambios'] == 4
+    assert cambios_en_log(ruta) == 0
+
+    otra_vez = almacenes()
+    assert contenido(otra_vez.cargar('institucional')) == contenido(catalogo)
+    carga = otra_vez.ultima_carga['institucional']
+    assert carga['secciones'] == 12 and carga['cambios'] == 0
+
+def test_catalogos_separados_y_limpiar(almacenes):
+    almacen = almacenes()
+    institucional, proyeccion = almacen.cargar('institucional'), almacen.cargar('proyeccion')
+    institucional.agregar_lote(filas(2, 2))
+    proyeccion.agregar_lote(filas(1, 3))
+    proyeccion.limpiar()
+    proyeccion.agregar_seccion('Nueva', Seccion('01', ['Viernes'], 14, 16))
+
+    reiniciado = almacenes()
+    assert contenido(reiniciado.cargar('institucional')) == contenido(institucional)
+    assert contenido(reiniciado.cargar('proyeccion')) == contenido(proyeccion)
+
+def test_compactar_al_llenar_el_log(ruta, almacenes):
+    catalogo = almacenes(max_cambios=3).cargar('proyeccion')
+    for j in range(3):
+        catalogo.agregar_seccion('M0', Seccion(f'{j:02d}', ['Lunes'], 7 + j, 8 + j))
+    assert cambios_en_log(ruta) == 0 # El tercer cambio escribió el snapshot
+    catalogo.agregar_seccion('M0', Seccion('03', ['Lunes'], 10, 11))
+    assert cambios_en_log(ruta) == 1
+
+    reiniciado = almacenes()
+    assert contenido(reiniciado.cargar('proyeccion')) == contenido(catalogo)
+    assert reiniciado.ultima_carga['proyeccion']['secciones'] == 3
+
+def test_dias_desconocidos_guardados_antes(ruta, almacenes):
+    catalogo = almacenes().cargar('proyeccion')
+    catalogo.agregar_lote(filas(1, 2))
+    with sqlite3.connect(ruta) as conexion:
+        conexion.execute("UPDATE cambios SET datos = replace(datos, '\"Lunes\"', '\"Funday\"')")
+
+    recargado = almacenes().cargar('proyeccion')
+    assert contenido(recargado) == {}
@@ -0,0 +1,89 @@
+"""
+Pruebas de los trabajos de generación - SmartPlannerX
+Corre trabajos en un GestorTrabajos propio y compara sus horarios con los del
+generador.
+
+Equipo 3:
+- Cristian E. Sánchez R. (25-0688)
+- Hansel Augusto Pérez (25-0461)
+- Lia De Oleo (25-0673)
+- Juan José Cruz Romero (25-0888)
+- Samir Gonzalez (25-0808)
+- Alejandro Bruno (25-0947)
+- Daniel Osvaldo Lopez (25-0655)
+"""
+
+import threading
+import time
+
+import pytest
+
+from src.logic import GeneradorHorarios
+from src.trabajos import GestorTrabajos, Trabajo
+from tests.test_logic import materias_sin_choques
+
+@pytest.fixture
+def gestor():
+    return GestorTrabajos(max_workers=1)
+
+def esperar(trabajo, segundos=10):
+    limite = time.perf_counter() + segundos
+    while trabajo.activo:
+        assert time.perf_counter() < limite, 'el trabajo no terminó'
+        time.sleep(0.005)
+    return trabajo.progreso()
+
+def handles(horarios):
+    return [tuple(s.handle for _, s in horario) for horario in horarios]
+
+def test_trabajo_completo(gestor):
+    materias = materias_sin_choques(3, 4)
+    trabajo = gestor.enviar(GeneradorHorarios(materias))
+    progreso = esperar(trabajo)
+
+    assert progreso['estado'] == 'terminado' and progreso['completo']
+    assert progreso['validas'] == progreso['encontradas'] == 4 ** 3
+    assert progreso['progreso'] == 1.0
+    assert handles(trabajo.pagina()) == handles(GeneradorHorarios(materias).generar())
+    assert handles(trabajo.pagina(10, 5)) == handles(GeneradorHorarios(materias).generar()[10:15])
+    assert gestor.obtener(trabajo.id) is trabajo
+
+def test_trabajo_con_presupuesto_justo(gestor):
+    trabajo = gestor.enviar(GeneradorHorarios(materias_sin_choques(2, 2), max_soluciones=4))
+    progreso = esperar(trabajo)
+    assert progreso['encontradas'] == 4
+    assert progreso['completo'] and progreso['truncado'] is None
+
+def test_la_enumeracion_no_espera_al_conteo(gestor, monkeypatch):
+    # Un conteo que no termina no retrasa la búsqueda
+    liberar = threading.Event()
+    def contar_bloqueado(generador, limite_transiciones=None):
+        liberar.wait(10)
+        return 0
+    monkeypatch.setattr(GeneradorHorarios, 'contar_validas', contar_bloqueado)
+
+    trabajo = gestor.enviar(GeneradorHorarios(materias_sin_choques(3, 3)))
+    progreso = esperar(trabajo)
+    liberar.set()
+    assert progreso['estado'] == 'terminado'
+    assert progreso['validas'] == progreso['encontradas'] == 27
+
+def test_trabajo_sin_conteo(gestor, monkeypatch):
+    # El conteo pasa del tope y la búsqueda se corta: el total no se conoce
+    monkeypatch.setattr(Trabajo, 'LIMITE_CONTEO', 1)
+    trabajo = gestor.enviar(GeneradorHorarios(materias_sin_choques(4, 5), max_soluciones=10))
+    progreso = esperar(trabajo)
+    assert progreso['encontradas'] == 10
+    assert progreso['truncado'] == 'soluciones'
+    assert progreso['validas'] is None
+
+def test_trabajo_cancelado(gestor):
+    ocupado = gestor.enviar(GeneradorHorarios(materias_sin_choques(5, 12)))
+    en_cola = gestor.enviar(GeneradorHorarios(materias_sin_choques(2, 2)))
+    en_cola.cancelar()
+    gestor.cancelar(ocupado.id)
+
+    assert esperar(ocupado)['estado'] == 'cancelado'
+    assert esperar(en_cola)['estado'] == 'cancelado'
+    assert en_cola.encontradas == 0
+    assert ocupado.encontradas < 12 ** 5